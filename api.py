@@ -1,24 +1,132 @@
 
 import os
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+import time
+import asyncio
+from email.utils import formatdate
+from urllib.parse import quote
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, RedirectResponse, PlainTextResponse, JSONResponse, Response, \
+    StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from typing import List, Optional
-from main import FacelessVideoBot
+from main import get_bot
+from core.tracing import get_metrics
+from core.render_memory import get_render_admission
+from core.render_slots import get_slot_allocator
+from core.job_queue import STATUSES
+from core.job_worker import WorkerPool, queue_from_config
+from core.job_events import JobEventHub
+from core.offload import configure_offload, OffloadRejected, OffloadTimeout
+from core.response_cache import ResponseCache
+from core.video_catalog import get_catalog
+from core.workspace import get_artifact_cache
+from core.artifact_store import get_artifact_store
+from core.disk_gc import configure_disk_gc
+from core import coordinator
 
 app = FastAPI(title="Matters of Value Studio API")
-bot = FacelessVideoBot()
+bot = get_bot()
+# Heavy work runs in worker processes fed from a SQLite queue, never in the web process
+jobs = queue_from_config(bot.config)
+worker_pool = None
+job_coordinator = None
+# Engine calls are blocking (sync LLM/HTTP clients): they run on this bounded pool, never on the event loop
+offload = configure_offload(bot.config.API_OFFLOAD_WORKERS, bot.config.API_ENDPOINT_LIMITS)
+# Dashboard read endpoints: one upstream load per TTL however many dashboards poll
+response_cache = ResponseCache(bot.config.API_CACHE_POLICIES)
+# Job progress pushed to dashboards over /api/events
+job_events = JobEventHub(jobs, interval=bot.config.JOB_EVENTS_INTERVAL)
+
+def refresh_library(event):
+    if event.kind == "video.ready":
+        response_cache.invalidate("videos")
+
+job_events.add_listener(refresh_library)
+# Age/LRU quotas on workspaces, the artifact cache and previews (one collector, in the API process)
+disk_gc = configure_disk_gc(bot.config)
+
+@app.on_event("startup")
+def start_workers():
+    global worker_pool, job_coordinator
+    if bot.config.COORDINATOR_PORT:
+        # Remote nodes run `python -m core.job_worker --coordinator http://<this host>:<port>`
+        job_coordinator = coordinator.start_background(bot.config, port=int(bot.config.COORDINATOR_PORT),
+                                                       db_path=jobs.path)
+    if bot.config.JOB_WORKERS:
+        worker_pool = WorkerPool(bot.config.JOB_WORKERS, jobs.path).start()
+    # Catch renders added or deleted while the API was down; the library serves the index meanwhile
+    get_catalog().reconcile_in_background()
+    if bot.config.DISK_GC_INTERVAL:
+        disk_gc.start()
+
+@app.on_event("shutdown")
+def stop_workers():
+    if worker_pool:
+        worker_pool.stop()
+    if job_coordinator:
+        job_coordinator.shutdown()
+    job_events.stop()
+    disk_gc.stop()
+    offload.shutdown()
+
+async def blocking(group, fn, *args, **kwargs):
+    """Runs a blocking call on the offload pool under its group's concurrency limit and timeout."""
+    try:
+        return await offload.run(group, fn, *args, **kwargs)
+    except OffloadRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except OffloadTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+async def cached(request, name, loader, key=None):
+    """Serves a read endpoint from the response cache, answering 304 when the client's ETag still matches."""
+    async def load():
+        return jsonable_encoder(await loader())
+    entry, state = await response_cache.get(name, load, request.headers.get("if-none-match"), key=key)
+    # no-cache: browsers keep the body but revalidate every poll with If-None-Match
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Age": str(int(entry.age())), "X-Cache": state}
+    if state == "not_modified":
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(entry.value, headers=headers)
+
+def enqueue_job(job_type, request=None, priority=None, **params):
+    """Queues a job with the request's fields as params; priority defaults per type (JOB_PRIORITIES)."""
+    if request is not None:
+        fields = request.model_dump() if hasattr(request, "model_dump") else request.dict()
+        priority = fields.pop("priority", None) if priority is None else priority
+        params = {**fields, **params}
+    if priority is None:
+        priority = bot.config.JOB_PRIORITIES.get(job_type, 0)
+    return jobs.enqueue(job_type, params, priority)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-route request latency and status counts for /metrics."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    metrics = get_metrics()
+    metrics.observe("http_request_duration_seconds", time.perf_counter() - started,
+                    {"method": request.method, "route": path}, help_text="API request latency")
+    metrics.inc("http_requests_total", {"method": request.method, "route": path, "status": response.status_code},
+                help_text="API requests by route and status")
+    return response
 
 # Serve static files for the dashboard
 app.mount("/dashboard", StaticFiles(directory="public", html=True), name="static")
-# Serve video outputs for the Cinema Feed
+# Serve video outputs for the Cinema Feed (engines, which used to create it, are built lazily now)
+os.makedirs(bot.config.OUTPUT_DIR, exist_ok=True)
 app.mount("/exports", StaticFiles(directory=bot.config.OUTPUT_DIR), name="exports")
 
 class VideoRequest(BaseModel):
     niche: str
     count: Optional[int] = 1
     style: Optional[str] = "cinematic_documentary"
+    profile: Optional[bool] = False
+    priority: Optional[int] = None
 
 class ScriptRequest(BaseModel):
     title: str
@@ -30,6 +138,9 @@ class ScriptRequest(BaseModel):
     enhance_script: Optional[bool] = False
     publish: Optional[bool] = False
     vertical: Optional[bool] = False
+    brief_mode: Optional[bool] = None
+    profile: Optional[bool] = False
+    priority: Optional[int] = None
 
 class ConceptRequest(BaseModel):
     title: str
@@ -62,14 +173,16 @@ async def script_from_concept(request: ConceptRequest):
     writer = ScriptWriter(api_key=live_key, config_styles=bot.config.STYLES)
 
     try:
-        script = writer.generate_from_concept(
+        script = await blocking(
+            "script",
+            writer.generate_from_concept,
             title=request.title,
             concept=request.concept,
             style=request.style,
             duration_minutes=request.duration_minutes
         )
-        if script.startswith("Error"):
-            raise HTTPException(status_code=502, detail=script)
+        if writer.is_failed(script):
+            raise HTTPException(status_code=502, detail=script or "Script generation failed")
         return {"title": request.title, "script": script, "style": request.style}
     except HTTPException:
         raise
@@ -98,123 +211,243 @@ async def debug_env():
 
 @app.post("/api/settings")
 async def update_settings(settings: dict):
-    bot.config.update(settings)
-    # Re-initialize bot modules with new keys
-    bot.__init__() 
-    return {"status": "Settings updated and engine re-initialized"}
+    # Only engines (and services) that read a changed key are rebuilt, on their next use; local worker
+    # processes reload settings.json before claiming their next job
+    changed, rebuilt = await blocking("default", bot.apply_settings, settings)
+    if changed:
+        response_cache.invalidate()
+    return {"status": "Settings updated", "changed": changed, "rebuilt_engines": rebuilt}
+
+@app.get("/api/cache")
+async def response_cache_stats():
+    "Dashboard response cache: per-endpoint TTLs, entry age and fresh/stale/miss/304 counts."
+    return response_cache.stats()
+
+@app.get("/api/offload")
+async def offload_stats():
+    "Blocking-call pool: per-group limits, calls in flight, rejections (429) and timeouts (504)."
+    return offload.stats()
+
+@app.get("/api/storage")
+async def storage_stats():
+    "Disk quotas per area, the last garbage-collection report (bytes reclaimed) and artifact cache hits."
+    cache = get_artifact_cache()
+    return {**disk_gc.stats(), "artifact_cache": cache.stats() if cache else None,
+            "artifact_store": get_artifact_store().stats()}
+
+@app.post("/api/storage/gc")
+async def collect_garbage(dry_run: bool = False):
+    "Runs a garbage-collection pass now (dry_run only reports what would be removed)."
+    return await blocking("default", disk_gc.collect, dry_run=dry_run)
+
+@app.get("/api/engines")
+async def engine_stats():
+    "Which engines are built, how long each took to import and construct, and the settings each depends on."
+    return {"loaded": bot.engines.loaded(), "engines": bot.engines.stats()}
+
+@app.get("/api/llm/cache")
+async def llm_cache_stats():
+    "Returns LLM response cache hit ratio and latency saved."
+    if not bot.llm.cache:
+        return {"enabled": False}
+    return {"enabled": True, **bot.llm.cache.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    "Prometheus exposition: stage latency histograms, stage outcomes and API request metrics."
+    return get_metrics().render()
+
+@app.get("/api/metrics/stages")
+async def stage_latency():
+    "p50/p95/mean latency per traced stage (derived from the /metrics histograms)."
+    return get_metrics().summary("stage_duration_seconds")
+
+@app.get("/api/llm/limits")
+async def llm_limit_stats():
+    "Returns per provider/endpoint throttling, queueing and circuit-breaker counters."
+    return bot.llm.limits.stats()
+
+@app.get("/api/render/memory")
+async def render_memory_stats():
+    "Returns the render memory budget, admitted/queued/downgraded counts and the learned estimate factors."
+    return get_render_admission().stats()
+
+@app.get("/api/render/slots")
+async def render_slot_stats():
+    "Returns CPU slot assignments (cores, encoder threads) of running renders and queueing counters."
+    return get_slot_allocator().stats()
 
 @app.get("/api/videos")
-async def list_videos():
-    """Lists all produced videos in the output directory."""
-    output_dir = bot.config.OUTPUT_DIR
-    if not os.path.exists(output_dir):
-        return []
-    
-    videos = []
-    for f in os.listdir(output_dir):
-        if f.endswith(".mp4"):
-            videos.append({
-                "name": f,
-                "path": f"/api/video/download/{f}",
-                "size": os.path.getsize(os.path.join(output_dir, f))
-            })
-    return videos
+async def list_videos(request: Request, limit: int = 50, cursor: Optional[str] = None, sort: str = "created_at",
+                      order: str = "desc", style: Optional[str] = None, orientation: Optional[str] = None,
+                      status: Optional[str] = None, q: Optional[str] = None, total: bool = False):
+    """Lists produced videos from the catalog, one page at a time (pass next_cursor back as cursor)."""
+    params = {"limit": max(1, min(limit, 200)), "cursor": cursor, "sort": sort, "order": order, "style": style,
+              "orientation": orientation, "publish_status": status, "q": q}
+
+    def load():
+        try:
+            page = get_catalog().query(**params)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        page["items"] = [video_entry(v) for v in page["items"]]
+        if total:
+            page["total"] = get_catalog().count(style=style, orientation=orientation, publish_status=status, q=q)
+        return page
+
+    key = "videos?" + "&".join(f"{k}={v}" for k, v in sorted({**params, "total": total}.items()) if v is not None)
+    return await cached(request, "videos", lambda: blocking("default", load), key=key)
+
+def video_entry(video):
+    """A catalog row as the dashboard uses it: download, preview and thumbnail URLs instead of disk paths."""
+    thumbnail, preview = video.pop("thumbnail"), video.pop("preview")
+    video.pop("path")
+    video["path"] = f"/api/video/download/{video['name']}"
+    video["thumbnail"] = f"/exports/{os.path.basename(thumbnail)}" if thumbnail else None
+    video["preview"] = None
+    if preview:
+        base = f"/exports/previews/{quote(preview['dir'])}/"
+        video["preview"] = {
+            "hls": base + preview["master"],
+            "poster": base + preview["poster"],
+            "renditions": preview["renditions"],
+            "sprite": {**preview["sprite"], "file": base + preview["sprite"]["file"],
+                       "vtt": base + preview["sprite"]["vtt"]}
+        }
+    return video
 
 @app.post("/api/produce/niche")
-async def produce_niche(request: VideoRequest, background_tasks: BackgroundTasks):
+async def produce_niche(request: VideoRequest):
     """Triggers the niche autopilot pipeline."""
-    # We run it in the background as video production takes time
-    background_tasks.add_task(bot.run_niche_pipeline, niche=request.niche, count=request.count, interactive=False)
-    return {"status": "Production started on autopilot", "niche": request.niche}
+    # Queued for a worker process as video production takes time
+    job_id = enqueue_job("niche", request)
+    return {"status": "Production started on autopilot", "niche": request.niche, "job_id": job_id}
 
 @app.post("/api/produce/custom")
-async def produce_custom(request: ScriptRequest, background_tasks: BackgroundTasks):
+async def produce_custom(request: ScriptRequest):
     """Triggers production with a custom script."""
-    # If script is empty, generate it using the selected structure
-    script_content = request.script
-    if not script_content:
-        script_content = bot.script_engine.generate_script(topic=request.title, style=request.style, structure=request.structure)
-    
-    background_tasks.add_task(
-        bot.produce_video, 
-        title=request.title, 
-        script_content=script_content, 
-        style=request.style, 
-        voice=request.voice,
-        generate_thumb=request.generate_thumb,
-        enhance_script=request.enhance_script,
-        publish=request.publish,
-        vertical=request.vertical
-    )
-    return {"status": "Custom production started"}
+    # If script is empty, the worker streams it straight into paragraph-level TTS
+    job_id = enqueue_job("custom", request)
+    return {"status": "Custom production started", "job_id": job_id}
 
 @app.post("/api/produce/long")
-async def produce_long(request: ScriptRequest, background_tasks: BackgroundTasks):
+async def produce_long(request: ScriptRequest):
     """Triggers long-form chapter-based documentary production."""
-    # If script is empty, generate it using the selected structure
-    script_content = request.script
-    if not script_content:
-        script_content = bot.script_engine.generate_script(topic=request.title, style=request.style, structure=request.structure)
-
-    background_tasks.add_task(
-        bot.produce_long_form, 
-        title=request.title, 
-        full_script=script_content, 
-        style=request.style, 
-        voice=request.voice,
-        generate_thumb=request.generate_thumb,
-        enhance_script=request.enhance_script,
-        publish=request.publish
-    )
+    # If script is empty, the worker generates it using the selected structure
+    job_id = enqueue_job("long", request)
+    return {"status": "Long-form production started", "job_id": job_id}
+
+@app.get("/api/jobs")
+async def list_jobs(status: Optional[str] = None, type: Optional[str] = None, limit: int = 50, offset: int = 0):
+    "Lists queued/running/finished jobs (newest first) with per-type counts and worker liveness."
+    if status and status not in STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(STATUSES)}")
+    return {
+        "jobs": jobs.list(status=status, job_type=type, limit=min(limit, 500), offset=offset),
+        "counts": jobs.stats(),
+        "workers": worker_pool.stats() if worker_pool else [],
+        "nodes": jobs.workers(lost_after=bot.config.JOB_HEARTBEAT_TIMEOUT)
+    }
+
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """Server-sent events: job lifecycle, stage and encode progress (percent, fps), finished videos."""
+    subscriber = await job_events.subscribe(request.headers.get("last-event-id"))
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), 15)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield event.sse
+        finally:
+            job_events.unsubscribe(subscriber)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/events/stats")
+async def event_stats():
+    "Connected event-stream clients, events pushed and current job throughput."
+    return job_events.stats()
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    "Status, progress and result of one job."
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    "Cancels a queued job immediately, or asks its worker to stop a running one."
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] not in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return jobs.cancel(job_id)
+
 @app.get("/api/calendar/current")
-async def get_calendar():
+async def get_calendar(request: Request):
     "Returns the current AI-generated content plan."
-    plan = bot.calendar.get_current_plan()
-    return plan or {"message": "No active plan found"}
+    async def load():
+        plan = await blocking("default", bot.calendar.get_current_plan)
+        return plan or {"message": "No active plan found"}
+    return await cached(request, "calendar", load)
 
 @app.post("/api/calendar/generate")
 async def generate_calendar():
     "Triggers the AI to generate a new 7-day content schedule."
-    plan = bot.calendar.generate_weekly_plan()
+    plan = await blocking("planning", bot.calendar.generate_weekly_plan)
+    response_cache.invalidate("calendar")
     return {"status": "Weekly plan generated", "plan": plan}
 
 @app.post("/api/produce/intl")
-async def produce_intl(request: ScriptRequest, background_tasks: BackgroundTasks):
+async def produce_intl(request: ScriptRequest):
     "Generates international dubbed versions of the video."
-    background_tasks.add_task(bot.produce_dubbed_variants, title=request.title, script_content=request.script)
-    return {"status": "International dubbing sequence initiated (5+ languages)"}
+    job_id = enqueue_job("intl", request)
+    return {"status": "International dubbing sequence initiated (5+ languages)", "job_id": job_id}
 
 @app.post("/api/produce/test")
-async def produce_test(request: ScriptRequest, background_tasks: BackgroundTasks):
+async def produce_test(request: ScriptRequest):
     "Tests every possible demographic angle/hook for a topic."
-    background_tasks.add_task(bot.run_angle_test, topic=request.title)
-    return {"status": "Angle-Testing & Demographic Optimization initiated"}
+    job_id = enqueue_job("test", request)
+    return {"status": "Angle-Testing & Demographic Optimization initiated", "job_id": job_id}
 
 @app.post("/api/produce/bulk")
-async def produce_bulk(background_tasks: BackgroundTasks):
+async def produce_bulk():
     "Triggers background render for the entire weekly calendar."
-    background_tasks.add_task(bot.run_bulk_production)
-    return {"status": "Bulk production for weekly calendar initiated"}
+    job_id = enqueue_job("bulk")
+    return {"status": "Bulk production for weekly calendar initiated", "job_id": job_id}
 
 from publishers.analytics_aggregator import AnalyticsAggregator
 aggregator = AnalyticsAggregator()
 
 @app.get("/api/analytics/health")
-async def get_analytics_health():
+async def get_analytics_health(request: Request):
     "Returns aggregated cross-platform studio health metrics."
-    return aggregator.get_studio_health()
+    return await cached(request, "health", lambda: blocking("default", aggregator.get_studio_health))
 
 @app.get("/api/analytics/pivot")
-async def get_strategic_pivot():
+async def get_strategic_pivot(request: Request):
     "Recommends a niche shift based on viral coefficients and world trends."
-    health = aggregator.get_studio_health()
-    return bot.get_strategic_pivot(health)
+    async def load():
+        health = await blocking("default", aggregator.get_studio_health)
+        return await blocking("analytics", bot.get_strategic_pivot, health)
+    return await cached(request, "pivot", load)
 
 @app.post("/api/produce/intro-hook")
 async def generate_intro_hook(request: dict):
     "Designs a high-impact CGI-style intro hook for a topic."
     topic = request.get("topic")
-    design = bot.intro_engine.generate_cgi_hook(topic)
+    design = await blocking("planning", bot.intro_engine.generate_cgi_hook, topic)
     return {"design": design}
 
 @app.post("/api/analytics/simulate-video-launch")
@@ -236,7 +469,8 @@ async def simulate_video_launch(request: dict):
     }
     
     # Update global health
-    new_health = aggregator.update_metrics(video_stats)
+    new_health = await blocking("default", aggregator.update_metrics, video_stats)
+    response_cache.invalidate("health")
     
     # Calculate specific K-score for this video
     k_score = aggregator.calculate_viral_coefficient(video_stats)
@@ -251,35 +485,35 @@ async def simulate_video_launch(request: dict):
 async def plan_series(request: dict):
     "Generates a 3-Part Documentary Trilogy plan."
     topic = request.get("topic")
-    plan = bot.generate_series_plan(topic)
+    plan = await blocking("planning", bot.generate_series_plan, topic)
     return {"plan": plan}
 
 @app.post("/api/produce/thumbnail-ab")
 async def test_thumbnail_ab(request: dict):
     "Generates two distinct thumbnail concepts for A/B testing."
     topic = request.get("topic")
-    concepts = bot.get_thumbnail_ab(topic)
+    concepts = await blocking("planning", bot.get_thumbnail_ab, topic)
     return {"concepts": concepts}
 
 @app.post("/api/monetization/sponsors")
 async def analyze_sponsors(request: dict):
     "Analyzes the script for optimal sponsor integration spots."
     script = request.get("script")
-    spots = bot.analyze_for_sponsors(script)
+    spots = await blocking("planning", bot.analyze_for_sponsors, script)
     return {"spots": spots}
 
 @app.post("/api/distribution/repurpose")
 async def repurpose_content(request: dict):
     "Identifies viral segments for Shorts/Reels repurposing."
     script = request.get("script")
-    shorts = bot.analyze_for_repurposing(script)
+    shorts = await blocking("planning", bot.analyze_for_repurposing, script)
     return {"shorts": shorts}
 
 @app.post("/api/intelligence/music")
 async def intelligence_music(request: dict):
     "Generates a professional music production brief from a script."
     script = request.get("script")
-    brief = bot.analyze_music_theme(script)
+    brief = await blocking("planning", bot.analyze_music_theme, script)
     return {"music_brief": brief}
 
 @app.post("/api/personalization/clone-voice")
@@ -288,7 +522,7 @@ async def clone_voice(request: dict):
     action = request.get("action")
     name = request.get("name")
     sample_path = request.get("sample_path")
-    result = bot.manage_voice_cloning(action, name, sample_path)
+    result = await blocking("publish", bot.manage_voice_cloning, action, name, sample_path)
     return result
 
 @app.post("/api/distribution/publish")
@@ -297,7 +531,7 @@ async def publish_video(request: dict):
     video_path = request.get("video_path")
     platforms = request.get("platforms", ["youtube", "tiktok"])
     metadata = request.get("metadata", {"title": "New Video"})
-    result = bot.orchestrate_publishing(video_path, platforms, metadata)
+    result = await blocking("publish", bot.orchestrate_publishing, video_path, platforms, metadata)
     return result
 
 @app.post("/api/engage/comment")
@@ -306,7 +540,7 @@ async def engage_comment(request: dict):
     topic = request.get("topic")
     script = request.get("script")
     comment = request.get("comment")
-    response = bot.auto_respond_to_viewer(topic, script, comment)
+    response = await blocking("engage", bot.auto_respond_to_viewer, topic, script, comment)
     return {"reply": response}
 
 @app.post("/api/community/draft")
@@ -314,30 +548,90 @@ async def draft_community(request: dict):
     "Generates a viral engagement kit for social community tabs."
     topic = request.get("topic")
     script = request.get("script")
-    kit = bot.generate_community_kit(topic, script)
+    kit = await blocking("planning", bot.generate_community_kit, topic, script)
     return {"kit": kit}
 
 @app.get("/api/news/trending")
-async def get_news_trending():
+async def get_news_trending(request: Request):
     "Returns AI-curated news opportunities from the World Pulse engine."
-    return bot.get_trending_opportunities()
-
-from music_studio import MusicStudio
-studio_engine = MusicStudio()
+    return await cached(request, "trending", lambda: blocking("analytics", bot.get_trending_opportunities))
 
 @app.post("/api/produce/music")
-async def produce_music(request: dict, background_tasks: BackgroundTasks):
+async def produce_music(request: dict):
     "Triggers the Music Studio to generate a song and music video."
     topic = request.get("topic")
     genre = request.get("genre", "hip-hop")
-    background_tasks.add_task(studio_engine.produce_music_video, topic=topic, genre=genre)
-    return {"status": "Music video production started in the background"}
-@app.get("/api/video/download/{filename}")
-async def download_video(filename: str):
-    file_path = os.path.join(bot.config.OUTPUT_DIR, filename)
-    if not os.path.exists(file_path):
+    job_id = enqueue_job("music", priority=request.get("priority"), topic=topic, genre=genre)
+    return {"status": "Music video production started in the background", "job_id": job_id}
+
+
+def byte_range(header, size):
+    """(start, end) of a single `bytes=` range; None to send the whole file, False when unsatisfiable."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        # Multipart ranges aren't worth it for video; the whole file is a valid answer
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            return (max(0, size - length), size - 1) if length > 0 and size else False
+        start, end = int(first), int(last) if last else size - 1
+    except ValueError:
+        return None
+    if end < start:
+        return None
+    if start >= size:
+        return False
+    return start, min(end, size - 1)
+
+def read_file(path, start, end, chunk_size=1 << 20):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+@app.api_route("/api/video/download/{filename}", methods=["GET", "HEAD"])
+async def download_video(filename: str, request: Request):
+    """Downloads a master; honours Range / If-Range so downloads resume and players can seek."""
+    name = os.path.basename(filename)
+    store = get_artifact_store()
+    if store.remote:
+        # Served by the bucket (which handles Range itself); this process never streams the bytes
+        url = await blocking("default", store.presigned_url, f"videos/{name}", name)
+        if url:
+            return RedirectResponse(url, status_code=307)
+    file_path = os.path.join(bot.config.OUTPUT_DIR, name)
+    if not os.path.isfile(file_path):
         raise HTTPException(status_code=404, detail="Video not found")
-    return FileResponse(file_path)
+    st = os.stat(file_path)
+    size = st.st_size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{st.st_mtime_ns:x}-{size:x}"',
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(os.path.basename(file_path))}"
+    }
+    start, end, status = 0, size - 1, 200
+    requested = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if requested and (not if_range or if_range in (headers["ETag"], headers["Last-Modified"])):
+        chosen = byte_range(requested, size)
+        if chosen is False:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if chosen:
+            (start, end), status = chosen, 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(max(0, end - start + 1))
+    if request.method == "HEAD":
+        return Response(status_code=status, headers=headers, media_type="video/mp4")
+    return StreamingResponse(read_file(file_path, start, end), status_code=status, headers=headers,
+                             media_type="video/mp4")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,167 @@
+
+"""Dashboard latency while slow LLM-backed endpoints are in flight.
+
+Usage (from the repo root):
+    python -m benchmarks.api_load [--llm-latency-ms 3000] [--slow-clients 8] [--seconds 20]
+                                  [--poll-hz 10] [--max-ratio 3] [--json api_load.json]
+
+Starts the stand-in services with a long LLM latency and the API (uvicorn) pointed
+at them, measures dashboard polls (/api/jobs, /api/engines, /api/render/slots) on an
+idle server, then again while --slow-clients keep hitting LLM endpoints (series plan,
+thumbnail A/B, comment replies, calendar generation). With blocking calls on the event
+loop the loaded p95 jumps to roughly the LLM latency; off the loop it stays flat.
+Exits non-zero when loaded p95 exceeds --max-ratio x idle p95 (plus 50 ms).
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin_server import start_background
+from benchmarks.offline_pipeline import point_at
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD = ["/api/jobs", "/api/engines", "/api/render/slots"]
+SLOW = [
+    ("/api/produce/series-plan", {"topic": "The vanished caravan of the silk cities"}),
+    ("/api/produce/thumbnail-ab", {"topic": "Why central banks fear a forgotten cipher"}),
+    ("/api/engage/comment", {"topic": "Hidden empires", "script": "A short script.", "comment": "Is this real?"}),
+    ("/api/calendar/generate", {})
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(url, body=None, timeout=120):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method="POST" if body is not None else "GET",
+                                 headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None
+    return time.perf_counter() - started, status
+
+
+def poll_dashboard(base, seconds, hz):
+    latencies = []
+    deadline = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < deadline:
+        elapsed, _ = request(base + DASHBOARD[i % len(DASHBOARD)], timeout=60)
+        latencies.append(elapsed * 1000)
+        i += 1
+        time.sleep(max(0.0, 1 / hz - elapsed))
+    return latencies
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 1),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 1),
+        "max_ms": round(ordered[-1], 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-latency-ms", type=float, default=3000)
+    parser.add_argument("--slow-clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--poll-hz", type=float, default=10)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    server = start_background(latency_ms=args.llm_latency_ms, jitter_ms=0)
+    workdir = tempfile.mkdtemp(prefix="api_load_")
+    point_at(server.url, workdir)
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    api = subprocess.Popen([sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+                           cwd=ROOT, env=dict(os.environ))
+    try:
+        deadline = time.monotonic() + 60
+        while request(base + "/api/engines", timeout=2)[1] != 200:
+            if time.monotonic() > deadline or api.poll() is not None:
+                raise RuntimeError("API did not start")
+            time.sleep(0.3)
+
+        print(f"[LOAD] Idle dashboard for {args.seconds:.0f}s ...", flush=True)
+        idle = summarize(poll_dashboard(base, args.seconds, args.poll_hz))
+
+        stop = threading.Event()
+        slow = []
+
+        def slow_client(n):
+            i = n
+            while not stop.is_set():
+                path, body = SLOW[i % len(SLOW)]
+                elapsed, status = request(base + path, body)
+                slow.append({"path": path, "seconds": round(elapsed, 2), "status": status})
+                i += 1
+
+        clients = [threading.Thread(target=slow_client, args=(n,), daemon=True) for n in range(args.slow_clients)]
+        for client in clients:
+            client.start()
+        # Let the slow calls get in flight before measuring
+        time.sleep(min(2.0, args.llm_latency_ms / 2000))
+        print(f"[LOAD] Dashboard with {args.slow_clients} LLM clients for {args.seconds:.0f}s ...", flush=True)
+        loaded = summarize(poll_dashboard(base, args.seconds, args.poll_hz))
+        stop.set()
+        for client in clients:
+            client.join(args.llm_latency_ms / 1000 * 3 + 30)
+        offload = json.loads(urllib.request.urlopen(base + "/api/offload", timeout=10).read())
+    finally:
+        api.terminate()
+        try:
+            api.wait(10)
+        except subprocess.TimeoutExpired:
+            api.kill()
+        server.shutdown()
+
+    statuses = {}
+    for call in slow:
+        statuses[str(call["status"])] = statuses.get(str(call["status"]), 0) + 1
+    report = {"llm_latency_ms": args.llm_latency_ms, "slow_clients": args.slow_clients, "idle": idle,
+              "loaded": loaded, "slow_calls": len(slow), "slow_statuses": statuses, "offload": offload}
+
+    print(f"\n{'':<8} {'requests':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name in ("idle", "loaded"):
+        r = report[name]
+        print(f"{name:<8} {r['requests']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['max_ms']:>8}")
+    print(f"Slow LLM calls completed: {len(slow)} {statuses}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Results written to {args.json_path}")
+
+    limit = idle["p95_ms"] * args.max_ratio + 50
+    if loaded["p95_ms"] > limit:
+        print(f"[LOAD] FAIL: loaded p95 {loaded['p95_ms']} ms > {limit:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
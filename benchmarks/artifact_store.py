@@ -0,0 +1,123 @@
+
+"""Artifact store round trip and multipart upload throughput against the local S3 stand-in.
+
+Usage (from the repo root):
+    python -m benchmarks.artifact_store [--mb 64] [--part-mb 8] [--concurrency 1 4 8]
+                                        [--latency-ms 20] [--json artifact_store.json]
+
+Uploads a generated "render" through S3Store once per --concurrency value (multipart
+above --part-mb, that many parts in flight), then fetches it back through the
+read-through cache (cold, then warm), follows a presigned URL with a Range request and
+lists the prefix. The stand-in sleeps --latency-ms per request, like a real endpoint's
+round trip, so part concurrency shows up as throughput. Exits non-zero when any byte
+read back differs from what was uploaded.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.s3_standin import start_background
+from core.artifact_store import S3Store
+
+
+def digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=64)
+    parser.add_argument("--part-mb", type=float, default=8)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    # boto3 wants credentials even though the stand-in ignores them
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "standin")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "standin")
+    server = start_background(latency_ms=args.latency_ms)
+    workdir = tempfile.mkdtemp(prefix="artifact_store_")
+    source = os.path.join(workdir, "render_final.mp4")
+    with open(source, "wb") as f:
+        remaining = int(args.mb * 1024 * 1024)
+        while remaining > 0:
+            chunk = os.urandom(min(remaining, 1 << 20))
+            f.write(chunk)
+            remaining -= len(chunk)
+    expected = digest(source)
+    size = os.path.getsize(source)
+    failures = []
+    report = {"mb": args.mb, "part_mb": args.part_mb, "latency_ms": args.latency_ms, "uploads": []}
+
+    try:
+        for concurrency in args.concurrency:
+            store = S3Store("renders", cache_dir=os.path.join(workdir, f"cache_{concurrency}"), prefix="bench",
+                            endpoint_url=server.url, region="us-east-1", part_size_mb=args.part_mb,
+                            max_concurrency=concurrency)
+            key = f"videos/render_c{concurrency}.mp4"
+            started = time.perf_counter()
+            if store.upload(source, key) != key:
+                failures.append(f"upload at concurrency {concurrency} failed")
+                continue
+            elapsed = time.perf_counter() - started
+            report["uploads"].append({"concurrency": concurrency, "seconds": round(elapsed, 3),
+                                      "mb_per_s": round(size / 1e6 / elapsed, 1)})
+            print(f"[STORE] upload x{concurrency:<3} {elapsed:7.2f}s  {size / 1e6 / elapsed:7.1f} MB/s", flush=True)
+
+        key = f"videos/render_c{args.concurrency[-1]}.mp4"
+        timings = {}
+        for attempt in ("cold", "warm"):
+            started = time.perf_counter()
+            local = store.fetch(key)
+            timings[attempt] = round(time.perf_counter() - started, 3)
+            if not local or digest(local) != expected:
+                failures.append(f"{attempt} fetch returned different bytes")
+        report["fetch"] = {**timings, "stats": store.stats()}
+        print(f"[STORE] fetch cold {timings['cold']:.2f}s, warm {timings['warm']:.3f}s", flush=True)
+
+        url = store.presigned_url(key, "render_final.mp4")
+        request = urllib.request.Request(url, headers={"Range": "bytes=1000-1999"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            ranged, status = response.read(), response.status
+        with open(source, "rb") as f:
+            f.seek(1000)
+            if status != 206 or ranged != f.read(1000):
+                failures.append(f"presigned range GET returned {status} / wrong bytes")
+        if store.presigned_url("videos/missing.mp4") is not None:
+            failures.append("presigned URL issued for a missing object")
+
+        listed = store.list("videos/")
+        if sorted(listed) != sorted(f"videos/render_c{c}.mp4" for c in args.concurrency):
+            failures.append(f"listing returned {listed}")
+        report["standin"] = server.stats()
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report["failures"] = failures
+    print(json.dumps(report["standin"] if "standin" in report else {}, indent=4))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Results written to {args.json_path}")
+    if failures:
+        for failure in failures:
+            print(f"[STORE] FAIL: {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+
+"""Runs a coordinator and several render workers on this machine against the stand-in services.
+
+Usage (from the repo root):
+    python -m benchmarks.local_cluster [--workers 3] [--jobs 6] [--cores 2] [--memory-mb 2048]
+                                       [--kill-after 20] [--lease 15] [--json cluster.json]
+
+Every worker gets its own OUTPUT_DIR, as if it were a separate node; finished videos
+are uploaded into the coordinator's OUTPUT_DIR. --kill-after SIGKILLs the first worker
+that many seconds in, so its job has to be requeued and finished by another worker.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import signal
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin_server import start_background
+from benchmarks.offline_pipeline import TOPICS, point_at
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def node_env(server_url, node_dir):
+    point_at(server_url, node_dir)
+    return dict(os.environ)
+
+
+def wait_for(url, timeout=30):
+    from core.coordinator import RemoteJobQueue
+    queue = RemoteJobQueue(url, retries=1)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            queue._request("GET", "/health")
+            return queue
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Coordinator at {url} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=6)
+    parser.add_argument("--cores", type=int, default=2, help="Cores each worker advertises")
+    parser.add_argument("--memory-mb", type=int, default=2048, help="Memory each worker advertises")
+    parser.add_argument("--lease", type=float, default=15, help="Seconds before a silent worker's job is requeued")
+    parser.add_argument("--kill-after", type=float, help="SIGKILL the first worker after this many seconds")
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--workdir")
+    parser.add_argument("--keep", action="store_true", help="Keep the work directory")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    server = start_background(latency_ms=args.latency_ms)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="local_cluster_")
+    url = f"http://127.0.0.1:{free_port()}"
+    procs = []
+    print(f"Stand-in services on {server.url}; coordinator on {url}; nodes in {workdir}")
+
+    try:
+        coordinator_dir = os.path.join(workdir, "coordinator")
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "core.coordinator", "--host", "127.0.0.1", "--port", url.rsplit(":", 1)[1],
+             "--db", os.path.join(coordinator_dir, "jobs.db"), "--lease", str(args.lease)],
+            cwd=ROOT, env=node_env(server.url, coordinator_dir)))
+        queue = wait_for(url)
+
+        workers = []
+        for i in range(args.workers):
+            workers.append(subprocess.Popen(
+                [sys.executable, "-m", "core.job_worker", "--coordinator", url, "--cores", str(args.cores),
+                 "--memory-mb", str(args.memory_mb)],
+                cwd=ROOT, env=node_env(server.url, os.path.join(workdir, f"node_{i}"))))
+        procs += workers
+
+        job_ids = [queue.enqueue("custom", {
+            "title": TOPICS[i % len(TOPICS)], "style": "cinematic_documentary", "voice": "onyx",
+            "generate_thumb": False, "publish": False
+        }) for i in range(args.jobs)]
+
+        started = time.monotonic()
+        killed = None
+        while time.monotonic() - started < args.timeout:
+            if args.kill_after and killed is None and time.monotonic() - started >= args.kill_after:
+                killed = workers[0].pid
+                workers[0].send_signal(signal.SIGKILL)
+                print(f"[CLUSTER] Killed worker pid {killed}")
+            states = [queue.get(job_id) for job_id in job_ids]
+            if all(s["status"] in ("succeeded", "failed", "cancelled") for s in states):
+                break
+            time.sleep(1)
+        wall = time.monotonic() - started
+
+        nodes = queue.workers()
+        runs = [{
+            "job_id": s["id"],
+            "status": s["status"],
+            "worker": s["worker"],
+            "attempts": s["attempts"],
+            "seconds": round(s["finished_at"] - s["started_at"], 2) if s.get("finished_at") and s.get("started_at")
+            else None,
+            "artifacts": s["artifacts"],
+            "missing": [p for p in s["artifacts"] if not os.path.exists(p)]
+        } for s in states]
+        succeeded = sum(r["status"] == "succeeded" for r in runs)
+
+        print(f"\n{'job':<13} {'status':<10} {'tries':>5} {'seconds':>8}  worker")
+        for r in runs:
+            print(f"{r['job_id']:<13} {r['status']:<10} {r['attempts']:>5} {r['seconds']!s:>8}  {r['worker']}")
+        print(f"\n{succeeded}/{args.jobs} succeeded in {wall:.1f}s "
+              f"({succeeded / wall * 3600:.1f} videos/hour) on {args.workers} worker(s)")
+        print(f"Artifacts collected: {sum(len(r['artifacts']) for r in runs)} "
+              f"(missing: {sum(len(r['missing']) for r in runs)}) in {coordinator_dir}")
+        for n in nodes:
+            print(f"  {n['id']:<28} cores={n['cores']} memory_mb={n['memory_mb']} alive={n['alive']}")
+
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump({"workers": args.workers, "jobs": args.jobs, "wall_seconds": round(wall, 2),
+                           "succeeded": succeeded, "killed_worker": killed, "runs": runs, "nodes": nodes},
+                          f, indent=4, default=str)
+            print(f"Results written to {args.json_path}")
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        server.shutdown()
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
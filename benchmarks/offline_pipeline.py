@@ -0,0 +1,100 @@
+
+"""Runs produce_from_topic end to end against the local stand-in services and reports throughput.
+
+Usage (from the repo root):
+    python -m benchmarks.offline_pipeline [--jobs 3] [--latency-ms 150] [--error-rate 0.0]
+                                          [--throttle-rate 0.0] [--json results.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin_server import start_background
+
+TOPICS = [
+    "The vanished caravan of the silk cities",
+    "Why central banks fear a forgotten cipher",
+    "The hidden empire under the trade routes",
+    "Signals from an unsolved maritime mystery",
+    "The market crash nobody saw coming"
+]
+
+
+def point_at(server_url, workdir):
+    """Environment overrides win over config/settings.json, so real keys and endpoints are never used."""
+    os.environ.update({
+        "OPENAI_API_KEY": "standin",
+        "GEMINI_API_KEY": "",
+        "PEXELS_API_KEY": "standin",
+        "OPENAI_BASE_URL": f"{server_url}/v1",
+        "GEMINI_BASE_URL": server_url,
+        "PEXELS_BASE_URL": server_url,
+        "REDDIT_BASE_URL": server_url,
+        "NAIRALAND_BASE_URL": f"{server_url}/nairaland",
+        "ASSETS_DIR": os.path.join(workdir, "assets"),
+        "OUTPUT_DIR": os.path.join(workdir, "output")
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workdir")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    server = start_background(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                              throttle_rate=args.throttle_rate, seed=args.seed)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="offline_pipeline_")
+    point_at(server.url, workdir)
+    print(f"Stand-in services on {server.url}; artifacts in {workdir}")
+
+    from main import FacelessVideoBot
+    bot = FacelessVideoBot()
+
+    runs = []
+    started = time.perf_counter()
+    for i in range(args.jobs):
+        topic = TOPICS[i % len(TOPICS)]
+        job_started = time.perf_counter()
+        video = bot.produce_from_topic(topic, output_prefix=f"offline_{i}", generate_thumb=False, publish=False)
+        runs.append({
+            "topic": topic,
+            "video": video,
+            "ok": bool(video),
+            "seconds": round(time.perf_counter() - job_started, 2),
+            "stages": {k: v["duration"] for k, v in bot.last_stage_timings.items()}
+        })
+        print(f"[{i + 1}/{args.jobs}] {topic}: {'ok' if video else 'FAILED'} in {runs[-1]['seconds']}s")
+    total = time.perf_counter() - started
+
+    report = {
+        "jobs": args.jobs,
+        "succeeded": sum(r["ok"] for r in runs),
+        "total_seconds": round(total, 2),
+        "jobs_per_hour": round(args.jobs / total * 3600, 1) if total else None,
+        "settings": vars(args),
+        "server_requests": server.stats(),
+        "rate_limits": bot.llm.limits.stats(),
+        "runs": runs
+    }
+    print(f"\n{report['succeeded']}/{args.jobs} videos in {report['total_seconds']}s "
+          f"({report['jobs_per_hour']} jobs/hour)")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+
+"""Aggregate render throughput (videos/hour) at several concurrency levels, with and without CPU slots.
+
+Usage (from the repo root):
+    python -m benchmarks.render_concurrency [--levels 1 2 4 8] [--jobs 8] [--duration 30]
+                                            [--modes slots unmanaged] [--json concurrency.json]
+
+Renders run on threads inside one process, the way API background tasks and bulk
+production share the editor. "slots" uses the core-aware allocator (explicit encoder
+threads + affinity); "unmanaged" leaves ffmpeg at its default thread count.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.render_suite import CLIP_SOURCES, make_clip, make_voice, make_script, _meta
+
+
+def run_level(level, mode, jobs, duration, fixture_dir, work_dir):
+    from config import settings
+    from core.render_slots import configure_render_slots
+    from editor.video_maker import VideoEditor
+
+    allocator = configure_render_slots(max_slots=level, min_threads=1, enabled=(mode == "slots"))
+    config = settings.Config()
+    clips = [make_clip(fixture_dir, s, r) for s, r in CLIP_SOURCES]
+    voice = make_voice(fixture_dir, duration)
+    script = make_script(duration)
+    out_dir = os.path.join(work_dir, f"{mode}_{level}")
+    editor = VideoEditor(output_dir=out_dir, config_styles=config.STYLES)
+
+    def render(i):
+        started = time.perf_counter()
+        output = editor.create_video(audio_path=voice, video_paths=clips, script_text=script,
+                                     output_filename=f"job_{i}.mp4", style="standard", lean=False)
+        return {"ok": bool(output), "seconds": round(time.perf_counter() - started, 2)}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=level) as pool:
+        runs = list(pool.map(render, range(jobs)))
+    wall = time.perf_counter() - started
+    ok = sum(r["ok"] for r in runs)
+    return {
+        "mode": mode,
+        "concurrency": level,
+        "jobs": jobs,
+        "succeeded": ok,
+        "wall_seconds": round(wall, 2),
+        "videos_per_hour": round(ok / wall * 3600, 1) if wall else None,
+        "mean_job_seconds": round(sum(r["seconds"] for r in runs) / len(runs), 2),
+        "slots": allocator.stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--modes", nargs="+", default=["slots", "unmanaged"], choices=["slots", "unmanaged"])
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--duration", type=int, default=30, help="Seconds of video per render")
+    parser.add_argument("--fixtures", help="Directory for cached synthetic media")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    fixture_dir = args.fixtures or os.path.join(tempfile.gettempdir(), "render_bench_fixtures")
+    work_dir = tempfile.mkdtemp(prefix="render_concurrency_")
+    os.makedirs(fixture_dir, exist_ok=True)
+
+    results = []
+    for mode in args.modes:
+        for level in args.levels:
+            print(f"[BENCH] {mode} x{level} ({args.jobs} jobs) ...", flush=True)
+            result = run_level(level, mode, args.jobs, args.duration, fixture_dir, work_dir)
+            results.append(result)
+            print(f"        {result['succeeded']}/{args.jobs} ok in {result['wall_seconds']}s "
+                  f"-> {result['videos_per_hour']} videos/hour")
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n{'mode':<10} {'conc':>4} {'videos/h':>9} {'job s':>7}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['concurrency']:>4} {r['videos_per_hour']!s:>9} {r['mean_job_seconds']:>7}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"meta": _meta(), "duration": args.duration, "results": results}, f, indent=4)
+        print(f"Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
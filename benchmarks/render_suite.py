@@ -0,0 +1,290 @@
+
+"""Render benchmark: create_video / merge_videos / thumbnails over synthetic media fixtures.
+
+Usage (from the repo root):
+    python -m benchmarks.render_suite run [--styles standard cinematic_documentary] [--durations 15 60]
+                                          [--orientations landscape vertical] [--json render_results.json]
+    python -m benchmarks.render_suite compare render_results.json --baseline baseline.json [--threshold 0.10]
+
+Every case runs in its own subprocess so peak RSS is per case; `compare` exits non-zero
+when a case got slower/heavier than the baseline by more than the threshold, or started failing.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import platform
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RENDER_FPS = 24
+CLIP_SECONDS = 5
+# (lavfi source, resolution) pairs: colour bars and full-frame noise at several sizes
+CLIP_SOURCES = [
+    ("smptebars", "854x480"),
+    ("noise", "1280x720"),
+    ("testsrc2", "1920x1080"),
+    ("noise", "1920x1080")
+]
+WORDS = ("value markets empire signal hidden cipher ancient trade route forgotten evidence "
+         "investigators vanished secret night truth kingdom caravan wealth fear").split()
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# --- Fixtures -------------------------------------------------------------
+
+def _ffmpeg():
+    import imageio_ffmpeg
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def make_clip(fixture_dir, source, size, seconds=CLIP_SECONDS):
+    path = os.path.join(fixture_dir, f"{source}_{size}_{seconds}s.mp4")
+    if not os.path.exists(path):
+        if source == "noise":
+            graph = f"color=c=gray:size={size}:rate=25,noise=alls=80:allf=t+u"
+        else:
+            graph = f"{source}=size={size}:rate=25"
+        subprocess.run([_ffmpeg(), "-y", "-loglevel", "error", "-f", "lavfi", "-i", graph,
+                        "-t", str(seconds), "-pix_fmt", "yuv420p", "-c:v", "libx264", "-preset", "ultrafast", path],
+                       check=True)
+    return path
+
+
+def make_voice(fixture_dir, seconds):
+    """Voice-like MP3: a low sine gated into ~2.5 syllables per second."""
+    path = os.path.join(fixture_dir, f"voice_{seconds}s.mp3")
+    if not os.path.exists(path):
+        subprocess.run([_ffmpeg(), "-y", "-loglevel", "error", "-f", "lavfi",
+                        "-i", f"sine=frequency=160:duration={seconds}", "-af", "tremolo=f=2.5:d=0.9,vibrato=f=3:d=0.3",
+                        "-c:a", "libmp3lame", "-b:a", "128k", path], check=True)
+    return path
+
+
+def make_script(seconds, seed=7):
+    """~2.5 spoken words per second, in sentences of 6-14 words."""
+    rng = random.Random(seed + seconds)
+    remaining = int(seconds * 2.5)
+    sentences = []
+    while remaining > 0:
+        n = min(remaining, rng.randint(6, 14))
+        words = [rng.choice(WORDS) for _ in range(n)]
+        sentences.append(" ".join(words).capitalize() + ".")
+        remaining -= n
+    return " ".join(sentences)
+
+
+def build_cases(orientations, styles, durations):
+    cases = []
+    for orientation in orientations:
+        for style in styles:
+            for duration in durations:
+                cases.append({"id": f"create:{orientation}:{style}:{duration}s", "op": "create_video",
+                              "orientation": orientation, "style": style, "duration": duration})
+        for duration in durations:
+            cases.append({"id": f"merge:{orientation}:{duration}s", "op": "merge_videos",
+                          "orientation": orientation, "style": None, "duration": duration})
+    for style in styles:
+        cases.append({"id": f"thumbnail:{style}", "op": "thumbnail", "orientation": "landscape",
+                      "style": style, "duration": None})
+    return cases
+
+
+# --- Single case (runs in a child process) ----------------------------------
+
+def _peak_rss_mb(who):
+    if resource is None:
+        return None
+    kb = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return round(kb / (1024 * 1024) if sys.platform == "darwin" else kb / 1024, 1)
+
+
+def run_case(case, fixture_dir, work_dir):
+    from config import settings
+    from editor.video_maker import VideoEditor
+
+    config = settings.Config()
+    out_dir = os.path.join(work_dir, case["id"].replace(":", "_"))
+    os.makedirs(out_dir, exist_ok=True)
+    vertical = case["orientation"] == "vertical"
+    output = None
+    frames = 0
+
+    # Fixtures are built (or reused) before the clock starts
+    if case["op"] == "create_video":
+        clips = [make_clip(fixture_dir, s, r) for s, r in CLIP_SOURCES]
+        voice = make_voice(fixture_dir, case["duration"])
+    elif case["op"] == "merge_videos":
+        size = "1080x1920" if vertical else "1920x1080"
+        half = max(1, case["duration"] // 2)
+        parts = [make_clip(fixture_dir, "testsrc2", size, half), make_clip(fixture_dir, "noise", size, half)]
+
+    started = time.perf_counter()
+    if case["op"] == "create_video":
+        editor = VideoEditor(output_dir=out_dir, config_styles=config.STYLES)
+        output = editor.create_video(
+            audio_path=voice,
+            video_paths=clips,
+            script_text=make_script(case["duration"]),
+            output_filename="bench.mp4",
+            style=case["style"],
+            vertical=vertical
+        )
+        frames = case["duration"] * RENDER_FPS
+    elif case["op"] == "merge_videos":
+        editor = VideoEditor(output_dir=out_dir, config_styles=config.STYLES)
+        output = editor.merge_videos(parts, "merged.mp4")
+        frames = half * 2 * RENDER_FPS
+    elif case["op"] == "thumbnail":
+        # Backdrop comes from the stand-in image endpoint, so no key or network is needed
+        from benchmarks.standin_server import start_background
+        from core.llm_gateway import configure_gateway
+        from generators.thumbnail_generator import ThumbnailGenerator
+        server = start_background(latency_ms=0, jitter_ms=0)
+        configure_gateway(openai_api_key="standin", openai_base_url=f"{server.url}/v1")
+        config.OPENAI_API_KEY = "standin"
+        config.ASSETS_DIR = out_dir
+        config.OUTPUT_DIR = out_dir
+        output = ThumbnailGenerator(config).generate_thumbnail(f"Benchmark {case['style']}", style=case["style"])
+        server.shutdown()
+    wall = time.perf_counter() - started
+
+    ok = bool(output) and os.path.exists(output)
+    return {
+        **case,
+        "ok": ok,
+        "wall_seconds": round(wall, 3),
+        "render_fps": round(frames / wall, 2) if ok and frames else None,
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        "child_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+        "output_bytes": os.path.getsize(output) if ok else None
+    }
+
+
+# --- Commands ---------------------------------------------------------------
+
+def _meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def cmd_run(args):
+    fixture_dir = args.fixtures or os.path.join(tempfile.gettempdir(), "render_bench_fixtures")
+    work_dir = tempfile.mkdtemp(prefix="render_bench_")
+    os.makedirs(fixture_dir, exist_ok=True)
+
+    results = []
+    for case in build_cases(args.orientations, args.styles, args.durations):
+        print(f"[BENCH] {case['id']} ...", flush=True)
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.render_suite", "_case", json.dumps(case), fixture_dir, work_dir],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("RESULT ")]
+        if lines:
+            result = json.loads(lines[-1][len("RESULT "):])
+        else:
+            result = {**case, "ok": False, "error": (proc.stderr or proc.stdout)[-500:]}
+        results.append(result)
+        if "error" in result:
+            print(f"        FAILED: {result['error'].strip().splitlines()[-1]}")
+        else:
+            print(f"        ok={result['ok']} wall={result['wall_seconds']}s fps={result['render_fps']} "
+                  f"rss={result['peak_rss_mb']}MB out={result['output_bytes']}")
+
+    report = {"meta": _meta(), "cases": results}
+    with open(args.json_path, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {args.json_path}")
+    if not args.keep:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def compare(current, baseline, threshold):
+    """Returns (rows, regressions) comparing case metrics against a baseline report."""
+    base = {c["id"]: c for c in baseline["cases"]}
+    rows, regressions = [], []
+    for case in current["cases"]:
+        ref = base.get(case["id"])
+        if ref is None:
+            continue
+        row = {"id": case["id"]}
+        if ref.get("ok") and not case.get("ok"):
+            regressions.append(f"{case['id']}: now failing")
+        for metric in ("wall_seconds", "peak_rss_mb", "child_peak_rss_mb", "output_bytes"):
+            old, new = ref.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            row[metric] = round(change, 3)
+            if change > threshold:
+                regressions.append(f"{case['id']}: {metric} {old} -> {new} (+{change:.0%})")
+        rows.append(row)
+    return rows, regressions
+
+
+def cmd_compare(args):
+    with open(args.results) as f:
+        current = json.load(f)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    rows, regressions = compare(current, baseline, args.threshold)
+    for row in rows:
+        changes = "  ".join(f"{k}={v:+.1%}" for k, v in row.items() if k != "id")
+        print(f"{row['id']:<45} {changes}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  - {r}")
+        sys.exit(1)
+    print(f"\nNo regressions over {args.threshold:.0%} "
+          f"(baseline {baseline['meta'].get('commit')} -> {current['meta'].get('commit')}).")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "_case":
+        case, fixture_dir, work_dir = json.loads(sys.argv[2]), sys.argv[3], sys.argv[4]
+        print("RESULT " + json.dumps(run_case(case, fixture_dir, work_dir)))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Render the benchmark matrix")
+    run.add_argument("--orientations", nargs="+", default=["landscape", "vertical"])
+    run.add_argument("--styles", nargs="+", default=["standard", "cinematic_documentary"])
+    run.add_argument("--durations", nargs="+", type=int, default=[15, 60])
+    run.add_argument("--fixtures", help="Directory for cached synthetic media")
+    run.add_argument("--json", dest="json_path", default="render_results.json")
+    run.add_argument("--keep", action="store_true", help="Keep rendered outputs")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="Flag regressions against a baseline results file")
+    cmp_.add_argument("results")
+    cmp_.add_argument("--baseline", required=True)
+    cmp_.add_argument("--threshold", type=float, default=0.10)
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+
+"""Offline stand-in for an S3-compatible object store (the subset S3Store and boto3's transfer manager use).
+
+Path-style requests only (http://host:port/<bucket>/<key>), objects kept in memory, no
+authentication (signatures and presigned-URL parameters are accepted and ignored):
+PutObject, multipart uploads (create / upload part / complete / abort), HeadObject,
+GetObject with Range, DeleteObject, ListObjectsV2 and CreateBucket. Buckets are created
+on first write. Request bodies in aws-chunked or chunked transfer encoding are decoded.
+
+Usage (from the repo root):
+    python -m benchmarks.s3_standin [--port 9000] [--latency-ms 0]
+
+Then point the bot at it, e.g.:
+    ARTIFACT_STORE=s3 S3_BUCKET=renders S3_ENDPOINT_URL=http://127.0.0.1:9000
+    AWS_ACCESS_KEY_ID=standin AWS_SECRET_ACCESS_KEY=standin S3_REGION=us-east-1
+"""
+import re
+import sys
+import json
+import time
+import uuid
+import hashlib
+import argparse
+import threading
+from email.utils import formatdate
+from urllib.parse import urlparse, parse_qs, unquote
+from xml.sax.saxutils import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class StoredObject:
+    def __init__(self, data, content_type, etag=None):
+        self.data = data
+        self.content_type = content_type or "application/octet-stream"
+        self.etag = etag or f'"{hashlib.md5(data).hexdigest()}"'
+        self.modified = time.time()
+
+
+def _decode_chunked(raw):
+    """Body of an aws-chunked / chunked request: `<hex size>[;ext]\\r\\n<data>\\r\\n` ... `0` [trailers]."""
+    out, pos = bytearray(), 0
+    while True:
+        end = raw.index(b"\r\n", pos)
+        size = int(raw[pos:end].split(b";")[0], 16)
+        if size == 0:
+            return bytes(out)
+        out += raw[end + 2:end + 2 + size]
+        pos = end + 2 + size + 2
+
+
+class S3StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "S3Standin/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    # --- plumbing -----------------------------------------------------------
+
+    def _target(self):
+        url = urlparse(self.path)
+        parts = url.path.lstrip("/").split("/", 1)
+        bucket = unquote(parts[0])
+        key = unquote(parts[1]) if len(parts) > 1 else ""
+        return bucket, key, {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+
+    def _body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            raw = bytearray()
+            while True:
+                line = self.rfile.readline()
+                size = int(line.split(b";")[0], 16)
+                if size == 0:
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                raw += self.rfile.read(size)
+                self.rfile.readline()
+            body = bytes(raw)
+        else:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if "aws-chunked" in self.headers.get("Content-Encoding", "") or \
+                self.headers.get("x-amz-content-sha256", "").startswith("STREAMING-"):
+            body = _decode_chunked(body)
+        self.server.count("bytes_in", len(body))
+        return body
+
+    def _send(self, status, body=b"", content_type="application/xml", headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-amz-request-id", uuid.uuid4().hex[:16])
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+            self.server.count("bytes_out", len(body))
+
+    def _error(self, status, code, message):
+        self._send(status, f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{code}</Code>'
+                           f'<Message>{escape(message)}</Message></Error>')
+
+    def _op(self, name):
+        self.server.count(name)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    # --- routing ------------------------------------------------------------
+
+    def do_PUT(self):
+        bucket, key, query = self._target()
+        body = self._body()
+        if not key:
+            self._op("CreateBucket")
+            self.server.bucket(bucket)
+            return self._send(200)
+        if "uploadId" in query:
+            self._op("UploadPart")
+            upload = self.server.uploads.get(query["uploadId"])
+            if upload is None:
+                return self._error(404, "NoSuchUpload", "Unknown upload id")
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            with self.server.lock:
+                upload["parts"][int(query["partNumber"])] = (body, etag)
+            return self._send(200, headers={"ETag": etag})
+        self._op("PutObject")
+        obj = StoredObject(body, self.headers.get("Content-Type"))
+        with self.server.lock:
+            self.server.bucket(bucket)[key] = obj
+        self._send(200, headers={"ETag": obj.etag})
+
+    def do_POST(self):
+        bucket, key, query = self._target()
+        body = self._body()
+        if "uploads" in query:
+            self._op("CreateMultipartUpload")
+            upload_id = uuid.uuid4().hex
+            with self.server.lock:
+                self.server.uploads[upload_id] = {"bucket": bucket, "key": key, "parts": {},
+                                                  "content_type": self.headers.get("Content-Type")}
+            return self._send(200, f'<?xml version="1.0" encoding="UTF-8"?><InitiateMultipartUploadResult '
+                                   f'xmlns="{NS}"><Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key>'
+                                   f'<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>')
+        if "uploadId" in query:
+            self._op("CompleteMultipartUpload")
+            with self.server.lock:
+                upload = self.server.uploads.pop(query["uploadId"], None)
+            if upload is None:
+                return self._error(404, "NoSuchUpload", "Unknown upload id")
+            numbers = [int(n) for n in re.findall(r"<PartNumber>(\d+)</PartNumber>", body.decode("utf-8"))]
+            if not numbers or any(n not in upload["parts"] for n in numbers):
+                return self._error(400, "InvalidPart", "A listed part was not uploaded")
+            data = b"".join(upload["parts"][n][0] for n in numbers)
+            digest = hashlib.md5(b"".join(bytes.fromhex(upload["parts"][n][1].strip('"')) for n in numbers))
+            obj = StoredObject(data, upload["content_type"], etag=f'"{digest.hexdigest()}-{len(numbers)}"')
+            with self.server.lock:
+                self.server.bucket(bucket)[key] = obj
+            self.server.count("multipart_parts", len(numbers))
+            return self._send(200, f'<?xml version="1.0" encoding="UTF-8"?><CompleteMultipartUploadResult '
+                                   f'xmlns="{NS}"><Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key>'
+                                   f'<ETag>{escape(obj.etag)}</ETag></CompleteMultipartUploadResult>')
+        self._error(400, "InvalidRequest", "Unsupported POST")
+
+    def do_DELETE(self):
+        bucket, key, query = self._target()
+        if "uploadId" in query:
+            self._op("AbortMultipartUpload")
+            with self.server.lock:
+                self.server.uploads.pop(query["uploadId"], None)
+            return self._send(204)
+        self._op("DeleteObject")
+        with self.server.lock:
+            self.server.bucket(bucket).pop(key, None)
+        self._send(204)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        bucket, key, query = self._target()
+        if not key:
+            return self._list(bucket, query)
+        self._op("HeadObject" if self.command == "HEAD" else "GetObject")
+        with self.server.lock:
+            obj = self.server.bucket(bucket).get(key)
+        if obj is None:
+            return self._error(404, "NoSuchKey", "The specified key does not exist.")
+        headers = {"ETag": obj.etag, "Last-Modified": formatdate(obj.modified, usegmt=True),
+                   "Accept-Ranges": "bytes"}
+        if "response-content-disposition" in query:
+            headers["Content-Disposition"] = query["response-content-disposition"]
+        data, status = obj.data, 200
+        match = re.match(r"bytes=(\d*)-(\d*)$", self.headers.get("Range", ""))
+        if match and (match.group(1) or match.group(2)):
+            size = len(obj.data)
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start, end = max(0, size - int(match.group(2))), size - 1
+            if start >= size or end < start:
+                return self._send(416, headers={"Content-Range": f"bytes */{size}"})
+            data, status = obj.data[start:end + 1], 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        self._send(status, data, obj.content_type, headers)
+
+    def _list(self, bucket, query):
+        self._op("ListObjectsV2")
+        prefix = query.get("prefix", "")
+        max_keys = int(query.get("max-keys") or 1000)
+        after = query.get("continuation-token") or query.get("start-after") or ""
+        with self.server.lock:
+            keys = sorted(k for k in self.server.bucket(bucket) if k.startswith(prefix) and k > after)
+            page = [(k, self.server.bucket(bucket)[k]) for k in keys[:max_keys]]
+        truncated = len(keys) > max_keys
+        contents = "".join(
+            f"<Contents><Key>{escape(k)}</Key><LastModified>"
+            f"{time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(o.modified))}</LastModified>"
+            f"<ETag>{escape(o.etag)}</ETag><Size>{len(o.data)}</Size><StorageClass>STANDARD</StorageClass>"
+            f"</Contents>" for k, o in page)
+        token = f"<NextContinuationToken>{escape(page[-1][0])}</NextContinuationToken>" if truncated else ""
+        self._send(200, f'<?xml version="1.0" encoding="UTF-8"?><ListBucketResult xmlns="{NS}">'
+                        f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix><KeyCount>{len(page)}"
+                        f"</KeyCount><MaxKeys>{max_keys}</MaxKeys><IsTruncated>{str(truncated).lower()}"
+                        f"</IsTruncated>{contents}{token}</ListBucketResult>")
+
+
+class S3StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, verbose=False):
+        super().__init__(address, S3StandinHandler)
+        self.latency = latency_ms / 1000.0
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.uploads = {}
+        self.counters = {}
+
+    def bucket(self, name):
+        return self.buckets.setdefault(name, {})
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stats(self):
+        with self.lock:
+            return {**self.counters, "objects": sum(len(b) for b in self.buckets.values()),
+                    "pending_uploads": len(self.uploads)}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_background(port=0, **kwargs):
+    """Starts an S3 stand-in on a daemon thread (port=0 picks a free port)."""
+    server = S3StandinServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = S3StandinServer((args.host, args.port), latency_ms=args.latency_ms, verbose=args.verbose)
+    print(f"S3 stand-in listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats(), indent=4))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
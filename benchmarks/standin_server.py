@@ -0,0 +1,389 @@
+
+"""Offline stand-in for the OpenAI, Gemini, Pexels, Reddit and Nairaland endpoints the bot calls.
+
+Responses are deterministic (seeded from the request) and need no keys or network:
+chat completions (plain, SSE streaming and JSON-schema output), TTS (synthetic WAV
+speech), image generation (synthetic PNGs), Pexels search + clip downloads (ffmpeg
+test patterns), Reddit top.json and a Nairaland front page.
+
+Usage (from the repo root):
+    python -m benchmarks.standin_server [--port 8765] [--latency-ms 150] [--jitter-ms 50]
+                                        [--error-rate 0.0] [--throttle-rate 0.0] [--seed 7]
+
+Then point the bot at it, e.g.:
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 PEXELS_BASE_URL=http://127.0.0.1:8765
+    GEMINI_BASE_URL=http://127.0.0.1:8765 REDDIT_BASE_URL=http://127.0.0.1:8765
+    NAIRALAND_BASE_URL=http://127.0.0.1:8765/nairaland
+"""
+import io
+import os
+import re
+import sys
+import json
+import math
+import time
+import wave
+import zlib
+import struct
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+import subprocess
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+WORDS = ("the signal vanished beneath an empire of hidden value while markets trembled and "
+         "investigators traced a forgotten cipher across ancient trade routes nobody expected").split()
+SAMPLE_RATE = 16000
+
+
+def _seed(*parts):
+    return int(hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:12], 16)
+
+
+def synthetic_text(prompt, max_tokens=None):
+    """A few deterministic paragraphs (or a single voice name for tiny completions)."""
+    if max_tokens and max_tokens <= 20:
+        return "onyx"
+    rng = random.Random(_seed(prompt))
+    words = min((max_tokens or 400) // 2, 260)
+    paragraphs = []
+    while words > 0:
+        n = min(words, rng.randint(30, 60))
+        sentence = " ".join(rng.choice(WORDS) for _ in range(n))
+        paragraphs.append(sentence[0].upper() + sentence[1:] + ".")
+        words -= n
+    return "\n\n".join(paragraphs)
+
+
+def synthetic_json(schema, prompt, path="root"):
+    """Builds an instance of a JSON schema (strict-mode subset) with deterministic values."""
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][_seed(prompt, path) % len(schema["enum"])]
+    if kind == "object":
+        return {k: synthetic_json(v, prompt, f"{path}.{k}") for k, v in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [synthetic_json(schema.get("items", {}), prompt, f"{path}[{i}]") for i in range(2)]
+    if kind in ("number", "integer"):
+        return _seed(prompt, path) % 100
+    if kind == "boolean":
+        return True
+    if path.endswith("enhanced_script"):
+        # Keep the original script so validation against truncation passes
+        return prompt.split("SCRIPT:", 1)[-1].strip()
+    return synthetic_text(prompt + path, max_tokens=60)
+
+
+def synthetic_wav(text):
+    """Voice-like audio: a pitch-wobbling tone gated into ~2.5 syllables per second."""
+    words = max(1, len(text.split()))
+    duration = min(words / 2.5, 600)
+    frames = int(duration * SAMPLE_RATE)
+    rng = random.Random(_seed(text))
+    base = rng.uniform(110, 180)
+    samples = bytearray()
+    for i in range(frames):
+        t = i / SAMPLE_RATE
+        envelope = max(0.0, math.sin(math.pi * 2.5 * t)) ** 0.5
+        pitch = base * (1 + 0.08 * math.sin(2 * math.pi * 3 * t))
+        value = envelope * 0.4 * math.sin(2 * math.pi * pitch * t)
+        samples += struct.pack("<h", int(value * 32767))
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(bytes(samples))
+    return buffer.getvalue()
+
+
+def synthetic_png(key, width=1024, height=1024):
+    """A seeded two-colour gradient PNG (stdlib only)."""
+    rng = random.Random(_seed(key))
+    a = [rng.randint(0, 255) for _ in range(3)]
+    b = [rng.randint(0, 255) for _ in range(3)]
+    rows = bytearray()
+    for y in range(height):
+        f = y / max(1, height - 1)
+        pixel = bytes(int(a[c] + (b[c] - a[c]) * f) for c in range(3))
+        rows += b"\x00" + pixel * width
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(bytes(rows), 6))
+            + chunk(b"IEND", b""))
+
+
+class ClipCache:
+    """Renders ffmpeg test-pattern clips once per (index, orientation) and serves them from disk."""
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "standin_clips")
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = threading.Lock()
+
+    def get(self, index, orientation="landscape", seconds=6):
+        size = "720x1280" if orientation == "portrait" else "1280x720"
+        path = os.path.join(self.directory, f"clip_{index}_{orientation}.mp4")
+        with self.lock:
+            if not os.path.exists(path):
+                import imageio_ffmpeg
+                source = ["testsrc2", "smptebars", "mandelbrot"][index % 3]
+                subprocess.run([
+                    imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+                    "-f", "lavfi", "-i", f"{source}=size={size}:rate=25",
+                    "-t", str(seconds), "-pix_fmt", "yuv420p", "-c:v", "libx264", "-preset", "ultrafast", path
+                ], check=True)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "StandinServer/1.0"
+
+    # --- plumbing -----------------------------------------------------------
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw) if raw else {}
+        except ValueError:
+            return {}
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        elif isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(self.path, status)
+
+    def _simulate(self):
+        """Applies configured latency; returns False when an injected error was sent instead."""
+        server = self.server
+        with server.lock:
+            roll = server.rng.random()
+            delay = max(0.0, server.latency + server.rng.uniform(-server.jitter, server.jitter))
+        time.sleep(delay)
+        if roll < server.throttle_rate:
+            self._send(429, {"error": {"message": "Rate limit reached (stand-in)"}}, headers={"Retry-After": "1"})
+            return False
+        if roll < server.throttle_rate + server.error_rate:
+            self._send(500, {"error": {"message": "Injected failure (stand-in)"}})
+            return False
+        return True
+
+    def _base(self):
+        return f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address}"
+
+    # --- routing ------------------------------------------------------------
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/health":
+            return self._send(200, {"status": "ok", "requests": self.server.stats()})
+        if not self._simulate():
+            return
+
+        if url.path == "/videos/search" or url.path == "/v1/videos/search":
+            return self._pexels_search(query)
+        match = re.match(r"^/files/video/(\d+)_(\w+)\.mp4$", url.path)
+        if match:
+            try:
+                data = self.server.clips.get(int(match.group(1)), match.group(2))
+            except Exception as e:
+                return self._send(503, {"error": f"ffmpeg unavailable: {e}"})
+            return self._send(200, data, "video/mp4")
+        match = re.match(r"^/files/image/(\w+)\.png$", url.path)
+        if match:
+            return self._send(200, synthetic_png(match.group(1)), "image/png")
+        match = re.match(r"^/r/([^/]+)/top\.json$", url.path)
+        if match:
+            return self._reddit(match.group(1), int(query.get("limit", ["5"])[0]))
+        if url.path.startswith("/nairaland"):
+            return self._nairaland()
+        self._send(404, {"error": f"No stand-in for GET {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self._body()
+        if not self._simulate():
+            return
+
+        if url.path == "/v1/chat/completions":
+            return self._chat(body)
+        if url.path == "/v1/audio/speech":
+            return self._send(200, synthetic_wav(body.get("input", "")), "audio/wav")
+        if url.path == "/v1/images/generations":
+            key = f"{_seed(body.get('prompt', '')):x}"
+            return self._send(200, {"created": int(time.time()),
+                                    "data": [{"url": f"{self._base()}/files/image/{key}.png"}]})
+        match = re.match(r"^/v1beta/models/([^:]+):(generateContent|streamGenerateContent)$", url.path)
+        if match:
+            return self._gemini(body, stream=match.group(2) == "streamGenerateContent")
+        self._send(404, {"error": f"No stand-in for POST {url.path}"})
+
+    # --- providers ----------------------------------------------------------
+
+    def _completion_text(self, prompt, max_tokens, response_format):
+        if isinstance(response_format, dict) and response_format.get("type") == "json_schema":
+            return json.dumps(synthetic_json(response_format["json_schema"]["schema"], prompt))
+        if isinstance(response_format, dict) and response_format.get("type") == "json_object":
+            return json.dumps({"result": synthetic_text(prompt, 60)})
+        return synthetic_text(prompt, max_tokens)
+
+    def _chat(self, body):
+        messages = body.get("messages") or [{}]
+        prompt = messages[-1].get("content", "")
+        text = self._completion_text(prompt, body.get("max_tokens"), body.get("response_format"))
+        model = body.get("model", "gpt-4o")
+
+        if not body.get("stream"):
+            return self._send(200, {
+                "id": "chatcmpl-standin", "object": "chat.completion", "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4}
+            })
+
+        # SSE: one chunk per word, blank lines preserved so paragraph streaming is exercised
+        chunks = re.findall(r"\S+\s*", text)
+        events = [f"data: {json.dumps({'choices': [{'index': 0, 'delta': {'content': c}}]})}\n\n" for c in chunks]
+        events.append("data: [DONE]\n\n")
+        payload = "".join(events).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.count(self.path, 200)
+
+    def _gemini(self, body, stream=False):
+        contents = body.get("contents") or [{}]
+        parts = contents[-1].get("parts") or [{}]
+        prompt = parts[0].get("text", "")
+        config = body.get("generationConfig") or body.get("generation_config") or {}
+        text = synthetic_text(prompt, config.get("maxOutputTokens") or config.get("max_output_tokens"))
+        if (config.get("responseMimeType") or config.get("response_mime_type")) == "application/json":
+            text = json.dumps({"result": text})
+        response = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                    "finishReason": "STOP", "index": 0}]}
+        self._send(200, [response] if stream else response)
+
+    def _pexels_search(self, query):
+        term = query.get("query", [""])[0]
+        per_page = int(query.get("per_page", ["5"])[0])
+        orientation = query.get("orientation", ["landscape"])[0]
+        start = _seed(term) % 50
+        videos = [{
+            "id": start + i,
+            "duration": 6,
+            "video_files": [{"quality": "hd", "link": f"{self._base()}/files/video/{start + i}_{orientation}.mp4"}]
+        } for i in range(per_page)]
+        self._send(200, {"page": 1, "per_page": per_page, "total_results": per_page, "videos": videos})
+
+    def _reddit(self, subreddit, limit):
+        children = []
+        for i in range(limit):
+            title = f"What is the strangest secret you discovered in r/{subreddit}? #{i + 1}"
+            children.append({"kind": "t3", "data": {
+                "title": title,
+                "author": f"standin_user_{i}",
+                "selftext": synthetic_text(title, 300),
+                "created_utc": 1700000000 + i * 3600,
+                "permalink": f"/r/{subreddit}/comments/standin{i}/"
+            }})
+        self._send(200, {"kind": "Listing", "data": {"children": children}})
+
+    def _nairaland(self):
+        rows = "".join(f'<tr><td class="bold"><a href="/topic/{i}">Trending story number {i}</a></td></tr>'
+                       for i in range(10))
+        self._send(200, f"<html><body><table>{rows}</table></body></html>", "text/html")
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=150, jitter_ms=50, error_rate=0.0, throttle_rate=0.0,
+                 seed=7, clip_dir=None, verbose=False):
+        super().__init__(address, StandinHandler)
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.clips = ClipCache(clip_dir)
+        self.verbose = verbose
+        self.counters = {}
+
+    def count(self, path, status):
+        route = re.sub(r"/[^/]+\.(mp4|png)$", "/*", urlparse(path).path)
+        with self.lock:
+            key = f"{route} {status}"
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_background(port=0, **kwargs):
+    """Starts a stand-in server on a daemon thread (port=0 picks a free port)."""
+    server = StandinServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--clip-dir")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = StandinServer((args.host, args.port), latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=args.seed,
+                           clip_dir=args.clip_dir, verbose=args.verbose)
+    print(f"Stand-in services listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats(), indent=4))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
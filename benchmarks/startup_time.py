@@ -0,0 +1,132 @@
+
+"""Cold-start time of the API / bot, with an import-time budget for CI and deploys.
+
+Usage (from the repo root):
+    python -m benchmarks.startup_time [--target api|main] [--runs 5] [--budget-ms 1500]
+                                      [--top 15] [--allow-heavy] [--json startup.json]
+
+Each run is a fresh interpreter (`python -X importtime`), like a Railway boot or a
+Vercel cold start. Reported phases: importing the target (for api.py this includes
+building the shared bot), the first engine build, and which heavy libraries were
+already loaded before anything rendered. Exits non-zero when the median import time
+exceeds --budget-ms or, unless --allow-heavy, when a heavy library loads at startup.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Libraries that only the engines needing them should pull in
+HEAVY = ("moviepy", "numpy", "PIL", "gtts", "praw", "google.generativeai", "bs4", "imageio_ffmpeg")
+
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import {target}
+imported = time.perf_counter()
+bot = {target}.bot if hasattr({target}, "bot") else {target}.get_bot()
+built = time.perf_counter()
+bot.script_engine
+first_engine = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "bot_ms": (built - imported) * 1000,
+    "first_engine_ms": (first_engine - built) * 1000,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+    "engines_loaded": bot.engines.loaded()
+}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Top-level imports and their direct imports from `-X importtime` output as {module: cumulative ms}."""
+    top = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth > 1 or not cumulative.strip().isdigit():
+            continue
+        top[name.strip()] = int(cumulative) / 1000
+    return top
+
+
+def run_once(target, workdir):
+    env = dict(os.environ, OUTPUT_DIR=os.path.join(workdir, "output"), ASSETS_DIR=os.path.join(workdir, "assets"))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE.format(target=target, heavy=HEAVY)],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Probe failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default="api", choices=["api", "main"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Max median import time of the target")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--allow-heavy", action="store_true", help="Don't fail when heavy libraries load at startup")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="startup_time_")
+    # One warm-up run so .pyc compilation doesn't count against the budget
+    run_once(args.target, workdir)
+    runs = [run_once(args.target, workdir) for _ in range(args.runs)]
+
+    def median(key):
+        return round(statistics.median(r[key] for r in runs), 1)
+
+    imports = {}
+    for r in runs:
+        for name, ms in r["imports"].items():
+            if name == args.target:
+                continue
+            imports.setdefault(name, []).append(ms)
+    slowest = sorted(((statistics.median(v), k) for k, v in imports.items()), reverse=True)[:args.top]
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+    report = {
+        "target": args.target,
+        "runs": args.runs,
+        "import_ms": median("import_ms"),
+        "bot_ms": median("bot_ms"),
+        "first_engine_ms": median("first_engine_ms"),
+        "budget_ms": args.budget_ms,
+        "heavy_at_startup": heavy,
+        "engines_loaded_at_startup": runs[0]["engines_loaded"],
+        "slowest_imports_ms": {k: round(ms, 1) for ms, k in slowest}
+    }
+
+    print(f"import {args.target}: {report['import_ms']} ms (budget {args.budget_ms:.0f} ms), "
+          f"bot: {report['bot_ms']} ms, first engine: {report['first_engine_ms']} ms  [median of {args.runs}]")
+    print(f"Heavy libraries loaded at startup: {', '.join(heavy) or 'none'}")
+    print("Slowest imports:")
+    for ms, name in slowest:
+        print(f"  {ms:>8.1f} ms  {name}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Results written to {args.json_path}")
+
+    failures = []
+    if report["import_ms"] > args.budget_ms:
+        failures.append(f"import time {report['import_ms']} ms is over the {args.budget_ms:.0f} ms budget")
+    if heavy and not args.allow_heavy:
+        failures.append(f"heavy libraries imported at startup: {', '.join(heavy)}")
+    for failure in failures:
+        print(f"[BUDGET] FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+
+"""Measures how often the local ToneClassifier agrees with the LLM's analyze_tone.
+
+Usage (from the repo root):
+    python -m benchmarks.tone_agreement [scripts_dir ...] [--threshold 0.35] [--json results.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from core.llm_gateway import configure_gateway
+from generators.script_writer import ScriptWriter
+
+
+def load_scripts(paths):
+    """Collects stored scripts (.txt/.md files, or the 'script' field of *_brief.json files)."""
+    scripts = {}
+    for root in paths:
+        if not os.path.isdir(root):
+            continue
+        for name in sorted(os.listdir(root)):
+            path = os.path.join(root, name)
+            if name.endswith((".txt", ".md")):
+                with open(path, "r", encoding="utf-8") as f:
+                    scripts[path] = f.read()
+            elif name.endswith("_brief.json"):
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("enhanced_script"):
+                    scripts[path] = data["enhanced_script"]
+    return scripts
+
+
+def evaluate(writer, scripts, threshold):
+    rows = []
+    for path, text in scripts.items():
+        started = time.perf_counter()
+        local = writer.tone_classifier.classify(text)
+        local_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        llm_voice = writer.analyze_tone_llm(text)
+        llm_ms = (time.perf_counter() - started) * 1000
+
+        rows.append({
+            "script": path,
+            "local_voice": local["voice"],
+            "llm_voice": llm_voice,
+            "confidence": local["confidence"],
+            "escalated": local["confidence"] < threshold,
+            "agree": local["voice"] == llm_voice,
+            "local_ms": round(local_ms, 2),
+            "llm_ms": round(llm_ms, 1)
+        })
+
+    confident = [r for r in rows if not r["escalated"]]
+    return {
+        "threshold": threshold,
+        "scripts": len(rows),
+        "agreement": round(sum(r["agree"] for r in rows) / len(rows), 3) if rows else None,
+        "agreement_when_confident": round(sum(r["agree"] for r in confident) / len(confident), 3) if confident else None,
+        "escalation_rate": round(1 - len(confident) / len(rows), 3) if rows else None,
+        "avg_local_ms": round(sum(r["local_ms"] for r in rows) / len(rows), 2) if rows else None,
+        "avg_llm_ms": round(sum(r["llm_ms"] for r in rows) / len(rows), 1) if rows else None,
+        "confusion": dict(Counter(f"{r['local_voice']}->{r['llm_voice']}" for r in rows if not r["agree"])),
+        "rows": rows
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dirs", nargs="*", default=["scripts"])
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    config = settings.Config()
+    threshold = args.threshold if args.threshold is not None else config.TONE_CLASSIFIER_THRESHOLD
+    configure_gateway(openai_api_key=config.OPENAI_API_KEY, gemini_api_key=config.GEMINI_API_KEY)
+    writer = ScriptWriter(api_key=config.OPENAI_API_KEY, gemini_api_key=config.GEMINI_API_KEY,
+                          use_cache=False, tone_threshold=threshold)
+
+    scripts = load_scripts(args.dirs + [config.OUTPUT_DIR])
+    if not scripts:
+        print("No stored scripts found.")
+        return
+
+    report = evaluate(writer, scripts, threshold)
+    for r in report["rows"]:
+        mark = "OK " if r["agree"] else "XX "
+        print(f"{mark}{os.path.basename(r['script']):<40} local={r['local_voice']:<8} "
+              f"llm={r['llm_voice']:<8} conf={r['confidence']:.2f}")
+    print(f"\nAgreement: {report['agreement']} | when confident: {report['agreement_when_confident']} "
+          f"| escalation rate: {report['escalation_rate']}")
+    print(f"Latency: local {report['avg_local_ms']} ms vs LLM {report['avg_llm_ms']} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,21 @@ class Config:
         "GOOGLE_SERVICE_ACCOUNT_JSON",
         "OUTPUT_DIR",
         "ASSETS_DIR",
+        "OPENAI_BASE_URL",
+        "GEMINI_BASE_URL",
+        "PEXELS_BASE_URL",
+        "REDDIT_BASE_URL",
+        "NAIRALAND_BASE_URL",
+        "COORDINATOR_URL",
+        "COORDINATOR_TOKEN",
+        "COORDINATOR_HOST",
+        "ARTIFACT_STORE",
+        "S3_BUCKET",
+        "S3_PREFIX",
+        "S3_ENDPOINT_URL",
+        "S3_REGION",
+        "S3_ACCESS_KEY_ID",
+        "S3_SECRET_ACCESS_KEY",
     ]
 
     def __init__(self, config_file="config/settings.json"):
@@ -40,6 +55,136 @@ class Config:
             "STOCK_DIR": "assets/stock",
             "DOC_TITLE_TEMPLATE": "VALUES THAT MATTERS: {title}",
             "CHAPTER_LENGTH_MINUTES": 5,
+            # Service endpoints (point these at benchmarks/standin_server.py for offline runs)
+            "OPENAI_BASE_URL": "https://api.openai.com/v1",
+            "GEMINI_BASE_URL": "",
+            "PEXELS_BASE_URL": "https://api.pexels.com",
+            "REDDIT_BASE_URL": "https://www.reddit.com",
+            "NAIRALAND_BASE_URL": "https://www.nairaland.com",
+            "LLM_TIMEOUT_SECONDS": 60,
+            "LLM_CACHE_ENABLED": True,
+            "LLM_CACHE_BYPASS": False,
+            "LLM_CACHE_TTL_HOURS": 168,
+            "LLM_CACHE_MAX_MB": 64,
+            "LLM_MAX_RETRIES": 3,
+            # Overrides for core.rate_limiter.DEFAULT_LIMITS, e.g. {"openai:chat": {"rpm": 60, "tpm": 30000}}
+            "RATE_LIMITS": {},
+            "PIPELINE_MAX_WORKERS": 4,
+            "PRODUCTION_BRIEF_MODE": False,
+            "PRODUCTION_BRIEF_EXTRAS": True,
+            "TONE_CLASSIFIER_THRESHOLD": 0.35,
+            "STREAMING_TTS": True,
+            "TRACING_ENABLED": True,
+            # JSONL span log; empty means OUTPUT_DIR/traces.jsonl
+            "TRACE_FILE": "",
+            # Sampling CPU profiler: fraction of jobs profiled without asking, sample interval, summary size
+            "PROFILE_SAMPLE_RATE": 0.0,
+            "PROFILE_INTERVAL_MS": 10,
+            "PROFILE_TOP_N": 25,
+            # Also profile worker processes spawned by a profiled job
+            "PROFILE_WORKERS": False,
+            # Render admission: MB for concurrent renders (0 = 80% of the container limit)
+            "RENDER_MEMORY_BUDGET_MB": 0,
+            "RENDER_ADMISSION_TIMEOUT": 900,
+            # Drop to 720p without grain instead of waiting when the full render doesn't fit
+            "RENDER_LEAN_FALLBACK": True,
+            # CPU slots: concurrent renders (0 = cores / RENDER_MIN_THREADS), each pinned to its own cores
+            "RENDER_MAX_CONCURRENT": 0,
+            "RENDER_MIN_THREADS": 2,
+            "RENDER_CPU_AFFINITY": True,
+            # Index of rendered videos behind /api/videos (SQLite; empty means OUTPUT_DIR/catalog.db)
+            "CATALOG_DB": "",
+            # Streaming previews built when a render finishes (OUTPUT_DIR/previews): HLS ladder by short
+            # side, segment length, and one scrub-sprite tile every PREVIEW_SPRITE_INTERVAL seconds
+            "PREVIEWS_ENABLED": True,
+            "PREVIEW_LADDER": [
+                {"name": "360p", "height": 360, "video_kbps": 500, "audio_kbps": 64},
+                {"name": "540p", "height": 540, "video_kbps": 1000, "audio_kbps": 96}
+            ],
+            "PREVIEW_SEGMENT_SECONDS": 2,
+            "PREVIEW_SPRITE_INTERVAL": 2,
+            # Per-job scratch directories for intermediates (empty means ASSETS_DIR/workspaces), removed when
+            # the job succeeds; AI images are also kept in ASSETS_DIR/cache/artifacts for identical prompts
+            "WORKSPACE_DIR": "",
+            "ARTIFACT_CACHE_ENABLED": True,
+            # Artifact store: "local" keeps renders and assets on this disk; "s3" also uploads finished renders
+            # to an S3-compatible bucket (S3_ENDPOINT_URL for MinIO/R2/the stand-in; empty keys use the AWS
+            # credential chain), serves downloads from presigned URLs and reads stock/ and music/ from it
+            "ARTIFACT_STORE": "local",
+            "S3_BUCKET": "",
+            "S3_PREFIX": "",
+            "S3_ENDPOINT_URL": "",
+            "S3_REGION": "",
+            "S3_ACCESS_KEY_ID": "",
+            "S3_SECRET_ACCESS_KEY": "",
+            # Multipart part size (uploads above it are split) and parts in flight; presigned URL lifetime
+            "S3_MULTIPART_MB": 16,
+            "S3_MAX_CONCURRENCY": 8,
+            "S3_URL_EXPIRY": 3600,
+            # Local read-through cache of objects pulled from the bucket (empty means ASSETS_DIR/cache/store)
+            "S3_CACHE_DIR": "",
+            # Disk garbage collector run by the API every DISK_GC_INTERVAL seconds (0 = off): per area, entries
+            # unused for max_age_hours go, then least recently used ones until the area is under max_mb
+            "DISK_GC_INTERVAL": 900,
+            "DISK_QUOTAS": {
+                "workspaces": {"max_age_hours": 72, "max_mb": 10240},
+                "artifact_cache": {"max_age_hours": 720, "max_mb": 2048},
+                "legacy_intermediates": {"max_age_hours": 24},
+                "store_cache": {"max_age_hours": 168, "max_mb": 5120},
+                "previews": {}
+            },
+            # Persistent job queue (SQLite; empty means OUTPUT_DIR/jobs.db) and its worker processes
+            "JOB_DB": "",
+            # Worker processes the API starts and supervises; 0 = run `python -m core.job_worker` yourself
+            "JOB_WORKERS": 2,
+            # Max jobs of a type running at once across all workers (unlisted types: no limit)
+            "JOB_TYPE_LIMITS": {"long": 1, "bulk": 1, "music": 1},
+            # Default priority per job type; higher runs first
+            "JOB_PRIORITIES": {"custom": 10, "niche": 5, "long": 5, "intl": 3, "test": 3, "music": 3, "bulk": 0},
+            "JOB_HEARTBEAT_TIMEOUT": 120,
+            "JOB_CANCEL_GRACE": 30,
+            "JOB_MAX_ATTEMPTS": 3,
+            # How often the API turns job heartbeats into /api/events pushes (one poll shared by all dashboards)
+            "JOB_EVENTS_INTERVAL": 1.0,
+            # Minimum share of a node a worker process must offer to take a job type ("*": all other types),
+            # e.g. {"long": {"cores": 4, "memory_mb": 4096}}; empty lets any worker take anything
+            "JOB_REQUIREMENTS": {},
+            # API: threads for blocking engine calls, and per endpoint group the calls allowed at once,
+            # seconds before a 504 and seconds a request may wait for a slot before a 429
+            "API_OFFLOAD_WORKERS": 16,
+            "API_ENDPOINT_LIMITS": {
+                "script": {"concurrency": 4, "timeout": 120, "queue_timeout": 10},
+                "planning": {"concurrency": 4, "timeout": 90, "queue_timeout": 5},
+                "analytics": {"concurrency": 2, "timeout": 60, "queue_timeout": 5},
+                "engage": {"concurrency": 4, "timeout": 45, "queue_timeout": 5},
+                "publish": {"concurrency": 2, "timeout": 300, "queue_timeout": 5},
+                "default": {"concurrency": 8, "timeout": 30, "queue_timeout": 5}
+            },
+            # Dashboard read endpoints: seconds a response is served as is ("ttl"), then seconds it is still
+            # served while refreshing in the background ("stale")
+            "API_CACHE_POLICIES": {
+                "videos": {"ttl": 5, "stale": 60},
+                "calendar": {"ttl": 60, "stale": 600},
+                "health": {"ttl": 30, "stale": 300},
+                "trending": {"ttl": 900, "stale": 3600},
+                "pivot": {"ttl": 3600, "stale": 86400}
+            },
+            # Multi-node: workers with COORDINATOR_URL take jobs over HTTP from core.coordinator;
+            # COORDINATOR_PORT > 0 makes the API serve one itself, on COORDINATOR_HOST (empty means every
+            # interface when COORDINATOR_TOKEN is set, loopback otherwise; other nodes need the token)
+            "COORDINATOR_URL": "",
+            "COORDINATOR_PORT": 0,
+            "COORDINATOR_HOST": "",
+            "COORDINATOR_TOKEN": "",
+            # Per-job stage manifests (OUTPUT_DIR/manifests) so restarted jobs skip finished stages
+            "CHECKPOINTS_ENABLED": True,
+            # Bulk/niche batches: overlap script/TTS/media of later videos with earlier renders
+            "BATCH_PIPELINED": True,
+            "BATCH_SCRIPT_CONCURRENCY": 1,
+            "BATCH_PREPARE_CONCURRENCY": 2,
+            "BATCH_RENDER_CONCURRENCY": 1,
+            # Videos prepared ahead of the renderer (backpressure between stages)
+            "BATCH_QUEUE_SIZE": 2,
             "STYLES": {
                 "cinematic_documentary": {
                     "font": "Courier-Bold", "fontsize": 60, "color": "white", "pos": "bottom", "grain": True, "vignette": True,
@@ -0,0 +1,240 @@
+
+"""Where finished renders and the shared asset library live: the local disk, or an S3-compatible bucket.
+
+LocalStore (the default) keeps today's behaviour: renders stay in OUTPUT_DIR, stock and
+music in ASSETS_DIR. S3Store (ARTIFACT_STORE="s3": AWS, MinIO, R2...) additionally
+uploads every finished master, serves downloads from presigned URLs, and reads stock
+clips, music and cached intermediates from the bucket through a local read-through
+cache, so ephemeral disks (Vercel's /tmp) and separate worker nodes share one library.
+Bucket layout: videos/<render>.mp4, stock/<clip>, music/<category>/<track>.mp3, cache/<key>.
+"""
+import os
+import time
+import hashlib
+import mimetypes
+import threading
+
+from core.tracing import span, get_metrics
+
+
+class LocalStore:
+    """Everything stays on the local filesystem; the callers' own paths are the store."""
+
+    remote = False
+
+    def upload(self, path, key):
+        return None
+
+    def fetch(self, key):
+        return None
+
+    def exists(self, key):
+        return False
+
+    def list(self, prefix):
+        return []
+
+    def presigned_url(self, key, filename=None):
+        return None
+
+    def stats(self):
+        return {"backend": "local"}
+
+
+def _not_found(error):
+    """True for a botocore ClientError saying the object doesn't exist."""
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+class S3Store:
+    """S3-compatible backend with parallel multipart uploads and a local read-through cache.
+
+    Uploads go through boto3's transfer manager: objects above `part_size_mb` are sent
+    as multipart uploads with up to `max_concurrency` parts in flight. Reads land in
+    `cache_dir` (flat, one file per object, mtime refreshed on every hit) so a clip or
+    track is downloaded once per node; core.disk_gc keeps that directory within its quota.
+    """
+
+    remote = True
+
+    def __init__(self, bucket, cache_dir, prefix="", endpoint_url=None, region=None, access_key=None,
+                 secret_key=None, part_size_mb=16, max_concurrency=8, url_expiry=3600, list_ttl=300):
+        self.bucket = bucket
+        self.cache_dir = cache_dir
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.endpoint_url = endpoint_url or None
+        self.region = region or None
+        self.access_key = access_key or None
+        self.secret_key = secret_key or None
+        self.part_size = int(part_size_mb * 1024 * 1024)
+        self.max_concurrency = max_concurrency
+        self.url_expiry = url_expiry
+        self.list_ttl = list_ttl
+        self.lock = threading.Lock()
+        # One download per object at a time; concurrent readers wait for it
+        self.fetching = {}
+        self.listings = {}
+        self.counters = {"uploads": 0, "upload_bytes": 0, "upload_failures": 0, "cache_hits": 0,
+                         "cache_misses": 0, "download_bytes": 0}
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            from botocore.config import Config
+            # Path-style addressing for custom endpoints (MinIO, the local stand-in); boto3 clients are thread-safe
+            config = Config(s3={"addressing_style": "path"} if self.endpoint_url else {},
+                            retries={"max_attempts": 5, "mode": "standard"},
+                            max_pool_connections=max(10, self.max_concurrency * 2))
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url, region_name=self.region,
+                                        aws_access_key_id=self.access_key, aws_secret_access_key=self.secret_key,
+                                        config=config)
+        return self._client
+
+    def _transfer_config(self):
+        from boto3.s3.transfer import TransferConfig
+        return TransferConfig(multipart_threshold=self.part_size, multipart_chunksize=self.part_size,
+                              max_concurrency=self.max_concurrency, use_threads=True)
+
+    def _key(self, key):
+        return self.prefix + key.lstrip("/")
+
+    def _count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    # --- Writes -------------------------------------------------------------------
+
+    def upload(self, path, key):
+        """Uploads a local file (multipart in parallel when large); returns the key, or None on failure."""
+        size = os.path.getsize(path)
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        try:
+            with span("store.upload", bytes=size, multipart=size > self.part_size) as s:
+                started = time.perf_counter()
+                self.client.upload_file(path, self.bucket, self._key(key), ExtraArgs={"ContentType": content_type},
+                                        Config=self._transfer_config())
+                elapsed = time.perf_counter() - started
+                s.set(mb_per_s=round(size / 1e6 / elapsed, 1) if elapsed else None)
+        except Exception as e:
+            # The render itself is safe on local disk; the next upload of it (or a manual sync) retries
+            self._count("upload_failures")
+            print(f"[STORE] Could not upload {os.path.basename(path)} to s3://{self.bucket}/{self._key(key)}: {e}")
+            return None
+        self._count("uploads")
+        self._count("upload_bytes", size)
+        get_metrics().inc("store_upload_bytes_total", amount=size, help_text="Bytes uploaded to the artifact store")
+        with self.lock:
+            self.listings.clear()
+        return key
+
+    # --- Reads --------------------------------------------------------------------
+
+    def cache_path(self, key):
+        digest = hashlib.sha256(self._key(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}_{os.path.basename(key)}")
+
+    def fetch(self, key):
+        """Local path of the object, downloaded into the read-through cache on first use; None if missing."""
+        local = self.cache_path(key)
+        while True:
+            try:
+                os.utime(local)
+                self._count("cache_hits")
+                return local
+            except OSError:
+                pass
+            with self.lock:
+                pending = self.fetching.get(local)
+                if pending is None:
+                    pending = self.fetching[local] = threading.Event()
+                    break
+            pending.wait()
+
+        try:
+            self._count("cache_misses")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{local}.{os.getpid()}.{threading.get_ident()}.part"
+            try:
+                with span("store.fetch"):
+                    self.client.download_file(self.bucket, self._key(key), tmp, Config=self._transfer_config())
+            except Exception as e:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                if not _not_found(e):
+                    print(f"[STORE] Could not fetch {key}: {e}")
+                return None
+            self._count("download_bytes", os.path.getsize(tmp))
+            os.replace(tmp, local)
+            return local
+        finally:
+            with self.lock:
+                self.fetching.pop(local).set()
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except Exception as e:
+            if _not_found(e):
+                return False
+            raise
+
+    def list(self, prefix):
+        """Keys under `prefix` (without the store prefix); listings are cached for `list_ttl` seconds."""
+        with self.lock:
+            cached = self.listings.get(prefix)
+        if cached and time.time() - cached[0] < self.list_ttl:
+            return cached[1]
+        keys = []
+        try:
+            for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket,
+                                                                             Prefix=self._key(prefix)):
+                keys += [o["Key"][len(self.prefix):] for o in page.get("Contents", [])]
+        except Exception as e:
+            print(f"[STORE] Could not list {prefix}: {e}")
+            return cached[1] if cached else []
+        with self.lock:
+            self.listings[prefix] = (time.time(), keys)
+        return keys
+
+    def presigned_url(self, key, filename=None):
+        """Time-limited GET URL (downloaded as `filename`), or None when the object isn't in the bucket
+        or the bucket can't be reached (callers then serve their local copy)."""
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        try:
+            if not self.exists(key):
+                return None
+            return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=self.url_expiry)
+        except Exception as e:
+            print(f"[STORE] Could not presign {key}: {e}")
+            return None
+
+    def stats(self):
+        with self.lock:
+            return {"backend": "s3", "bucket": self.bucket, "prefix": self.prefix, "endpoint": self.endpoint_url,
+                    "part_size_mb": self.part_size / 1024 / 1024, "max_concurrency": self.max_concurrency,
+                    "cache_dir": self.cache_dir, **self.counters}
+
+
+_store = LocalStore()
+
+
+def get_artifact_store():
+    return _store
+
+
+def configure_artifact_store(backend="local", cache_dir=None, **s3):
+    """backend "s3" needs bucket=...; the other keyword arguments are S3Store's."""
+    global _store
+    if backend == "s3":
+        if not s3.get("bucket"):
+            raise ValueError("ARTIFACT_STORE is 's3' but S3_BUCKET is empty")
+        _store = S3Store(cache_dir=cache_dir, **s3)
+    else:
+        _store = LocalStore()
+    return _store
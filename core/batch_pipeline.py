@@ -0,0 +1,129 @@
+
+import time
+import queue
+import threading
+import contextvars
+
+_DONE = object()
+
+
+class BatchPipeline:
+    """Streams a batch of items through ordered stages, each on its own worker threads.
+
+    Stages are joined by bounded queues, so a fast stage (scripts, TTS, downloads) can
+    only run `queue_size` items ahead of a slow one (rendering) before it blocks. A
+    stage function receives the previous stage's value and returns the next one;
+    returning None or raising drops that item without stopping the batch. A BaseException
+    (JobCancelled) stops it instead: the stages drain and shut down, then run() re-raises it.
+    """
+
+    def __init__(self, name="batch", queue_size=2):
+        self.name = name
+        self.queue_size = max(1, queue_size)
+        self.stages = []
+        self.stats = {}
+        self.wall = 0.0
+
+    def add(self, name, fn, workers=1):
+        self.stages.append((name, fn, max(1, workers)))
+        self.stats[name] = {"workers": max(1, workers), "items": 0, "failed": 0, "busy": 0.0, "starved": 0.0,
+                            "blocked": 0.0}
+        return self
+
+    def run(self, items):
+        """Returns one result per input item (the last stage's value, or None if dropped)."""
+        items = list(items)
+        results = [None] * len(items)
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [workers for _, _, workers in self.stages]
+        lock = threading.Lock()
+        aborted = []
+
+        def worker(i):
+            name, fn, _ = self.stages[i]
+            stats = self.stats[name]
+            last = i == len(self.stages) - 1
+            try:
+                while True:
+                    waited = time.perf_counter()
+                    entry = queues[i].get()
+                    with lock:
+                        stats["starved"] += time.perf_counter() - waited
+                    if entry is _DONE:
+                        break
+                    if aborted:
+                        # Drain without working so the stages upstream never block on a full queue
+                        continue
+                    index, value = entry
+                    started = time.perf_counter()
+                    try:
+                        value = fn(value)
+                    except Exception as e:
+                        print(f"[BATCH] {name} failed for item {index + 1}: {e}")
+                        value = None
+                    except BaseException as e:
+                        # Cancellation (JobCancelled) or an interrupt stops the whole batch; run() re-raises it
+                        with lock:
+                            aborted.append(e)
+                        continue
+                    with lock:
+                        stats["busy"] += time.perf_counter() - started
+                        stats["items"] += 1
+                        stats["failed"] += value is None
+                    if value is None:
+                        continue
+                    if last:
+                        results[index] = value
+                        continue
+                    blocked = time.perf_counter()
+                    queues[i + 1].put((index, value))
+                    with lock:
+                        stats["blocked"] += time.perf_counter() - blocked
+            finally:
+                # The last worker of a stage closes the next one
+                with lock:
+                    remaining[i] -= 1
+                    closing = remaining[i] == 0 and not last
+                if closing:
+                    for _ in range(self.stages[i + 1][2]):
+                        queues[i + 1].put(_DONE)
+
+        threads = []
+        for i, (name, _, workers) in enumerate(self.stages):
+            for n in range(workers):
+                # Each thread gets its own copy of the caller's context (trace, job, profiler)
+                ctx = contextvars.copy_context()
+                thread = threading.Thread(target=ctx.run, args=(worker, i), name=f"{self.name}-{name}-{n}",
+                                          daemon=True)
+                threads.append(thread)
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for entry in enumerate(items):
+            if aborted:
+                break
+            queues[0].put(entry)
+        for _ in range(self.stages[0][2]):
+            queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+        self.wall = time.perf_counter() - started
+        if aborted:
+            raise aborted[0]
+        return results
+
+    def utilization(self, name):
+        s = self.stats[name]
+        return s["busy"] / (s["workers"] * self.wall) if self.wall else 0.0
+
+    def summary(self, completed=None):
+        """Per-stage utilization (busy / workers x wall) and overall videos per hour."""
+        lines = [f"  {'stage':<10} {'workers':>7} {'items':>5} {'failed':>6} {'busy':>6} {'starved':>8} {'blocked':>8}"]
+        for name, _, _ in self.stages:
+            s = self.stats[name]
+            lines.append(f"  {name:<10} {s['workers']:>7} {s['items']:>5} {s['failed']:>6} "
+                         f"{self.utilization(name):>6.0%} {s['starved']:>7.1f}s {s['blocked']:>7.1f}s")
+        if completed is not None and self.wall:
+            lines.append(f"  {completed} videos in {self.wall:.1f}s ({completed / self.wall * 3600:.1f} videos/hour)")
+        return "\n".join(lines)
@@ -0,0 +1,131 @@
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+_digest_lock = threading.Lock()
+# path -> (size, mtime_ns, sha256); big renders are only re-hashed when they change on disk
+_digests = {}
+
+
+def file_digest(path):
+    """sha256 of a file's content, or None when it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    with _digest_lock:
+        cached = _digests.get(path)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    with _digest_lock:
+        _digests[path] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+
+def _is_file(value):
+    return isinstance(value, str) and len(value) < 1024 and os.path.isfile(value)
+
+
+def artifact_paths(value):
+    """Local files referenced by a stage result (a path, or paths nested in lists/dicts)."""
+    if _is_file(value):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [p for v in value for p in artifact_paths(v)]
+    if isinstance(value, dict):
+        return [p for v in value.values() for p in artifact_paths(v)]
+    return []
+
+
+def _with_digests(value):
+    """Replaces file paths by (path, content hash) so a changed input file changes the key."""
+    if _is_file(value):
+        return [value, file_digest(value)]
+    if isinstance(value, (list, tuple)):
+        return [_with_digests(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _with_digests(v) for k, v in value.items()}
+    return value
+
+
+def inputs_key(*parts):
+    material = json.dumps(_with_digests(list(parts)), sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class JobManifest:
+    """Per-job record of stage artifacts, used to resume a job after a crash.
+
+    Each stage is stored with the hash of its inputs (job parameters plus upstream
+    results, with referenced files hashed by content), its JSON result and the content
+    hashes of the files that result points to. A stage is reused only when its inputs
+    hash the same and every artifact file is still there, unchanged.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {"stages": {}}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+                self.data.setdefault("stages", {})
+            except (OSError, ValueError) as e:
+                print(f"[CHECKPOINT] Ignoring unreadable manifest {path}: {e}")
+
+    def lookup(self, stage, key):
+        """(True, result) when the stage can be skipped, else (False, None)."""
+        with self.lock:
+            entry = self.data["stages"].get(stage)
+        if not entry or entry.get("inputs") != key:
+            return False, None
+        for path, digest in entry.get("files", {}).items():
+            if file_digest(path) != digest:
+                return False, None
+        return True, entry.get("result")
+
+    def record(self, stage, key, result):
+        try:
+            json.dumps(result)
+        except (TypeError, ValueError):
+            return
+        entry = {
+            "inputs": key,
+            "result": result,
+            "files": {p: file_digest(p) for p in artifact_paths(result)},
+            "at": round(time.time(), 3)
+        }
+        with self.lock:
+            self.data["stages"][stage] = entry
+            self._save()
+
+    def _save(self):
+        # Written atomically so a crash mid-write never leaves a corrupt manifest
+        tmp = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2, default=str)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[CHECKPOINT] Could not save manifest: {e}")
+
+    def step(self, stage, key, fn):
+        """Returns the recorded result for (stage, key) or runs fn() and records it."""
+        hit, result = self.lookup(stage, key)
+        if hit:
+            print(f"[CHECKPOINT] Reusing '{stage}' from {os.path.basename(self.path)}")
+            return result
+        result = fn()
+        if result is not None:
+            self.record(stage, key, result)
+        return result
@@ -0,0 +1,413 @@
+
+"""HTTP coordinator that lets render workers on other machines share the job queue.
+
+Run it next to the job database with `python -m core.coordinator [--port 8790]` (or
+set COORDINATOR_PORT and the API starts one), then start workers anywhere with
+`python -m core.job_worker --coordinator http://host:8790`. The coordinator is the
+only process that touches SQLite: it leases jobs to workers whose advertised cores
+and memory fit the job type, takes heartbeats, requeues jobs whose worker went quiet
+and stores the files each job produced in its own OUTPUT_DIR.
+
+Without COORDINATOR_TOKEN it only listens on loopback: anyone who can reach it can
+enqueue jobs, so binding a network interface requires the token.
+
+Routes (JSON unless noted; X-Coordinator-Token required when COORDINATOR_TOKEN is set):
+    POST /workers/register           {"worker", "host", "cores", "memory_mb", ...}
+    POST /claim                      {"worker", "types", "capacity"} -> job, or 204
+    POST /jobs/<id>/heartbeat        {"worker", "progress", "message", "detail"} -> {"cancel": bool}
+    PUT  /jobs/<id>/artifacts/<name> raw file body (X-Worker-Id) -> {"path"}
+    POST /jobs/<id>/finish           {"worker", "status", "result", "error", "message", "artifacts"}
+    POST /jobs  GET /jobs  GET /jobs/<id>  POST /jobs/<id>/cancel  GET /workers  GET /health
+"""
+import os
+import re
+import sys
+import json
+import hmac
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse, parse_qs, quote, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.job_worker import JOB_HANDLERS
+from core.video_catalog import get_catalog
+from core.previews import get_preview_builder, backfill
+
+_JOB_ROUTE = re.compile(r"^/jobs/([0-9a-f]+)(?:/(heartbeat|finish|cancel|artifacts/([^/]+)))?$")
+
+
+def _safe_name(name):
+    """An artifact file name, or None when it would escape OUTPUT_DIR."""
+    name = os.path.basename(name or "")
+    return name if name and name not in (".", "..") and not name.startswith(".") else None
+
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "JobCoordinator/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            return {}
+        return body if isinstance(body, dict) else {}
+
+    def _missing(self, body, *keys):
+        """Sends a 400 naming the required keys absent from `body`; True when it did."""
+        missing = [k for k in keys if not body.get(k)]
+        if missing:
+            self._send(400, {"error": f"missing {', '.join(missing)}"})
+        return bool(missing)
+
+    def _send(self, status, body=None):
+        data = json.dumps(body, default=str).encode() if body is not None else b""
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self):
+        token = self.server.token
+        if not token or hmac.compare_digest(self.headers.get("X-Coordinator-Token", ""), token):
+            return True
+        # Drain the body so the connection stays usable, then refuse
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._send(401, {"error": "bad or missing X-Coordinator-Token"})
+        return False
+
+    def _holds(self, job, worker):
+        return job is not None and job["status"] == "running" and job["worker"] == worker
+
+    # --- routing ------------------------------------------------------------
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        queue = self.server.queue
+        if url.path == "/health":
+            return self._send(200, {"ok": True, "jobs": queue.stats()})
+        if url.path == "/workers":
+            return self._send(200, queue.workers(lost_after=self.server.lease))
+        if url.path == "/jobs":
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            return self._send(200, queue.list(status=q.get("status"), job_type=q.get("type"),
+                                              limit=min(int(q.get("limit", 50)), 500), offset=int(q.get("offset", 0))))
+        match = _JOB_ROUTE.match(url.path)
+        if match and not match.group(2):
+            job = queue.get(match.group(1))
+            return self._send(200, job) if job else self._send(404, {"error": "job not found"})
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        path = urlparse(self.path).path
+        body = self._body()
+        queue = self.server.queue
+        if path in ("/workers/register", "/claim") and self._missing(body, "worker"):
+            return
+        if path == "/workers/register":
+            info = {k: v for k, v in body.items() if k not in ("worker", "host", "cores", "memory_mb")}
+            queue.register_worker(body["worker"], body.get("host") or self.client_address[0], body.get("cores"),
+                                  body.get("memory_mb"), **info)
+            return self._send(200, {"lease_seconds": self.server.lease})
+        if path == "/claim":
+            queue.touch_worker(body["worker"])
+            job = queue.claim(body["worker"], self.server.type_limits, types=body.get("types"),
+                              capacity=body.get("capacity"))
+            if job:
+                print(f"[COORDINATOR] Job {job['id']} ({job['type']}) leased to {body['worker']}")
+            return self._send(200, job) if job else self._send(204)
+        if path == "/jobs":
+            if body.get("type") not in JOB_HANDLERS:
+                return self._send(400, {"error": f"type must be one of {', '.join(JOB_HANDLERS)}"})
+            job_id = queue.enqueue(body["type"], body.get("params"), body.get("priority", 0))
+            return self._send(201, {"job_id": job_id})
+
+        match = _JOB_ROUTE.match(path)
+        if not match or match.group(2) not in ("heartbeat", "finish", "cancel"):
+            return self._send(404, {"error": "not found"})
+        job_id, action = match.group(1), match.group(2)
+        if action == "cancel":
+            job = queue.cancel(job_id)
+            return self._send(200, job) if job else self._send(404, {"error": "job not found"})
+        if action == "heartbeat":
+            cancel = queue.heartbeat(job_id, body.get("progress"), body.get("message"), worker=body.get("worker"),
+                                     detail=body.get("detail"))
+            return self._send(200, {"cancel": cancel})
+
+        if self._missing(body, "worker", "status"):
+            return
+        if body["status"] not in ("succeeded", "failed", "cancelled"):
+            return self._send(400, {"error": "status must be succeeded, failed or cancelled"})
+        worker = body["worker"]
+        if not self._holds(queue.get(job_id), worker):
+            return self._send(409, {"error": "job is not leased to this worker"})
+        names = [_safe_name(name) for name in body.get("artifacts") or []]
+        artifacts = [os.path.join(self.server.output_dir, name) for name in names if name]
+        queue.finish(job_id, body["status"], result=body.get("result"), error=body.get("error"),
+                     message=body.get("message"), artifacts=artifacts, worker=worker)
+        print(f"[COORDINATOR] Job {job_id} {body['status']} on {worker} ({len(artifacts)} artifact(s))")
+        videos = [a for a in artifacts if a.endswith(".mp4")]
+        catalog = get_catalog()
+        if catalog and videos:
+            # Renders from other nodes: indexed now; probed and packaged for preview off the request thread
+            for path in videos:
+                catalog.record(path)
+            threading.Thread(target=self._index_uploads, args=(catalog, videos), daemon=True).start()
+        self._send(200, {"ok": True})
+
+    @staticmethod
+    def _index_uploads(catalog, videos):
+        catalog.probe_missing()
+        builder = get_preview_builder()
+        if builder:
+            backfill(catalog, builder, names=[os.path.basename(v) for v in videos])
+
+    def do_PUT(self):
+        if not self._authorized():
+            return
+        match = _JOB_ROUTE.match(urlparse(self.path).path)
+        name = _safe_name(unquote(match.group(3))) if match and match.group(3) else None
+        length = int(self.headers.get("Content-Length") or 0)
+        if not name or not self._holds(self.server.queue.get(match.group(1)), self.headers.get("X-Worker-Id")):
+            self.rfile.read(length)
+            return self._send(409 if name else 400, {"error": "artifact rejected"})
+
+        # Streamed to a temp file and renamed, so readers never see a half-uploaded video
+        path = os.path.join(self.server.output_dir, name)
+        tmp = f"{path}.{match.group(1)}.part"
+        remaining = length
+        with open(tmp, "wb") as f:
+            while remaining:
+                chunk = self.rfile.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        if remaining:
+            os.remove(tmp)
+            return self._send(400, {"error": "incomplete upload"})
+        os.replace(tmp, path)
+        self._send(200, {"path": path})
+
+
+class CoordinatorServer(ThreadingHTTPServer):
+    """Serves the coordinator routes over one JobQueue and requeues expired leases in the background."""
+
+    daemon_threads = True
+
+    def __init__(self, address, queue, output_dir, token=None, lease=120, type_limits=None, verbose=False):
+        super().__init__(address, CoordinatorHandler)
+        self.queue = queue
+        self.output_dir = output_dir
+        self.token = token or None
+        self.lease = lease
+        self.type_limits = type_limits or {}
+        self.verbose = verbose
+        os.makedirs(output_dir, exist_ok=True)
+        self._stop = threading.Event()
+        threading.Thread(target=self._reap, name="coordinator-reaper", daemon=True).start()
+
+    def _reap(self):
+        while not self._stop.wait(max(1.0, self.lease / 4)):
+            requeued = self.queue.requeue_stale(self.lease)
+            if requeued:
+                print(f"[COORDINATOR] Requeued {requeued} job(s) from lost workers")
+
+    def shutdown(self):
+        self._stop.set()
+        super().shutdown()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def _bind_host(host, token):
+    """`host`, or by default every interface with a token and loopback without; refuses an open network bind."""
+    if not host:
+        return "0.0.0.0" if token else "127.0.0.1"
+    if not token and host not in ("127.0.0.1", "::1", "localhost"):
+        raise ValueError(f"refusing to serve the coordinator on {host} without COORDINATOR_TOKEN")
+    return host
+
+
+def coordinator_from_config(config, host=None, port=8790, db_path=None, verbose=False, lease=None):
+    from core.job_worker import queue_from_config
+    host = _bind_host(host or config.COORDINATOR_HOST, config.COORDINATOR_TOKEN)
+    return CoordinatorServer((host, port), queue_from_config(config, db_path), config.OUTPUT_DIR,
+                             token=config.COORDINATOR_TOKEN, lease=lease or config.JOB_HEARTBEAT_TIMEOUT,
+                             type_limits=config.JOB_TYPE_LIMITS, verbose=verbose)
+
+
+def start_background(config, host=None, port=8790, db_path=None):
+    """Starts a coordinator on a daemon thread (port=0 picks a free port)."""
+    server = coordinator_from_config(config, host, port, db_path)
+    threading.Thread(target=server.serve_forever, name="coordinator", daemon=True).start()
+    return server
+
+
+# --- Worker side --------------------------------------------------------------
+
+def _rewrite(value, paths):
+    """Replaces local artifact paths in a job result by where the coordinator stored them."""
+    if isinstance(value, str):
+        return paths.get(value, value)
+    if isinstance(value, (list, tuple)):
+        return [_rewrite(v, paths) for v in value]
+    if isinstance(value, dict):
+        return {k: _rewrite(v, paths) for k, v in value.items()}
+    return value
+
+
+class RemoteJobQueue:
+    """The worker-facing half of JobQueue, spoken over HTTP to a coordinator.
+
+    Connection errors never kill a worker: a failed claim looks like an empty queue and
+    a failed heartbeat like "keep going"; if the coordinator stays away the lease simply
+    expires and the job is requeued elsewhere.
+    """
+
+    def __init__(self, url, token=None, timeout=30, retries=5):
+        self.url = url.rstrip("/")
+        self.path = self.url
+        self.token = token or None
+        self.timeout = timeout
+        self.retries = retries
+
+    def _request(self, method, path, body=None, data=None, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers["X-Coordinator-Token"] = self.token
+        if body is not None:
+            data = json.dumps(body, default=str).encode()
+            headers["Content-Type"] = "application/json"
+        request = urllib.request.Request(self.url + path, data=data, method=method, headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            raw = response.read()
+            return json.loads(raw) if raw else None
+
+    def _retrying(self, fn, *args, **kwargs):
+        for attempt in range(self.retries):
+            try:
+                return fn(*args, **kwargs)
+            except urllib.error.HTTPError:
+                raise
+            except OSError as e:
+                if attempt == self.retries - 1:
+                    raise
+                wait = min(30, 2 ** attempt)
+                print(f"[WORKER] Coordinator unreachable ({e}); retrying in {wait}s")
+                time.sleep(wait)
+
+    def register_worker(self, worker, host=None, cores=None, memory_mb=None, **info):
+        return self._retrying(self._request, "POST", "/workers/register",
+                              {"worker": worker, "host": host, "cores": cores, "memory_mb": memory_mb, **info})
+
+    def claim(self, worker, type_limits=None, types=None, capacity=None):
+        # Type limits are the coordinator's: they cap jobs running across all nodes
+        try:
+            return self._request("POST", "/claim", {"worker": worker, "types": types, "capacity": capacity})
+        except OSError as e:
+            print(f"[WORKER] Claim failed: {e}")
+            return None
+
+    def heartbeat(self, job_id, progress=None, message=None, worker=None, detail=None):
+        try:
+            reply = self._request("POST", f"/jobs/{job_id}/heartbeat",
+                                  {"worker": worker, "progress": progress, "message": message, "detail": detail})
+        except OSError as e:
+            print(f"[WORKER] Heartbeat for job {job_id} failed: {e}")
+            return False
+        return bool(reply and reply.get("cancel"))
+
+    def upload(self, job_id, path, worker):
+        """Sends one file to the coordinator's OUTPUT_DIR; returns its path there."""
+        def put():
+            with open(path, "rb") as f:
+                return self._request("PUT", f"/jobs/{job_id}/artifacts/{quote(os.path.basename(path))}", data=f,
+                                     headers={"X-Worker-Id": worker, "Content-Length": str(os.path.getsize(path)),
+                                              "Content-Type": "application/octet-stream"})
+        return self._retrying(put)["path"]
+
+    def finish(self, job_id, status, result=None, error=None, message=None, artifacts=None, worker=None):
+        stored = {}
+        try:
+            for path in artifacts or []:
+                stored[path] = self.upload(job_id, path, worker)
+            self._retrying(self._request, "POST", f"/jobs/{job_id}/finish", {
+                "worker": worker, "status": status, "result": _rewrite(result, stored), "error": error,
+                "message": message, "artifacts": [os.path.basename(p) for p in stored]
+            })
+        except OSError as e:
+            # 409 included: the lease was lost and the job already runs elsewhere
+            print(f"[WORKER] Could not report job {job_id} ({status}) to the coordinator: {e}")
+
+    def requeue_stale(self, timeout):
+        # The coordinator reaps expired leases itself
+        return 0
+
+    def enqueue(self, job_type, params=None, priority=0):
+        return self._request("POST", "/jobs", {"type": job_type, "params": params, "priority": priority})["job_id"]
+
+    def get(self, job_id):
+        try:
+            return self._request("GET", f"/jobs/{job_id}")
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    def list(self, status=None, job_type=None, limit=50, offset=0):
+        query = "&".join(f"{k}={quote(str(v))}" for k, v in
+                         (("status", status), ("type", job_type), ("limit", limit), ("offset", offset)) if v)
+        return self._request("GET", f"/jobs?{query}")
+
+    def cancel(self, job_id):
+        return self._request("POST", f"/jobs/{job_id}/cancel", {})
+
+    def workers(self, lost_after=None):
+        return self._request("GET", "/workers")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coordinate render workers on several nodes")
+    parser.add_argument("--host", help="Interface to listen on (default COORDINATOR_HOST; every interface with "
+                                       "COORDINATOR_TOKEN set, else loopback)")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--db", help="Job database (default JOB_DB or OUTPUT_DIR/jobs.db)")
+    parser.add_argument("--lease", type=float, help="Seconds without a heartbeat before a job is requeued "
+                                                    "(default JOB_HEARTBEAT_TIMEOUT)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    from config import settings
+    server = coordinator_from_config(settings.Config(), args.host, args.port, args.db, args.verbose, args.lease)
+    print(f"[COORDINATOR] Listening on {server.url} (jobs in {server.queue.path}, artifacts in {server.output_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
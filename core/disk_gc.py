@@ -0,0 +1,250 @@
+
+"""Background garbage collector keeping scratch and cache directories within their quotas.
+
+The API runs one (DISK_GC_INTERVAL); run a pass by hand with
+`python -m core.disk_gc [--dry-run]`. Each area gets a maximum age and a maximum size:
+entries unused for longer than the age are removed, then the least recently used ones
+until the area fits its size. Every pass produces a report of what was reclaimed.
+"""
+import os
+import sys
+import time
+import json
+import shutil
+import fnmatch
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tracing import get_metrics
+from core.workspace import holder_alive
+
+# Shared intermediates written to ASSETS_DIR before jobs had workspaces
+LEGACY_INTERMEDIATES = ("voiceover_*.mp3", "ai_synthesis_*.png", "segments_*", "thumb_backdrop_raw.png")
+
+
+class Area:
+    """One directory the collector manages; its direct children are the unit of removal.
+
+    `patterns` limits the area to matching children (shared directories), `busy(path)`
+    protects entries in use (a running job's workspace; None means "can't tell", which
+    only the age limit may override) and `orphaned(path)` marks entries whose owner is
+    gone (previews of a deleted master), removed whatever their age.
+    """
+
+    def __init__(self, name, path, max_age_hours=None, max_mb=None, patterns=None, busy=None, orphaned=None):
+        self.name = name
+        self.path = path
+        self.max_age = max_age_hours * 3600 if max_age_hours else None
+        self.max_bytes = max_mb * 1024 * 1024 if max_mb else None
+        self.patterns = patterns
+        self.busy = busy
+        self.orphaned = orphaned
+
+    def entries(self):
+        """(path, bytes, last used) of each child; a directory counts as its newest file."""
+        try:
+            children = list(os.scandir(self.path))
+        except OSError:
+            return []
+        found = []
+        for entry in children:
+            if entry.name.startswith(".") or (self.patterns and not any(fnmatch.fnmatch(entry.name, p)
+                                                                         for p in self.patterns)):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    size, used = 0, entry.stat(follow_symlinks=False).st_mtime
+                    for d, _, files in os.walk(entry.path):
+                        for f in files:
+                            st = os.lstat(os.path.join(d, f))
+                            size += st.st_size
+                            used = max(used, st.st_mtime)
+                else:
+                    st = entry.stat(follow_symlinks=False)
+                    size, used = st.st_size, st.st_mtime
+            except OSError:
+                continue
+            found.append((entry.path, size, used))
+        return found
+
+
+def _remove(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+class DiskGC:
+    """Applies each area's age and size limits; removal is oldest-first (LRU)."""
+
+    def __init__(self, areas, interval=900):
+        self.areas = areas
+        self.interval = interval
+        self.last_report = None
+        self.totals = {"runs": 0, "removed": 0, "reclaimed_bytes": 0}
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _collect_area(self, area, now, dry_run):
+        entries = sorted(area.entries(), key=lambda e: e[2])
+        usage = sum(size for _, size, _ in entries)
+        doomed = []
+        busy = {path: area.busy(path) if area.busy else False for path, _, _ in entries}
+        for path, size, used in entries:
+            if busy[path]:
+                continue
+            if busy[path] is None:
+                if area.max_age and now - used > area.max_age:
+                    doomed.append((path, size, "age"))
+            elif area.orphaned and area.orphaned(path):
+                doomed.append((path, size, "orphaned"))
+            elif area.max_age and now - used > area.max_age:
+                doomed.append((path, size, "age"))
+        remaining = usage - sum(size for _, size, _ in doomed)
+        if area.max_bytes and remaining > area.max_bytes:
+            chosen = {path for path, _, _ in doomed}
+            for path, size, _ in entries:
+                if remaining <= area.max_bytes:
+                    break
+                if path in chosen or busy[path] is not False:
+                    continue
+                doomed.append((path, size, "quota"))
+                remaining -= size
+
+        report = {"path": area.path, "entries": len(entries), "bytes": usage, "removed": 0, "reclaimed_bytes": 0,
+                  "by_reason": {}, "errors": 0}
+        for path, size, reason in doomed:
+            if not dry_run:
+                try:
+                    _remove(path)
+                except OSError as e:
+                    report["errors"] += 1
+                    print(f"[GC] Could not remove {path}: {e}")
+                    continue
+            report["removed"] += 1
+            report["reclaimed_bytes"] += size
+            report["by_reason"][reason] = report["by_reason"].get(reason, 0) + 1
+        report["bytes_after"] = usage - report["reclaimed_bytes"]
+        return report
+
+    def collect(self, dry_run=False):
+        """One pass over every area; returns (and keeps, unless dry_run) the report."""
+        with self.lock:
+            started = time.time()
+            areas = {area.name: self._collect_area(area, started, dry_run) for area in self.areas}
+            report = {
+                "at": started,
+                "dry_run": dry_run,
+                "seconds": round(time.time() - started, 3),
+                "removed": sum(a["removed"] for a in areas.values()),
+                "reclaimed_bytes": sum(a["reclaimed_bytes"] for a in areas.values()),
+                "areas": areas
+            }
+            if dry_run:
+                return report
+            self.last_report = report
+            self.totals["runs"] += 1
+            self.totals["removed"] += report["removed"]
+            self.totals["reclaimed_bytes"] += report["reclaimed_bytes"]
+        metrics = get_metrics()
+        for name, area in areas.items():
+            metrics.inc("disk_gc_reclaimed_bytes_total", {"area": name}, area["reclaimed_bytes"],
+                        help_text="Bytes removed by the disk garbage collector")
+        if report["removed"]:
+            print(f"[GC] Reclaimed {report['reclaimed_bytes'] / 1e6:.1f} MB in {report['removed']} entries ("
+                  + ", ".join(f"{n}: {a['reclaimed_bytes'] / 1e6:.1f} MB" for n, a in areas.items()
+                              if a["removed"]) + ")")
+        return report
+
+    def _run(self):
+        # First pass right away: a restart is when leftovers of crashed jobs are most likely
+        while True:
+            try:
+                self.collect()
+            except Exception as e:
+                print(f"[GC] Pass failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="disk-gc", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {"interval": self.interval, **self.totals, "last_report": self.last_report,
+                "areas": {a.name: {"path": a.path, "max_age_hours": a.max_age and a.max_age / 3600,
+                                   "max_mb": a.max_bytes and a.max_bytes // (1024 * 1024)} for a in self.areas}}
+
+
+def build_areas(config):
+    """The managed areas for a Config: DISK_QUOTAS gives each one's max_age_hours / max_mb."""
+    quotas = config.DISK_QUOTAS
+    workspace_dir = config.WORKSPACE_DIR or os.path.join(config.ASSETS_DIR, "workspaces")
+    previews = os.path.join(config.OUTPUT_DIR, "previews")
+
+    def preview_orphaned(path):
+        name = os.path.basename(path)
+        # Half-built previews (.tmp) of a build that died, or previews whose master was deleted
+        if name.endswith(".tmp"):
+            try:
+                return time.time() - os.path.getmtime(path) > 3600
+            except OSError:
+                return False
+        return not os.path.exists(os.path.join(config.OUTPUT_DIR, name + ".mp4"))
+
+    def downloading(path):
+        try:
+            return path.endswith(".part") and time.time() - os.path.getmtime(path) < 3600
+        except OSError:
+            return True
+
+    areas = [
+        # Held from another host (shared WORKSPACE_DIR): holder_alive can't tell, so only the age limit applies
+        Area("workspaces", workspace_dir, busy=holder_alive, **quotas.get("workspaces", {})),
+        Area("artifact_cache", os.path.join(config.ASSETS_DIR, "cache", "artifacts"),
+             **quotas.get("artifact_cache", {})),
+        Area("legacy_intermediates", config.ASSETS_DIR, patterns=LEGACY_INTERMEDIATES,
+             **quotas.get("legacy_intermediates", {})),
+        # Objects pulled from a remote artifact store
+        Area("store_cache", config.S3_CACHE_DIR or os.path.join(config.ASSETS_DIR, "cache", "store"),
+             busy=downloading, **quotas.get("store_cache", {})),
+        Area("previews", previews, orphaned=preview_orphaned, **quotas.get("previews", {}))
+    ]
+    return areas
+
+
+_gc = None
+
+
+def get_disk_gc():
+    return _gc
+
+
+def configure_disk_gc(config, interval=None):
+    global _gc
+    if _gc:
+        _gc.stop()
+    _gc = DiskGC(build_areas(config), interval=interval or config.DISK_GC_INTERVAL)
+    return _gc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the disk quotas once and print what was reclaimed")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without removing it")
+    args = parser.parse_args()
+
+    from config import settings
+    report = DiskGC(build_areas(settings.Config())).collect(dry_run=args.dry_run)
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+
+import time
+import importlib
+import threading
+from core.tracing import get_metrics
+
+
+class ConfigReader:
+    """Config proxy that remembers which keys were read through it.
+
+    Engine factories get one instead of the real Config, so the registry learns which
+    settings each engine depends on without keeping a hand-written list in sync.
+    """
+
+    def __init__(self, config):
+        object.__setattr__(self, "_config", config)
+        object.__setattr__(self, "keys", set())
+
+    def __getattr__(self, key):
+        self.keys.add(key)
+        return getattr(self._config, key)
+
+    def __setattr__(self, key, value):
+        setattr(self._config, key, value)
+
+
+class EngineRegistry:
+    """Builds engines on first use and rebuilds only those whose settings changed.
+
+    An engine is registered as a "module:Class" target plus a factory(cls, config);
+    its module is imported when the engine is first asked for, so heavy dependencies
+    (MoviePy, gTTS, PRAW, ...) stay out of a cold start that never renders.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.specs = {}
+        self.instances = {}
+        self.keys = {}
+        self.build_seconds = {}
+        self.lock = threading.Lock()
+        self.build_locks = {}
+
+    def register(self, name, target, factory):
+        self.specs[name] = (target, factory)
+        self.build_locks[name] = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    def get(self, name):
+        engine = self.instances.get(name)
+        if engine is not None or name in self.instances:
+            return engine
+        # One lock per engine: concurrent first uses build it once, other engines aren't held up
+        with self.build_locks[name]:
+            if name in self.instances:
+                return self.instances[name]
+            target, factory = self.specs[name]
+            module, _, attr = target.partition(":")
+            started = time.perf_counter()
+            reader = ConfigReader(self.config)
+            engine = factory(getattr(importlib.import_module(module), attr), reader)
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.instances[name] = engine
+                self.keys[name] = reader.keys
+                self.build_seconds[name] = elapsed
+            get_metrics().observe("engine_build_seconds", elapsed, {"engine": name},
+                                  help_text="Time to import and construct an engine on first use")
+            return engine
+
+    def invalidate(self, changed_keys):
+        """Drops built engines that read any of `changed_keys`; they rebuild on next use. Returns their names."""
+        changed_keys = set(changed_keys)
+        with self.lock:
+            stale = [name for name, keys in self.keys.items() if keys & changed_keys]
+            for name in stale:
+                self.instances.pop(name, None)
+                self.keys.pop(name, None)
+        return stale
+
+    def loaded(self):
+        with self.lock:
+            return sorted(self.instances)
+
+    def stats(self):
+        with self.lock:
+            return {name: {
+                "loaded": name in self.instances,
+                "build_seconds": round(self.build_seconds[name], 4) if name in self.build_seconds else None,
+                "config_keys": sorted(self.keys.get(name, ()))
+            } for name in self.specs}
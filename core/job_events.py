@@ -0,0 +1,195 @@
+
+import os
+import json
+import time
+import asyncio
+import itertools
+from collections import deque
+from core.tracing import get_metrics
+
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+class JobEvent:
+    """One event, serialised once for every subscriber."""
+
+    def __init__(self, event_id, kind, data):
+        self.id = event_id
+        self.kind = kind
+        self.data = data
+        self.sse = f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class Subscriber:
+    def __init__(self, size):
+        self.queue = asyncio.Queue(size)
+        self.connected_at = time.time()
+
+
+def _summary(job):
+    params = job.get("params") or {}
+    return {
+        "id": job["id"],
+        "type": job["type"],
+        "title": params.get("title") or params.get("topic") or params.get("niche"),
+        "status": job["status"],
+        "progress": job["progress"],
+        "message": job["message"],
+        "detail": job.get("detail"),
+        "worker": job.get("worker"),
+        "error": job.get("error")
+    }
+
+
+class JobEventHub:
+    """Pushes job lifecycle, stage and encode progress to every connected dashboard.
+
+    One poller reads the job table (where workers, local or behind the coordinator,
+    write their heartbeats) and turns changes into events; each event is serialised
+    once and fanned out to all subscribers, so the database load is one query per
+    interval however many dashboards are open. The poller only runs while someone is
+    subscribed. Recent events are kept so a reconnecting client (Last-Event-ID) gets
+    what it missed; a client too slow to keep up is resynchronised with a snapshot.
+    """
+
+    def __init__(self, queue, interval=1.0, backlog=500, subscriber_buffer=200):
+        self.queue = queue
+        self.interval = interval
+        self.subscriber_buffer = subscriber_buffer
+        self.subscribers = set()
+        self.backlog = deque(maxlen=backlog)
+        self.ids = itertools.count(1)
+        self.jobs = {}
+        self.throughput = None
+        self.since = time.time()
+        self.polled = False
+        self.task = None
+        self.lock = None
+        self.listeners = []
+        self.counters = {"events": 0, "polls": 0, "resyncs": 0}
+
+    def add_listener(self, fn):
+        """fn(JobEvent) runs on the event loop for every published event (e.g. cache invalidation)."""
+        self.listeners.append(fn)
+
+    # --- Subscribers --------------------------------------------------------------
+
+    async def subscribe(self, last_event_id=None):
+        """A Subscriber whose queue starts with the missed events (or a snapshot) and then follows live."""
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            if not self.polled:
+                await self._poll()
+        subscriber = Subscriber(self.subscriber_buffer)
+        missed = self._since(last_event_id)
+        for event in missed if missed is not None else [self._snapshot()]:
+            subscriber.queue.put_nowait(event)
+        self.subscribers.add(subscriber)
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def _since(self, last_event_id):
+        """Backlog events after `last_event_id`, or None when it is unknown or already rotated out."""
+        try:
+            last = int(last_event_id)
+        except (TypeError, ValueError):
+            return None
+        if not self.backlog or last < self.backlog[0].id - 1 or last > self.backlog[-1].id:
+            return None
+        return [e for e in self.backlog if e.id > last][:self.subscriber_buffer - 1]
+
+    def _snapshot(self):
+        return JobEvent(next(self.ids), "snapshot", {
+            "jobs": [j for j in self.jobs.values() if j["status"] not in FINISHED],
+            "throughput": self.throughput
+        })
+
+    def _publish(self, kind, data):
+        event = JobEvent(next(self.ids), kind, data)
+        self.backlog.append(event)
+        self.counters["events"] += 1
+        get_metrics().inc("job_events_total", {"event": kind}, help_text="Job events pushed to dashboards")
+        for listener in self.listeners:
+            listener(event)
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop what it hasn't read and start it over from the current state
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(self._snapshot())
+                self.counters["resyncs"] += 1
+
+    # --- Poller -------------------------------------------------------------------
+
+    async def _run(self):
+        while self.subscribers:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._poll()
+            except Exception as e:
+                print(f"[EVENTS] Poll failed: {e}")
+        # Idle: the next subscriber re-reads the current state instead of replaying the gap as events
+        self.polled = False
+
+    async def _poll(self):
+        started = time.time()
+        first = not self.polled
+        # A little overlap so a job finishing during the previous poll isn't missed
+        rows = await asyncio.to_thread(self.queue.changes, started if first else self.since - self.interval)
+        self.since = started
+        self.counters["polls"] += 1
+        self.polled = True
+
+        seen = set()
+        for job in rows:
+            summary = _summary(job)
+            seen.add(summary["id"])
+            previous = self.jobs.get(summary["id"])
+            self.jobs[summary["id"]] = summary
+            if first or previous == summary:
+                continue
+            if previous is None or previous["status"] != summary["status"]:
+                if summary["status"] in FINISHED:
+                    self._publish("job.finished", summary)
+                    videos = [os.path.basename(a) for a in job.get("artifacts") or [] if a.endswith(".mp4")]
+                    if summary["status"] == "succeeded" and videos:
+                        self._publish("video.ready", {"job": summary["id"], "videos": videos})
+                else:
+                    self._publish("job.queued" if summary["status"] == "queued" else "job.started", summary)
+            else:
+                self._publish("job.progress", summary)
+        for job_id in [j for j in self.jobs if j not in seen]:
+            del self.jobs[job_id]
+
+        running = [j for j in self.jobs.values() if j["status"] == "running"]
+        throughput = {
+            "running": len(running),
+            "queued": sum(1 for j in self.jobs.values() if j["status"] == "queued"),
+            "encoding": sum(1 for j in running if (j["detail"] or {}).get("fps")),
+            "encode_fps": round(sum((j["detail"] or {}).get("fps") or 0 for j in running), 1)
+        }
+        if throughput != self.throughput:
+            self.throughput = throughput
+            if not first:
+                self._publish("throughput", throughput)
+
+    def stats(self):
+        return {
+            **self.counters,
+            "subscribers": len(self.subscribers),
+            "interval": self.interval,
+            "backlog": len(self.backlog),
+            "tracked_jobs": len(self.jobs),
+            "throughput": self.throughput
+        }
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
@@ -0,0 +1,269 @@
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import contextvars
+from contextlib import closing
+
+STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    params TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    detail TEXT,
+    result TEXT,
+    artifacts TEXT,
+    error TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT,
+    cores INTEGER,
+    memory_mb INTEGER,
+    info TEXT,
+    job_id TEXT,
+    registered_at REAL,
+    last_seen REAL
+);
+"""
+
+_current_job = contextvars.ContextVar("job", default=None)
+
+
+class JobCancelled(BaseException):
+    """Raised inside a job whose cancellation was requested.
+
+    A BaseException (like KeyboardInterrupt) so the pipeline's broad `except Exception`
+    handlers don't swallow it and carry on rendering.
+    """
+
+
+class JobQueue:
+    """Durable job queue in one SQLite file, shared by the API and worker processes.
+
+    Claims run in an IMMEDIATE transaction, so concurrent workers never take the same
+    job, and per-type limits are checked against jobs running anywhere. A worker that
+    advertises its capacity only gets job types whose requirements fit it.
+    """
+
+    def __init__(self, path, max_attempts=3, requirements=None):
+        self.path = path
+        self.max_attempts = max_attempts
+        # {"long": {"cores": 4, "memory_mb": 4096}, "*": {...}}; "*" applies to unlisted types
+        self.requirements = requirements or {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+            columns = {r["name"] for r in db.execute("PRAGMA table_info(jobs)")}
+            for column in ("artifacts", "detail"):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    @staticmethod
+    def _row(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["artifacts"] = json.loads(job["artifacts"]) if job.get("artifacts") else []
+        job["detail"] = json.loads(job["detail"]) if job.get("detail") else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    # --- API side ---------------------------------------------------------------
+
+    def enqueue(self, job_type, params=None, priority=0):
+        job_id = uuid.uuid4().hex[:12]
+        with closing(self._connect()) as db:
+            db.execute("INSERT INTO jobs (id, type, params, priority, created_at) VALUES (?, ?, ?, ?, ?)",
+                       (job_id, job_type, json.dumps(params or {}, default=str), priority, time.time()))
+        return job_id
+
+    def get(self, job_id):
+        with closing(self._connect()) as db:
+            return self._row(db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, status=None, job_type=None, limit=50, offset=0):
+        query, args = "SELECT * FROM jobs WHERE 1=1", []
+        if status:
+            query += " AND status = ?"
+            args.append(status)
+        if job_type:
+            query += " AND type = ?"
+            args.append(job_type)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        args += [limit, offset]
+        with closing(self._connect()) as db:
+            return [self._row(r) for r in db.execute(query, args).fetchall()]
+
+    def changes(self, since):
+        """Queued and running jobs plus those finished at or after `since` (for the event stream)."""
+        with closing(self._connect()) as db:
+            return [self._row(r) for r in db.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') UNION ALL "
+                "SELECT * FROM jobs WHERE finished_at >= ? AND status NOT IN ('queued', 'running')",
+                (since,)).fetchall()]
+
+    def cancel(self, job_id):
+        """Queued jobs are cancelled at once; running ones are flagged for their worker. Returns the job."""
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("UPDATE jobs SET status = 'cancelled', finished_at = ?, message = 'Cancelled before start' "
+                       "WHERE id = ? AND status = 'queued'", (now, job_id))
+            db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+        return self.get(job_id)
+
+    def stats(self):
+        with closing(self._connect()) as db:
+            rows = db.execute("SELECT type, status, COUNT(*) AS n FROM jobs GROUP BY type, status").fetchall()
+        out = {}
+        for r in rows:
+            out.setdefault(r["type"], {})[r["status"]] = r["n"]
+        return out
+
+    # --- Worker side ------------------------------------------------------------
+
+    def fits(self, job_type, capacity):
+        """Whether a worker with `capacity` ({"cores", "memory_mb"}) can run this job type."""
+        if not capacity:
+            return True
+        needs = self.requirements.get(job_type) or self.requirements.get("*") or {}
+        return all(capacity.get(k) is None or capacity[k] >= v for k, v in needs.items())
+
+    def claim(self, worker, type_limits=None, types=None, capacity=None):
+        """Takes the highest-priority queued job whose type is under its running limit, or None."""
+        type_limits = type_limits or {}
+        unfit = [t for t in self.requirements if t != "*" and not self.fits(t, capacity)]
+        if capacity and types:
+            types = [t for t in types if self.fits(t, capacity)]
+            if not types:
+                return None
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            running = {r["type"]: r["n"] for r in db.execute(
+                "SELECT type, COUNT(*) AS n FROM jobs WHERE status = 'running' GROUP BY type")}
+            full = [t for t, limit in type_limits.items() if limit and running.get(t, 0) >= limit] + unfit
+            query, args = "SELECT * FROM jobs WHERE status = 'queued'", []
+            if full:
+                query += f" AND type NOT IN ({','.join('?' * len(full))})"
+                args += full
+            if types:
+                query += f" AND type IN ({','.join('?' * len(types))})"
+                args += list(types)
+            row = db.execute(query + " ORDER BY priority DESC, created_at LIMIT 1", args).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            db.execute("UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ?, "
+                       "attempts = attempts + 1, message = 'Started' WHERE id = ?", (worker, now, now, row["id"]))
+            db.execute("UPDATE workers SET job_id = ?, last_seen = ? WHERE id = ?", (row["id"], now, worker))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id, progress=None, message=None, worker=None, detail=None):
+        """Records liveness (and progress, stage/encode detail); returns True when cancellation was requested.
+
+        With `worker`, the heartbeat only counts while that worker still holds the job; a
+        worker whose job was requeued to someone else is told to stop as if cancelled.
+        """
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("UPDATE jobs SET heartbeat_at = ?, progress = COALESCE(?, progress), "
+                       "message = COALESCE(?, message), detail = COALESCE(?, detail) WHERE id = ? "
+                       "AND status = 'running' AND (? IS NULL OR worker = ?)",
+                       (now, progress, message, json.dumps(detail) if detail else None, job_id, worker, worker))
+            db.execute("UPDATE workers SET last_seen = ? WHERE job_id = ? AND (? IS NULL OR id = ?)",
+                       (now, job_id, worker, worker))
+            row = db.execute("SELECT status, worker, cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row and worker and (row["status"] != "running" or row["worker"] != worker):
+            return True
+        return bool(row and row["cancel_requested"])
+
+    def finish(self, job_id, status, result=None, error=None, message=None, artifacts=None, worker=None):
+        with closing(self._connect()) as db:
+            db.execute("UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                       "progress = CASE WHEN ? = 'succeeded' THEN 1 ELSE progress END, "
+                       "message = COALESCE(?, message), artifacts = COALESCE(?, artifacts) "
+                       "WHERE id = ? AND (? IS NULL OR worker = ?)",
+                       (status, json.dumps(result, default=str) if result is not None else None, error,
+                        time.time(), status, message, json.dumps(artifacts) if artifacts else None, job_id,
+                        worker, worker))
+            db.execute("UPDATE workers SET job_id = NULL, last_seen = ? WHERE job_id = ? AND (? IS NULL OR id = ?)",
+                       (time.time(), job_id, worker, worker))
+
+    # --- Worker registry -----------------------------------------------------------
+
+    def register_worker(self, worker, host=None, cores=None, memory_mb=None, **info):
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("INSERT INTO workers (id, host, cores, memory_mb, info, registered_at, last_seen) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET host = excluded.host, "
+                       "cores = excluded.cores, memory_mb = excluded.memory_mb, info = excluded.info, "
+                       "last_seen = excluded.last_seen",
+                       (worker, host, cores, memory_mb, json.dumps(info), now, now))
+
+    def touch_worker(self, worker):
+        with closing(self._connect()) as db:
+            db.execute("UPDATE workers SET last_seen = ? WHERE id = ?", (time.time(), worker))
+
+    def workers(self, lost_after=120):
+        """Registered workers, newest first, flagged alive while they keep polling or heartbeating."""
+        cutoff = time.time() - lost_after
+        with closing(self._connect()) as db:
+            rows = db.execute("SELECT * FROM workers ORDER BY last_seen DESC").fetchall()
+        out = []
+        for r in rows:
+            worker = dict(r)
+            worker["info"] = json.loads(worker["info"]) if worker["info"] else {}
+            worker["alive"] = worker["last_seen"] >= cutoff
+            out.append(worker)
+        return out
+
+    def requeue_stale(self, timeout):
+        """Jobs whose worker stopped heartbeating (crash, restart) go back to the queue, or fail after max_attempts."""
+        cutoff = time.time() - timeout
+        with closing(self._connect()) as db:
+            db.execute("UPDATE jobs SET status = 'cancelled', finished_at = ?, message = 'Cancelled (worker lost)' "
+                       "WHERE status = 'running' AND heartbeat_at < ? AND cancel_requested = 1", (time.time(), cutoff))
+            db.execute("UPDATE jobs SET status = 'failed', finished_at = ?, error = 'Worker lost too many times' "
+                       "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+                       (time.time(), cutoff, self.max_attempts))
+            cur = db.execute("UPDATE jobs SET status = 'queued', worker = NULL, message = 'Requeued (worker lost)' "
+                             "WHERE status = 'running' AND heartbeat_at < ?", (cutoff,))
+            return cur.rowcount
+
+
+def current_job():
+    """The JobContext of the job running in this context (worker processes only), or None."""
+    return _current_job.get()
@@ -0,0 +1,453 @@
+
+"""Worker processes for the persistent job queue.
+
+Run standalone with `python -m core.job_worker [--processes 2]`, or let the API start
+and supervise them (JOB_WORKERS). Each process builds one FacelessVideoBot and runs
+one job at a time on a thread, while its main thread heartbeats progress and watches
+for cancellation. With `--coordinator URL` the workers take jobs from a coordinator
+(core.coordinator) instead of a local database and upload what they produce.
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import contextvars
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.job_queue import JobQueue, JobCancelled, _current_job, current_job
+from core.tracing import get_tracer
+from core.workspace import job_workspace
+
+# Where a single video is when one of its spans opens (fraction of that video)
+STAGE_PROGRESS = {
+    "script.stream": 0.05,
+    "stage.brief": 0.08,
+    "stage.script": 0.12,
+    "stage.audio": 0.2,
+    "stage.stock": 0.3,
+    "stage.ai_image": 0.4,
+    "render.create_video": 0.45,
+    "render.load_clips": 0.5,
+    "render.captions": 0.55,
+    # Encodes report frame progress between their start and the next stage (JobContext.encode)
+    "render.encode": 0.6,
+    "render.preview": 0.85,
+    "store.upload": 0.88,
+    "render.merge": 0.9,
+    "thumbnail": 0.92,
+    "publish": 0.95
+}
+VIDEO_SPANS = ("produce_video", "produce_long_form")
+# Job types whose handler returns what it rendered: nothing back means the job failed
+VIDEO_JOBS = ("custom", "long", "intl")
+# Bookkeeping files in OUTPUT_DIR that are never job artifacts
+STATE_FILES = ("jobs.db", "catalog.db", "traces.jsonl", "render_memory.json", "llm_cache")
+
+
+class JobContext:
+    """Progress and cancellation state of the job running in this worker."""
+
+    def __init__(self, job, expected_videos=1):
+        self.job = job
+        self.expected_videos = max(1, expected_videos)
+        self.videos_started = 0
+        self.progress = 0.0
+        self.message = "Started"
+        # Current stage and, during an encode, its percent / fps (streamed to dashboards)
+        self.stage = None
+        self.detail = None
+        self.cancelled = threading.Event()
+
+    def report(self, progress=None, message=None):
+        """Handlers may call this directly; spans report automatically. Raises JobCancelled when asked to stop."""
+        if self.cancelled.is_set():
+            raise JobCancelled(self.job["id"])
+        if progress is not None:
+            self.progress = max(self.progress, min(progress, 0.99))
+        if message:
+            self.message = message
+
+    def encode(self, frame, frames, fps):
+        """Frame progress of the running encode (see VideoEditor); also a cancellation point."""
+        fraction = min(frame / frames, 1.0) if frames else 0.0
+        self.detail = {"stage": self.stage, "percent": round(fraction * 100, 1), "fps": round(fps, 1),
+                       "frame": frame, "frames": frames}
+        start = STAGE_PROGRESS.get(self.stage)
+        if start is None:
+            return self.report()
+        end = min((f for f in STAGE_PROGRESS.values() if f > start), default=1.0)
+        done = max(0, self.videos_started - 1)
+        self.report((done + start + (end - start) * fraction) / self.expected_videos)
+
+
+def _on_span(span):
+    ctx = current_job()
+    if ctx is None:
+        return
+    if span.name in VIDEO_SPANS:
+        ctx.videos_started += 1
+        ctx.report(message=f"Video {ctx.videos_started}/{ctx.expected_videos}: {span.attrs.get('title', '')}")
+        return
+    fraction = STAGE_PROGRESS.get(span.name)
+    if fraction is None:
+        ctx.report()
+        return
+    ctx.stage = span.name
+    ctx.detail = {"stage": span.name}
+    done = max(0, ctx.videos_started - 1)
+    ctx.report((done + fraction) / ctx.expected_videos, span.name)
+
+
+get_tracer().add_listener(_on_span)
+
+
+# --- Handlers: job type -> fn(bot, params, ctx) --------------------------------
+
+def _niche(bot, params, ctx):
+    ctx.expected_videos = params.get("count") or 1
+    _profiled(params, bot.run_niche_pipeline, niche=params["niche"], count=params.get("count", 1), interactive=False)
+
+
+def _custom(bot, params, ctx):
+    kwargs = {k: params.get(k) for k in ("generate_thumb", "enhance_script", "publish", "vertical", "brief_mode",
+                                         "profile") if k in params}
+    # One prefix per job: it names the checkpoint manifest and the master, which concurrent jobs must not share.
+    # A given prefix comes from the job's submitter, so it is reduced to a plain file-name stem too.
+    kwargs["output_prefix"] = _prefix(params.get("output_prefix") or "") or \
+        f"custom_{_prefix(params['title'][:20]) or 'video'}_{ctx.job['id'][:8]}"
+    if not params.get("script"):
+        return bot.produce_from_topic(title=params["title"], style=params["style"], voice=params["voice"],
+                                      structure=params.get("structure") or "cinematic", **kwargs)
+    return bot.produce_video(title=params["title"], script_content=params["script"], style=params["style"],
+                             voice=params["voice"], **kwargs)
+
+
+def _long(bot, params, ctx):
+    script = params.get("script")
+    if not script:
+        ctx.report(0.02, "Writing long-form script")
+        script = bot.script_engine.generate_script(topic=params["title"], style=params["style"],
+                                                   structure=params.get("structure") or "cinematic")
+    return bot.produce_long_form(title=params["title"], full_script=script, style=params["style"],
+                                 voice=params["voice"], generate_thumb=params.get("generate_thumb", True),
+                                 enhance_script=params.get("enhance_script", False),
+                                 publish=params.get("publish", False), profile=params.get("profile"))
+
+
+def _intl(bot, params, ctx):
+    ctx.expected_videos = 2
+    return bot.produce_dubbed_variants(title=params["title"], script_content=params.get("script"))
+
+
+def _test(bot, params, ctx):
+    return bot.run_angle_test(topic=params["title"])
+
+
+def _bulk(bot, params, ctx):
+    plan = bot.calendar.get_current_plan() or {}
+    ctx.expected_videos = len(plan.get("days", [])) or 1
+    return bot.run_bulk_production()
+
+
+def _music(bot, params, ctx):
+    from music_studio import MusicStudio
+    return MusicStudio(bot).produce_music_video(topic=params["topic"], genre=params.get("genre", "hip-hop"))
+
+
+def _prefix(text):
+    """`text` as an output prefix: letters, digits, '-' and '_' only, so it can't leave OUTPUT_DIR."""
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in str(text)[:80]).strip("_")
+
+
+def _profiled(params, fn, **kwargs):
+    if params.get("profile"):
+        from core.profiling import run_profiled
+        return run_profiled(fn, **kwargs)
+    return fn(**kwargs)
+
+
+JOB_HANDLERS = {
+    "niche": _niche,
+    "custom": _custom,
+    "long": _long,
+    "intl": _intl,
+    "test": _test,
+    "bulk": _bulk,
+    "music": _music
+}
+
+
+# --- Worker loop ----------------------------------------------------------------
+
+def node_capacity(processes=1):
+    """This process's share of the node: usable cores and memory split across worker processes."""
+    from core.render_slots import available_cpus
+    from core.render_memory import memory_limit_mb
+    processes = max(1, processes)
+    memory = memory_limit_mb()
+    return {
+        "cores": max(1, len(available_cpus()) // processes),
+        "memory_mb": int(memory / processes) if memory else None
+    }
+
+
+def worker_cpus(cores, index=0):
+    """The `index`-th worker's disjoint block of `cores` CPUs (blocks wrap when --cores oversubscribes)."""
+    from core.render_slots import available_cpus
+    cpus = available_cpus()
+    start = (index * cores) % len(cpus)
+    return [cpus[(start + i) % len(cpus)] for i in range(min(cores, len(cpus)))]
+
+
+def snapshot_outputs(output_dir):
+    """(size, mtime) of the files directly in OUTPUT_DIR, used to spot what a job produced."""
+    try:
+        entries = list(os.scandir(output_dir))
+    except OSError:
+        return {}
+    return {e.path: (e.stat().st_size, e.stat().st_mtime_ns) for e in entries
+            if e.is_file() and not e.name.startswith(STATE_FILES) and not e.name.endswith((".tmp", ".part"))}
+
+
+class JobWorker:
+    def __init__(self, queue, worker_id=None, type_limits=None, poll_interval=1.0, heartbeat_interval=2.0,
+                 stale_after=120, cancel_grace=30, capacity=None, output_dir=None, cpus=None):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.type_limits = type_limits or {}
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.cancel_grace = cancel_grace
+        self.capacity = capacity
+        # CPUs this worker's renders are pinned to (its share of the node; None = all of them)
+        self.cpus = cpus
+        # Files appearing here during a job are reported (and uploaded, for remote queues) as its artifacts
+        self.output_dir = output_dir
+        self._bot = None
+        self._settings_mtime = None
+
+    @property
+    def bot(self):
+        if self._bot is None:
+            from main import get_bot
+            self._bot = get_bot()
+            self._settings_mtime = self._settings_changed_at()
+            self._fit_runtime(self._bot.config)
+        return self._bot
+
+    def _settings_changed_at(self):
+        try:
+            return os.path.getmtime(self._bot.config.config_file)
+        except OSError:
+            return None
+
+    def _reload_settings(self):
+        """Applies settings saved since the bot was built (the dashboard writes them from the API process)."""
+        if self._bot is None:
+            return
+        mtime = self._settings_changed_at()
+        if mtime == self._settings_mtime:
+            return
+        self._settings_mtime = mtime
+        changed = self._bot.reload_settings()
+        if changed:
+            print(f"[WORKER {self.worker_id}] Reloaded settings: {', '.join(changed)}")
+            # Rebuilding the runtime sized render admission and slots for the whole node again
+            self._fit_runtime(self._bot.config)
+
+    def _fit_runtime(self, config):
+        """Shrinks render admission and render slots to this worker's share of the node.
+
+        The bot sizes both for the whole machine, which every worker process on it would
+        then overcommit (memory) and overlap on (pinned cores).
+        """
+        from core.render_memory import configure_render_memory, current_rss_mb
+        from core.render_slots import configure_render_slots
+        memory_mb = (self.capacity or {}).get("memory_mb")
+        if memory_mb:
+            budget = max(512.0, memory_mb * 0.8 - (current_rss_mb() or 0))
+            if config.RENDER_MEMORY_BUDGET_MB:
+                budget = min(budget, config.RENDER_MEMORY_BUDGET_MB)
+            configure_render_memory(budget_mb=budget, timeout=config.RENDER_ADMISSION_TIMEOUT,
+                                    allow_downgrade=config.RENDER_LEAN_FALLBACK)
+        if self.cpus:
+            configure_render_slots(max_slots=config.RENDER_MAX_CONCURRENT, min_threads=config.RENDER_MIN_THREADS,
+                                   pin=config.RENDER_CPU_AFFINITY, cpus=self.cpus)
+
+    def run_forever(self):
+        capacity = self.capacity or {}
+        self.queue.register_worker(self.worker_id, socket.gethostname(), capacity.get("cores"),
+                                   capacity.get("memory_mb"), pid=os.getpid(), types=list(JOB_HANDLERS))
+        print(f"[WORKER {self.worker_id}] Waiting for jobs in {self.queue.path}")
+        while True:
+            self.queue.requeue_stale(self.stale_after)
+            self._reload_settings()
+            job = self.queue.claim(self.worker_id, self.type_limits, types=list(JOB_HANDLERS),
+                                   capacity=self.capacity)
+            if job is None:
+                time.sleep(self.poll_interval)
+                continue
+            self.run_job(job)
+
+    def run_job(self, job):
+        print(f"[WORKER {self.worker_id}] Job {job['id']} ({job['type']}) started")
+        ctx = JobContext(job)
+        outcome = {}
+        before = snapshot_outputs(self.output_dir) if self.output_dir else {}
+
+        def target():
+            _current_job.set(ctx)
+            try:
+                bot = self.bot
+                # Retries of the job reuse its workspace (and the intermediates its checkpoints point at)
+                with job_workspace(f"job-{job['id']}"):
+                    outcome["result"] = JOB_HANDLERS[job["type"]](bot, job["params"], ctx)
+                    if not outcome["result"] and job["type"] in VIDEO_JOBS:
+                        # Raised inside the workspace so it is kept for the retry
+                        raise RuntimeError("no video was produced (see the worker log)")
+            except JobCancelled:
+                outcome["cancelled"] = True
+            except Exception as e:
+                outcome["error"] = f"{type(e).__name__}: {e}"
+
+        thread = threading.Thread(target=contextvars.Context().run, args=(target,), name=f"job-{job['id']}",
+                                  daemon=True)
+        thread.start()
+        cancel_seen = None
+        while thread.is_alive():
+            thread.join(self.heartbeat_interval)
+            if self.queue.heartbeat(job["id"], round(ctx.progress, 3), ctx.message, worker=self.worker_id,
+                                    detail=ctx.detail) and cancel_seen is None:
+                cancel_seen = time.monotonic()
+                ctx.cancelled.set()
+                print(f"[WORKER {self.worker_id}] Cancelling job {job['id']}")
+            if cancel_seen is not None and time.monotonic() - cancel_seen > self.cancel_grace:
+                # The job didn't reach a cancellation point (e.g. a hung upload or LLM call): drop the whole
+                # process; its supervisor starts a fresh worker.
+                self.queue.finish(job["id"], "cancelled", message="Cancelled (worker restarted)",
+                                  worker=self.worker_id)
+                print(f"[WORKER {self.worker_id}] Job {job['id']} ignored cancellation; restarting worker")
+                os._exit(3)
+
+        artifacts = [p for p, stat in snapshot_outputs(self.output_dir).items()
+                     if before.get(p) != stat] if self.output_dir else None
+        if outcome.get("cancelled") or cancel_seen is not None:
+            self.queue.finish(job["id"], "cancelled", message="Cancelled", worker=self.worker_id)
+        elif "error" in outcome:
+            self.queue.finish(job["id"], "failed", error=outcome["error"], message="Failed", worker=self.worker_id)
+        else:
+            self.queue.finish(job["id"], "succeeded", result=outcome.get("result"), message="Done",
+                              artifacts=artifacts, worker=self.worker_id)
+        job = self.queue.get(job["id"]) or job
+        print(f"[WORKER {self.worker_id}] Job {job['id']} finished: {job['status']}")
+
+
+class WorkerPool:
+    """Starts worker processes and restarts any that exit (crash, hard cancel)."""
+
+    def __init__(self, processes=2, db_path=None, coordinator=None, cores=None, memory_mb=None):
+        self.processes = processes
+        self.db_path = db_path
+        self.coordinator = coordinator
+        self.cores = cores
+        self.memory_mb = memory_mb
+        self.procs = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _spawn(self, index):
+        cmd = [sys.executable, "-m", "core.job_worker", "--share", str(self.processes), "--index", str(index)]
+        if self.db_path:
+            cmd += ["--db", self.db_path]
+        if self.coordinator:
+            cmd += ["--coordinator", self.coordinator]
+        if self.cores:
+            cmd += ["--cores", str(self.cores)]
+        if self.memory_mb:
+            cmd += ["--memory-mb", str(self.memory_mb)]
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.Popen(cmd, cwd=root)
+
+    def _supervise(self):
+        while not self._stop.wait(2):
+            for i, proc in enumerate(self.procs):
+                if proc.poll() is not None:
+                    print(f"[WORKERS] Worker {proc.pid} exited ({proc.returncode}); restarting")
+                    self.procs[i] = self._spawn(i)
+
+    def start(self):
+        self.procs = [self._spawn(i) for i in range(self.processes)]
+        self._thread = threading.Thread(target=self._supervise, name="worker-pool", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def stats(self):
+        return [{"pid": p.pid, "alive": p.poll() is None} for p in self.procs]
+
+
+def queue_from_config(config, db_path=None):
+    return JobQueue(db_path or config.JOB_DB or os.path.join(config.OUTPUT_DIR, "jobs.db"),
+                    max_attempts=config.JOB_MAX_ATTEMPTS, requirements=config.JOB_REQUIREMENTS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run job queue workers")
+    parser.add_argument("--processes", type=int, default=1, help="Supervise this many worker processes")
+    parser.add_argument("--db", help="Job database (default JOB_DB or OUTPUT_DIR/jobs.db)")
+    parser.add_argument("--coordinator", help="Take jobs from this coordinator URL (default COORDINATOR_URL)")
+    parser.add_argument("--cores", type=int, help="Cores this node offers (default: all usable cores)")
+    parser.add_argument("--memory-mb", type=int, help="Memory this node offers (default: container limit)")
+    parser.add_argument("--share", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--index", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        pool = WorkerPool(args.processes, args.db, args.coordinator, args.cores, args.memory_mb).start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pool.stop()
+        return
+
+    from config import settings
+    config = settings.Config()
+    coordinator = args.coordinator or config.COORDINATOR_URL
+    if coordinator:
+        from core.coordinator import RemoteJobQueue
+        queue = RemoteJobQueue(coordinator, token=config.COORDINATOR_TOKEN)
+    else:
+        queue = queue_from_config(config, args.db)
+    capacity = node_capacity(args.share)
+    if args.cores:
+        capacity["cores"] = max(1, args.cores // args.share)
+    if args.memory_mb:
+        capacity["memory_mb"] = args.memory_mb // args.share
+    JobWorker(
+        queue,
+        type_limits=config.JOB_TYPE_LIMITS,
+        stale_after=config.JOB_HEARTBEAT_TIMEOUT,
+        cancel_grace=config.JOB_CANCEL_GRACE,
+        capacity=capacity,
+        output_dir=config.OUTPUT_DIR,
+        cpus=worker_cpus(capacity["cores"], args.index) if args.share > 1 or args.cores else None
+    ).run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+class LLMCache:
+    """Content-addressed SQLite cache for LLM completions with TTL and size-based LRU eviction."""
+
+    def __init__(self, path="assets/cache/llm_cache.sqlite", ttl_seconds=7 * 24 * 3600,
+                 max_bytes=64 * 1024 * 1024, bypass=False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "saved_seconds": 0.0}
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                provider TEXT,
+                model TEXT,
+                response TEXT,
+                size INTEGER,
+                latency REAL,
+                created_at REAL,
+                last_access REAL,
+                hit_count INTEGER DEFAULT 0
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_completions_access ON completions(last_access)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(provider, model, system, prompt, max_tokens, temperature):
+        """Hashes every input that can change the completion."""
+        material = json.dumps([provider, model, system, prompt, max_tokens, temperature], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key, count_miss=True):
+        """Returns the cached completion or None (expired entries count as misses, unless count_miss=False)."""
+        if self.bypass:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, latency, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_seconds and now - row[2] > self.ttl_seconds):
+                if row is not None:
+                    self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self._db.commit()
+                if count_miss:
+                    self._stats["misses"] += 1
+                return None
+
+            self._db.execute(
+                "UPDATE completions SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+            self._stats["hits"] += 1
+            self._stats["saved_seconds"] += row[1] or 0.0
+            return row[0]
+
+    def record_miss(self):
+        """Counts one miss for a lookup that tried several keys (see LLMGateway._cached)."""
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def put(self, key, provider, model, response, latency):
+        """Stores a completion and evicts least-recently-used entries beyond max_bytes."""
+        if self.bypass or response is None:
+            return
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions (key, provider, model, response, size, latency, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, response, size, latency, now, now)
+            )
+            self._stats["writes"] += 1
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now):
+        if self.ttl_seconds:
+            cur = self._db.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._stats["evictions"] += cur.rowcount
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM completions ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM completions")
+            self._db.commit()
+
+    def stats(self):
+        """Hit ratio and latency saved since process start, plus on-disk footprint."""
+        with self._lock:
+            entries, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["saved_seconds"] = round(stats["saved_seconds"], 2)
+        stats["entries"] = entries
+        stats["bytes"] = total
+        stats["bypass"] = self.bypass
+        return stats
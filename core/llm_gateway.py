@@ -0,0 +1,480 @@
+
+import json
+import time
+import asyncio
+import threading
+import weakref
+
+try:
+    # HTTP/2-capable pooled client (preferred)
+    import httpx
+except ImportError:
+    httpx = None
+import requests
+from requests.adapters import HTTPAdapter
+from core.tracing import span
+from core.rate_limiter import (RateLimiterRegistry, ProviderThrottled, CircuitOpen, estimate_tokens,
+                               raise_for_status)
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+GEMINI_MODEL = "gemini-1.5-flash"
+DEFAULT_TIMEOUT = 60
+
+
+class LLMError(Exception):
+    """Raised when every configured provider failed to answer a prompt."""
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _build_http_client(pool_size):
+    """Returns a keep-alive client: httpx (HTTP/2 when h2 is installed) or a pooled requests.Session."""
+    if httpx is not None:
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        return httpx.Client(http2=_http2_available(), limits=limits, timeout=DEFAULT_TIMEOUT,
+                            follow_redirects=True)
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class LLMGateway:
+    """Process-wide LLM entry point with pooled connections and OpenAI -> Gemini fallback."""
+
+    def __init__(self, openai_api_key=None, gemini_api_key=None, timeout=DEFAULT_TIMEOUT, pool_size=20):
+        self.openai_api_key = openai_api_key
+        self.gemini_api_key = gemini_api_key
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.openai_base_url = OPENAI_BASE_URL
+        # Empty means the Gemini SDK's default endpoint
+        self.gemini_base_url = ""
+        self.http = _build_http_client(pool_size)
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._gemini_lock = threading.Lock()
+        self._gemini_key_configured = None
+        self._gemini_models = {}
+        self.cache = None
+        # Per provider/endpoint budgets shared by LLM, TTS, image and stock-search calls
+        self.limits = RateLimiterRegistry()
+        self.max_retries = 3
+
+    def configure(self, openai_api_key=None, gemini_api_key=None, timeout=None, cache=None, limits=None,
+                  max_retries=None, openai_base_url=None, gemini_base_url=None):
+        """Updates the process-wide default keys without dropping warm connections."""
+        self.openai_api_key = openai_api_key
+        self.gemini_api_key = gemini_api_key
+        if openai_base_url:
+            self.openai_base_url = openai_base_url.rstrip("/")
+        if gemini_base_url is not None and gemini_base_url != self.gemini_base_url:
+            self.gemini_base_url = gemini_base_url.rstrip("/")
+            self._gemini_key_configured = None
+        if timeout:
+            self.timeout = timeout
+        if cache is not None:
+            self.cache = cache
+        if limits is not None:
+            self.limits.update(limits)
+        if max_retries is not None:
+            self.max_retries = max_retries
+
+    # --- Rate limiting ----------------------------------------------------
+
+    def limited(self, provider, endpoint, call, tokens=0):
+        """Runs call() inside the provider's rate limits.
+
+        Waits in the queue for budget and re-queues after 429s (honouring Retry-After)
+        instead of failing; raises CircuitOpen when the breaker is open so callers can
+        route to their fallback.
+        """
+        limiter = self.limits.get(provider, endpoint)
+        for attempt in range(self.max_retries + 1):
+            if not limiter.available():
+                raise CircuitOpen(f"{provider}:{endpoint} circuit open")
+            try:
+                with limiter.slot(tokens):
+                    return call()
+            except ProviderThrottled as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"[LIMITER] {provider}:{endpoint} throttled; re-queueing "
+                      f"(retry-after {e.retry_after if e.retry_after is not None else 'backoff'})...")
+
+    async def alimited(self, provider, endpoint, call, tokens=0):
+        """Async variant of limited(); call() returns an awaitable."""
+        limiter = self.limits.get(provider, endpoint)
+        for attempt in range(self.max_retries + 1):
+            if not limiter.available():
+                raise CircuitOpen(f"{provider}:{endpoint} circuit open")
+            pending = asyncio.ensure_future(asyncio.to_thread(limiter.acquire, tokens))
+            try:
+                slot = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The thread still ends up holding a slot; give it back when it does
+                pending.add_done_callback(
+                    lambda f: f.cancelled() or f.exception() is not None or limiter.abandon(f.result()))
+                raise
+            error = None
+            try:
+                return await call()
+            except ProviderThrottled as e:
+                slot.throttle(e.retry_after)
+                if attempt == self.max_retries:
+                    raise
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                limiter.release(slot, error)
+
+    # --- Request building -------------------------------------------------
+
+    def _openai_payload(self, prompt, system, model, max_tokens, temperature, response_format):
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        payload = {"model": model, "messages": messages}
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if response_format == "json":
+            payload["response_format"] = {"type": "json_object"}
+        elif isinstance(response_format, dict):
+            # JSON-schema constrained output: {"name": ..., "schema": {...}}
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": response_format["name"], "schema": response_format["schema"], "strict": True}
+            }
+        return payload
+
+    def _gemini_model(self, api_key, system):
+        """Configures the Gemini SDK once per key and reuses model handles per system prompt."""
+        import google.generativeai as genai
+        with self._gemini_lock:
+            if self._gemini_key_configured != api_key:
+                if self.gemini_base_url:
+                    genai.configure(api_key=api_key, transport="rest",
+                                    client_options={"api_endpoint": self.gemini_base_url})
+                else:
+                    genai.configure(api_key=api_key)
+                self._gemini_key_configured = api_key
+                self._gemini_models = {}
+            model = self._gemini_models.get(system)
+            if model is None:
+                model = genai.GenerativeModel(model_name=GEMINI_MODEL, system_instruction=system)
+                self._gemini_models[system] = model
+            return genai, model
+
+    def _gemini_config(self, genai, max_tokens, temperature, response_format):
+        kwargs = {"temperature": 0.7 if temperature is None else temperature}
+        if max_tokens:
+            kwargs["max_output_tokens"] = max_tokens
+        if response_format:
+            kwargs["response_mime_type"] = "application/json"
+        return genai.types.GenerationConfig(**kwargs)
+
+    def _providers(self, api_key, gemini_api_key, fallback):
+        openai_key = api_key or self.openai_api_key
+        gemini_key = gemini_api_key or self.gemini_api_key
+        providers = []
+        if openai_key:
+            providers.append(("openai", openai_key))
+        if gemini_key and (fallback or not providers):
+            providers.append(("gemini", gemini_key))
+        return providers
+
+    def _cache_keys(self, providers, prompt, system, model, max_tokens, temperature):
+        """Maps each candidate provider to its content-addressed cache key."""
+        keys = {}
+        for provider, _ in providers:
+            provider_model = model if provider == "openai" else GEMINI_MODEL
+            keys[provider] = self.cache.make_key(provider, provider_model, system, prompt, max_tokens, temperature)
+        return keys
+
+    def _cached(self, keys):
+        # One lookup is one hit or one miss, however many provider keys it tries
+        for provider, key in keys.items():
+            hit = self.cache.get(key, count_miss=False)
+            if hit is not None:
+                print(f"[LLM] Cache hit ({provider}).")
+                return hit
+        self.cache.record_miss()
+        return None
+
+    # --- Sync entry point -------------------------------------------------
+
+    def chat(self, prompt, system=None, model="gpt-4o", max_tokens=None, temperature=None,
+             response_format=None, timeout=None, api_key=None, gemini_api_key=None, fallback=True,
+             cache=False):
+        """Returns the completion text, trying OpenAI first and Gemini second. Raises LLMError.
+
+        cache=True opts the call into the shared response cache (when one is configured).
+        """
+        providers = self._providers(api_key, gemini_api_key, fallback)
+        cache_keys = self._cache_keys(providers, prompt, system, model, max_tokens, temperature) \
+            if cache and self.cache else {}
+        hit = self._cached(cache_keys) if cache_keys else None
+        if hit is not None:
+            return hit
+
+        tokens = estimate_tokens(prompt, system, max_tokens=max_tokens)
+        errors = []
+        for provider, key in providers:
+            try:
+                started = time.perf_counter()
+                with span("llm.chat", provider=provider, model=model if provider == "openai" else GEMINI_MODEL,
+                          prompt_chars=len(prompt)) as s:
+                    if provider == "openai":
+                        text = self.limited("openai", "chat", lambda: self._openai_chat(
+                            key, prompt, system, model, max_tokens, temperature, response_format,
+                            timeout or self.timeout
+                        ), tokens=tokens)
+                    else:
+                        text = self.limited("gemini", "chat", lambda: self._gemini_chat(
+                            key, prompt, system, max_tokens, temperature, response_format
+                        ), tokens=tokens)
+                    s.set(response_chars=len(text or ""))
+                if cache_keys:
+                    self.cache.put(cache_keys[provider], provider, model if provider == "openai" else GEMINI_MODEL,
+                                   text, time.perf_counter() - started)
+                return text
+            except Exception as e:
+                print(f"[LLM] {provider} error: {e}")
+                errors.append(f"{provider}: {e}")
+
+        raise LLMError("; ".join(errors) or "No LLM provider configured.")
+
+    def _openai_chat(self, key, prompt, system, model, max_tokens, temperature, response_format, timeout):
+        response = self.http.post(
+            f"{self.openai_base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {key}"},
+            json=self._openai_payload(prompt, system, model, max_tokens, temperature, response_format),
+            timeout=timeout
+        )
+        raise_for_status(response)
+        return response.json()['choices'][0]['message']['content']
+
+    @staticmethod
+    def _gemini_throttled(error):
+        """Maps google.api_core quota errors onto ProviderThrottled."""
+        if type(error).__name__ in ("ResourceExhausted", "TooManyRequests"):
+            return ProviderThrottled(str(error))
+        return error
+
+    def _gemini_chat(self, key, prompt, system, max_tokens, temperature, response_format):
+        genai, gemini = self._gemini_model(key, system)
+        try:
+            response = gemini.generate_content(
+                prompt,
+                generation_config=self._gemini_config(genai, max_tokens, temperature, response_format)
+            )
+        except Exception as e:
+            raise self._gemini_throttled(e)
+        return response.text
+
+    # --- Streaming entry point --------------------------------------------
+
+    def stream_chat(self, prompt, system=None, model="gpt-4o", max_tokens=None, temperature=None,
+                    timeout=None, api_key=None, gemini_api_key=None, fallback=True):
+        """Yields completion text deltas as they arrive (OpenAI SSE, then Gemini streaming).
+
+        A provider is only abandoned for the next one if it fails before its first delta.
+        """
+        tokens = estimate_tokens(prompt, system, max_tokens=max_tokens)
+        errors = []
+        for provider, key in self._providers(api_key, gemini_api_key, fallback):
+            started = False
+            limiter = self.limits.get(provider, "chat")
+            try:
+                if not limiter.available():
+                    raise CircuitOpen(f"{provider}:chat circuit open")
+                if provider == "openai":
+                    deltas = self._openai_stream(key, prompt, system, model, max_tokens, temperature,
+                                                 timeout or self.timeout)
+                else:
+                    deltas = self._gemini_stream(key, prompt, system, max_tokens, temperature)
+                with limiter.slot(tokens):
+                    for delta in deltas:
+                        started = True
+                        yield delta
+                return
+            except Exception as e:
+                if started:
+                    raise
+                print(f"[LLM] {provider} stream error: {e}")
+                errors.append(f"{provider}: {e}")
+
+        raise LLMError("; ".join(errors) or "No LLM provider configured.")
+
+    def _openai_stream(self, key, prompt, system, model, max_tokens, temperature, timeout):
+        payload = self._openai_payload(prompt, system, model, max_tokens, temperature, None)
+        payload["stream"] = True
+        url = f"{self.openai_base_url}/chat/completions"
+        headers = {"Authorization": f"Bearer {key}"}
+
+        if httpx is not None and isinstance(self.http, httpx.Client):
+            with self.http.stream("POST", url, headers=headers, json=payload, timeout=timeout) as response:
+                raise_for_status(response)
+                yield from self._sse_deltas(response.iter_lines())
+        else:
+            response = self.http.post(url, headers=headers, json=payload, timeout=timeout, stream=True)
+            try:
+                raise_for_status(response)
+                yield from self._sse_deltas(response.iter_lines(decode_unicode=True))
+            finally:
+                response.close()
+
+    @staticmethod
+    def _sse_deltas(lines):
+        for line in lines:
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get("choices") or [{}]
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+    def _gemini_stream(self, key, prompt, system, max_tokens, temperature):
+        genai, gemini = self._gemini_model(key, system)
+        try:
+            response = gemini.generate_content(
+                prompt,
+                generation_config=self._gemini_config(genai, max_tokens, temperature, None),
+                stream=True
+            )
+        except Exception as e:
+            raise self._gemini_throttled(e)
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    # --- Downloads --------------------------------------------------------
+
+    def download(self, url, output_path, timeout=60, chunk_size=1 << 16):
+        """Streams `url` to `output_path` over the pooled client (a warm connection per media host)."""
+        if httpx is not None and isinstance(self.http, httpx.Client):
+            with self.http.stream("GET", url, timeout=timeout) as response:
+                response.raise_for_status()
+                with open(output_path, "wb") as f:
+                    for chunk in response.iter_bytes(chunk_size):
+                        f.write(chunk)
+        else:
+            with self.http.get(url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                with open(output_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+        return output_path
+
+    # --- Async entry point ------------------------------------------------
+
+    def _async_client(self):
+        """One httpx.AsyncClient per running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            client = httpx.AsyncClient(http2=_http2_available(), limits=limits, timeout=self.timeout,
+                                       follow_redirects=True)
+            self._async_clients[loop] = client
+        return client
+
+    async def achat(self, prompt, system=None, model="gpt-4o", max_tokens=None, temperature=None,
+                    response_format=None, timeout=None, api_key=None, gemini_api_key=None, fallback=True,
+                    cache=False):
+        """Async variant of chat(); never blocks the running event loop."""
+        if httpx is None:
+            return await asyncio.to_thread(
+                self.chat, prompt, system=system, model=model, max_tokens=max_tokens,
+                temperature=temperature, response_format=response_format, timeout=timeout,
+                api_key=api_key, gemini_api_key=gemini_api_key, fallback=fallback, cache=cache
+            )
+
+        providers = self._providers(api_key, gemini_api_key, fallback)
+        cache_keys = self._cache_keys(providers, prompt, system, model, max_tokens, temperature) \
+            if cache and self.cache else {}
+        hit = self._cached(cache_keys) if cache_keys else None
+        if hit is not None:
+            return hit
+
+        tokens = estimate_tokens(prompt, system, max_tokens=max_tokens)
+        errors = []
+        for provider, key in providers:
+            try:
+                started = time.perf_counter()
+                with span("llm.chat", provider=provider, model=model if provider == "openai" else GEMINI_MODEL,
+                          prompt_chars=len(prompt), mode="async") as s:
+                    text = await self.alimited(provider, "chat", lambda: self._achat_provider(
+                        provider, key, prompt, system, model, max_tokens, temperature, response_format, timeout
+                    ), tokens=tokens)
+                    s.set(response_chars=len(text or ""))
+                if cache_keys:
+                    self.cache.put(cache_keys[provider], provider, model if provider == "openai" else GEMINI_MODEL,
+                                   text, time.perf_counter() - started)
+                return text
+            except Exception as e:
+                print(f"[LLM] {provider} error: {e}")
+                errors.append(f"{provider}: {e}")
+
+        raise LLMError("; ".join(errors) or "No LLM provider configured.")
+
+    async def _achat_provider(self, provider, key, prompt, system, model, max_tokens, temperature,
+                              response_format, timeout):
+        if provider == "openai":
+            response = await self._async_client().post(
+                f"{self.openai_base_url}/chat/completions",
+                headers={"Authorization": f"Bearer {key}"},
+                json=self._openai_payload(prompt, system, model, max_tokens, temperature, response_format),
+                timeout=timeout or self.timeout
+            )
+            raise_for_status(response)
+            return response.json()['choices'][0]['message']['content']
+
+        genai, gemini = self._gemini_model(key, system)
+        try:
+            response = await gemini.generate_content_async(
+                prompt,
+                generation_config=self._gemini_config(genai, max_tokens, temperature, response_format)
+            )
+        except Exception as e:
+            raise self._gemini_throttled(e)
+        return response.text
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Returns the shared process-wide LLMGateway."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
+
+
+def configure_gateway(openai_api_key=None, gemini_api_key=None, timeout=None, cache=None, limits=None,
+                      max_retries=None, openai_base_url=None, gemini_base_url=None):
+    """Sets the default provider keys (plus optional response cache, rate limits and endpoints) on the shared gateway."""
+    gateway = get_gateway()
+    gateway.configure(openai_api_key=openai_api_key, gemini_api_key=gemini_api_key, timeout=timeout, cache=cache,
+                      limits=limits, max_retries=max_retries, openai_base_url=openai_base_url,
+                      gemini_base_url=gemini_base_url)
+    return gateway
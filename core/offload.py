@@ -0,0 +1,125 @@
+
+import time
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from core.tracing import get_metrics
+
+DEFAULT_LIMIT = {"concurrency": 4, "timeout": 90, "queue_timeout": 5}
+
+
+class OffloadRejected(RuntimeError):
+    """The endpoint group already runs its maximum number of calls and none freed up in time."""
+
+    def __init__(self, group, retry_after=5):
+        super().__init__(f"Too many '{group}' requests in flight")
+        self.group = group
+        self.retry_after = retry_after
+
+
+class OffloadTimeout(TimeoutError):
+    def __init__(self, group, timeout):
+        super().__init__(f"'{group}' did not finish within {timeout:g}s")
+        self.group = group
+
+
+class BlockingOffload:
+    """Runs blocking engine calls (sync LLM/HTTP clients, file work) off the API's event loop.
+
+    Calls go to one bounded thread pool; each endpoint group has its own concurrency
+    limit, so a burst of slow script generations can't take every thread from the
+    cheap endpoints, and a timeout after which the request fails with 504. A call that
+    times out keeps its slot until its thread really returns, so the limit still holds.
+    """
+
+    def __init__(self, max_workers=16, limits=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api-offload")
+        self.max_workers = max_workers
+        self.limits = {"default": dict(DEFAULT_LIMIT)}
+        self.limits.update({k: {**DEFAULT_LIMIT, **v} for k, v in (limits or {}).items()})
+        self.lock = threading.Lock()
+        self.semaphores = {}
+        self.counters = {}
+
+    def _limit(self, group):
+        return self.limits.get(group) or self.limits["default"]
+
+    def _semaphore(self, group):
+        with self.lock:
+            if group not in self.semaphores:
+                self.semaphores[group] = asyncio.Semaphore(self._limit(group)["concurrency"])
+                self.counters[group] = {"in_flight": 0, "completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+            return self.semaphores[group]
+
+    def _count(self, group, key, amount=1):
+        with self.lock:
+            self.counters[group][key] += amount
+
+    async def run(self, group, fn, *args, **kwargs):
+        """Awaits fn(*args, **kwargs) on the pool. Raises OffloadRejected or OffloadTimeout."""
+        limit = self._limit(group)
+        semaphore = self._semaphore(group)
+        loop = asyncio.get_running_loop()
+
+        waited = time.perf_counter()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), limit["queue_timeout"])
+        except asyncio.TimeoutError:
+            self._count(group, "rejected")
+            get_metrics().inc("api_offload_rejected_total", {"group": group},
+                              help_text="Blocking API calls refused because their group was at its limit")
+            raise OffloadRejected(group, retry_after=max(1, int(limit["queue_timeout"])))
+        get_metrics().observe("api_offload_wait_seconds", time.perf_counter() - waited, {"group": group},
+                              help_text="Time blocking API calls waited for a slot in their group")
+
+        self._count(group, "in_flight")
+        ctx = contextvars.copy_context()
+
+        def call():
+            try:
+                return ctx.run(fn, *args, **kwargs)
+            finally:
+                # Released from the worker thread, so a timed-out call holds its slot until it really ends
+                loop.call_soon_threadsafe(semaphore.release)
+                self._count(group, "in_flight", -1)
+
+        future = loop.run_in_executor(self.executor, call)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), limit["timeout"])
+        except asyncio.TimeoutError:
+            self._count(group, "timed_out")
+            get_metrics().inc("api_offload_timeouts_total", {"group": group},
+                              help_text="Blocking API calls that exceeded their group's timeout")
+            raise OffloadTimeout(group, limit["timeout"])
+        except Exception:
+            self._count(group, "failed")
+            raise
+        self._count(group, "completed")
+        return result
+
+    def stats(self):
+        with self.lock:
+            return {
+                "max_workers": self.max_workers,
+                "groups": {g: {**self._limit(g), **c} for g, c in self.counters.items()}
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_offload = None
+
+
+def get_offload():
+    global _offload
+    if _offload is None:
+        _offload = BlockingOffload()
+    return _offload
+
+
+def configure_offload(max_workers=16, limits=None):
+    global _offload
+    _offload = BlockingOffload(max_workers=max_workers, limits=limits)
+    return _offload
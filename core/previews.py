@@ -0,0 +1,210 @@
+
+"""Low-bitrate HLS previews, poster frames and scrub sprites for rendered videos.
+
+Previews are built when a render finishes (VideoEditor) and stored next to the
+masters in OUTPUT_DIR/previews/<video>/; the dashboard streams those and only the
+explicit download touches the master. To build previews for renders that predate
+them (or came from another node), run `python -m core.previews [--limit N]`.
+"""
+import os
+import sys
+import json
+import math
+import shutil
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tracing import span
+from core.video_catalog import probe_video
+
+DEFAULT_LADDER = [
+    {"name": "360p", "height": 360, "video_kbps": 500, "audio_kbps": 64},
+    {"name": "540p", "height": 540, "video_kbps": 1000, "audio_kbps": 96}
+]
+
+
+def _even(value):
+    return max(2, int(round(value / 2)) * 2)
+
+
+class PreviewBuilder:
+    """Packages one master into an HLS ladder, a poster and a sprite sheet in a single ffmpeg pass.
+
+    The master is decoded once and split to every rendition, the poster and the
+    sprite. Renditions are sized by the short side (360p of a vertical video is
+    360 wide) and never upscale; keyframes are forced on segment boundaries so each
+    short segment starts clean. The previews are written to a temp directory and
+    swapped in whole, so a player never sees a half-written playlist.
+    """
+
+    def __init__(self, output_dir, ladder=None, segment_seconds=2, sprite_interval=2, sprite_width=160,
+                 sprite_columns=10, timeout=900):
+        self.output_dir = output_dir
+        self.root = os.path.join(output_dir, "previews")
+        self.ladder = ladder or DEFAULT_LADDER
+        self.segment_seconds = segment_seconds
+        self.sprite_interval = sprite_interval
+        self.sprite_width = sprite_width
+        self.sprite_columns = sprite_columns
+        self.timeout = timeout
+
+    def preview_dir(self, video_path):
+        return os.path.join(self.root, os.path.splitext(os.path.basename(video_path))[0])
+
+    def _renditions(self, width, height):
+        short, long_side = min(width, height), max(width, height)
+        rungs = [r for r in sorted(self.ladder, key=lambda r: r["height"]) if r["height"] < short]
+        rungs = rungs or [{**min(self.ladder, key=lambda r: r["height"]), "height": short}]
+        renditions = []
+        for rung in rungs:
+            scaled = _even(long_side * rung["height"] / short)
+            w, h = (scaled, _even(rung["height"])) if width >= height else (_even(rung["height"]), scaled)
+            renditions.append({"name": rung["name"], "width": w, "height": h,
+                               "video_kbps": rung["video_kbps"], "audio_kbps": rung["audio_kbps"],
+                               "bandwidth": int((rung["video_kbps"] + rung["audio_kbps"]) * 1100)})
+        return renditions
+
+    def _command(self, ffmpeg, video_path, work, renditions, duration, sprite, threads):
+        n = len(renditions)
+        poster_at = min(3.0, duration * 0.1)
+        largest = renditions[-1]
+        graph = [f"[0:v]split={n + 2}" + "".join(f"[r{i}]" for i in range(n)) + "[p][s]"]
+        graph += [f"[r{i}]scale={r['width']}:{r['height']}[v{i}]" for i, r in enumerate(renditions)]
+        graph.append(f"[p]select='gte(t\\,{poster_at:.2f})',scale={largest['width']}:{largest['height']}[poster]")
+        graph.append(f"[s]fps=1/{self.sprite_interval},scale={sprite['width']}:{sprite['height']},"
+                     f"tile={sprite['columns']}x{sprite['rows']}[sprite]")
+        cmd = [ffmpeg, "-y", "-loglevel", "error", "-i", video_path, "-filter_complex", ";".join(graph)]
+        for i, r in enumerate(renditions):
+            folder = os.path.join(work, r["name"])
+            os.makedirs(folder, exist_ok=True)
+            cmd += ["-map", f"[v{i}]", "-map", "0:a?",
+                    "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main",
+                    "-b:v", f"{r['video_kbps']}k", "-maxrate", f"{int(r['video_kbps'] * 1.1)}k",
+                    "-bufsize", f"{r['video_kbps'] * 2}k",
+                    "-force_key_frames", f"expr:gte(t,n_forced*{self.segment_seconds})",
+                    "-c:a", "aac", "-b:a", f"{r['audio_kbps']}k", "-ac", "2"]
+            if threads:
+                cmd += ["-threads", str(threads)]
+            cmd += ["-f", "hls", "-hls_time", str(self.segment_seconds), "-hls_playlist_type", "vod",
+                    "-hls_segment_filename", os.path.join(folder, "seg_%04d.ts"), os.path.join(folder, "index.m3u8")]
+        cmd += ["-map", "[poster]", "-frames:v", "1", "-q:v", "3", os.path.join(work, "poster.jpg")]
+        cmd += ["-map", "[sprite]", "-frames:v", "1", "-q:v", "5", os.path.join(work, "sprite.jpg")]
+        return cmd
+
+    def _write_playlists(self, work, renditions, sprite):
+        with open(os.path.join(work, "master.m3u8"), "w") as f:
+            f.write("#EXTM3U\n#EXT-X-VERSION:3\n")
+            for r in renditions:
+                f.write(f"#EXT-X-STREAM-INF:BANDWIDTH={r['bandwidth']},RESOLUTION={r['width']}x{r['height']}\n"
+                        f"{r['name']}/index.m3u8\n")
+
+        def stamp(seconds):
+            return f"{int(seconds // 3600):02}:{int(seconds % 3600 // 60):02}:{seconds % 60:06.3f}"
+
+        # WebVTT thumbnail track: each cue points at its tile (the usual player scrub-preview format)
+        with open(os.path.join(work, "sprite.vtt"), "w") as f:
+            f.write("WEBVTT\n\n")
+            for i in range(sprite["count"]):
+                x, y = i % sprite["columns"] * sprite["width"], i // sprite["columns"] * sprite["height"]
+                f.write(f"{stamp(i * self.sprite_interval)} --> {stamp((i + 1) * self.sprite_interval)}\n"
+                        f"sprite.jpg#xywh={x},{y},{sprite['width']},{sprite['height']}\n\n")
+
+    def build(self, video_path, duration=None, size=None, threads=None):
+        """Builds (or rebuilds) the previews of one master; returns their manifest, or None on failure."""
+        if not duration or not size:
+            info = probe_video(video_path)
+            duration = duration or info.get("duration")
+            size = size or ((info["width"], info["height"]) if "width" in info else None)
+        if not duration or not size:
+            print(f"[PREVIEW] Skipping {os.path.basename(video_path)}: duration/size unknown")
+            return None
+        width, height = size
+        renditions = self._renditions(width, height)
+        count = max(1, math.ceil(duration / self.sprite_interval))
+        columns = min(self.sprite_columns, count)
+        sprite = {"file": "sprite.jpg", "vtt": "sprite.vtt", "interval": self.sprite_interval, "count": count,
+                  "columns": columns, "rows": math.ceil(count / columns), "width": _even(self.sprite_width),
+                  "height": _even(self.sprite_width * height / width)}
+
+        final = self.preview_dir(video_path)
+        work = f"{final}.tmp"
+        shutil.rmtree(work, ignore_errors=True)
+        os.makedirs(work)
+        with span("render.preview", renditions=len(renditions), duration=round(duration, 2)) as s:
+            try:
+                import imageio_ffmpeg
+                cmd = self._command(imageio_ffmpeg.get_ffmpeg_exe(), video_path, work, renditions, duration,
+                                    sprite, threads)
+                proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+                if proc.returncode != 0:
+                    raise RuntimeError(proc.stderr.strip()[-500:] or f"ffmpeg exited with {proc.returncode}")
+                self._write_playlists(work, renditions, sprite)
+                manifest = {
+                    "dir": os.path.basename(final),
+                    "master": "master.m3u8",
+                    "poster": "poster.jpg",
+                    "segment_seconds": self.segment_seconds,
+                    "renditions": [{k: r[k] for k in ("name", "width", "height", "bandwidth")} for r in renditions],
+                    "sprite": sprite
+                }
+                with open(os.path.join(work, "preview.json"), "w") as f:
+                    json.dump(manifest, f, indent=4)
+            except Exception as e:
+                shutil.rmtree(work, ignore_errors=True)
+                s.set(ok=False)
+                print(f"[PREVIEW] Could not build previews for {os.path.basename(video_path)}: {e}")
+                return None
+            shutil.rmtree(final, ignore_errors=True)
+            os.replace(work, final)
+            s.set(ok=True, bytes=sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(final)
+                                     for f in files))
+        return manifest
+
+
+def backfill(catalog, builder, limit=None, names=None):
+    """Builds previews for catalogued renders (all, or `names`) that have none; returns how many were built."""
+    built = 0
+    for video in catalog.without_preview(limit, names):
+        size = (video["width"], video["height"]) if video["width"] and video["height"] else None
+        preview = builder.build(video["path"], duration=video["duration"] or None, size=size)
+        if preview:
+            catalog.record(video["path"], preview=preview)
+            built += 1
+    return built
+
+
+_builder = None
+
+
+def get_preview_builder():
+    """The configured builder, or None when previews are disabled."""
+    return _builder
+
+
+def configure_previews(output_dir, enabled=True, ladder=None, segment_seconds=2, sprite_interval=2):
+    global _builder
+    _builder = PreviewBuilder(output_dir, ladder=ladder, segment_seconds=segment_seconds,
+                              sprite_interval=sprite_interval) if enabled else None
+    return _builder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build HLS previews for renders that have none")
+    parser.add_argument("--limit", type=int, help="Build at most this many")
+    args = parser.parse_args()
+
+    from config import settings
+    from core.video_catalog import configure_catalog
+    config = settings.Config()
+    catalog = configure_catalog(config.CATALOG_DB or os.path.join(config.OUTPUT_DIR, "catalog.db"), config.OUTPUT_DIR)
+    catalog.reconcile()
+    builder = PreviewBuilder(config.OUTPUT_DIR, ladder=config.PREVIEW_LADDER,
+                             segment_seconds=config.PREVIEW_SEGMENT_SECONDS,
+                             sprite_interval=config.PREVIEW_SPRITE_INTERVAL)
+    print(f"[PREVIEW] Built previews for {backfill(catalog, builder, args.limit)} render(s)")
+
+
+if __name__ == "__main__":
+    main()
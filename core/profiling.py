@@ -0,0 +1,216 @@
+
+import os
+import sys
+import time
+import atexit
+import random
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+
+# Child Python processes started while this is set profile themselves into that path prefix
+WORKER_ENV = "FVS_PROFILE_PREFIX"
+
+_active = contextvars.ContextVar("profiler", default=None)
+_requested = contextvars.ContextVar("profile_requested", default=False)
+
+
+class SamplingProfiler:
+    """Low-overhead wall-clock stack sampler for one production job.
+
+    A daemon thread snapshots `sys._current_frames()` every `interval` seconds and keeps
+    only the threads working for this job: the thread that started it plus any thread
+    that opens a tracing span while the job's context is active (StageGraph stages,
+    streaming TTS workers). Output is a folded-stack file (flamegraph.pl / speedscope)
+    and a top-N self/inclusive time summary.
+    """
+
+    def __init__(self, interval=0.01, top_n=25, all_threads=False):
+        self.interval = interval
+        self.top_n = top_n
+        # Worker processes sample every thread; jobs only their own
+        self.all_threads = all_threads
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampler_seconds = 0.0
+        self.threads = Counter()
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._token = None
+        self._started = None
+        self._wall = 0.0
+
+    # --- thread membership ------------------------------------------------
+
+    def enter_thread(self, ident=None):
+        with self.lock:
+            self.threads[ident or threading.get_ident()] += 1
+
+    def exit_thread(self, ident=None):
+        ident = ident or threading.get_ident()
+        with self.lock:
+            self.threads[ident] -= 1
+            if self.threads[ident] <= 0:
+                del self.threads[ident]
+
+    # --- lifecycle ----------------------------------------------------------
+
+    def start(self):
+        self._token = _active.set(self)
+        self.enter_thread()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="job-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._wall = time.perf_counter() - self._started
+        self.exit_thread()
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            with self.lock:
+                wanted = set(self.threads)
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (not self.all_threads and ident not in wanted):
+                    continue
+                self.stacks[self._fold(frame)] += 1
+            self.samples += 1
+            self.sampler_seconds += time.perf_counter() - started
+
+    @staticmethod
+    def _fold(frame):
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    # --- output ---------------------------------------------------------------
+
+    def top(self):
+        """(self_counts, inclusive_counts) per function."""
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                inclusive[name] += count
+        return own, inclusive
+
+    def save(self, prefix):
+        """Writes {prefix}.collapsed and {prefix}.txt; returns their paths."""
+        os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+        collapsed = f"{prefix}.collapsed"
+        with open(collapsed, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        total = sum(self.stacks.values()) or 1
+        own, inclusive = self.top()
+        overhead = self.sampler_seconds / self._wall if self._wall else 0.0
+        lines = [
+            f"Wall time: {self._wall:.2f}s | samples: {self.samples} @ {self.interval * 1000:.0f}ms "
+            f"| stacks: {total} | sampler overhead: {overhead:.2%}",
+            "",
+            f"Top {self.top_n} by self time:",
+        ]
+        for name, count in own.most_common(self.top_n):
+            lines.append(f"  {count / total:6.1%}  {count * self.interval:8.2f}s  {name}")
+        lines += ["", f"Top {self.top_n} by inclusive time:"]
+        for name, count in inclusive.most_common(self.top_n):
+            lines.append(f"  {count / total:6.1%}  {count * self.interval:8.2f}s  {name}")
+
+        summary = f"{prefix}.txt"
+        with open(summary, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return collapsed, summary
+
+
+def note_thread_enter():
+    """Called from tracing spans so worker threads join the active job's profile.
+
+    Returns the profiler to hand back to note_thread_exit() (or None).
+    """
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.enter_thread()
+    return profiler
+
+
+def note_thread_exit(profiler):
+    if profiler is not None:
+        profiler.exit_thread()
+
+
+@contextmanager
+def request_profiling():
+    """Marks every job started inside this block (e.g. a whole niche run) for profiling."""
+    token = _requested.set(True)
+    try:
+        yield
+    finally:
+        _requested.reset(token)
+
+
+def run_profiled(fn, *args, **kwargs):
+    """BackgroundTasks-friendly wrapper: fn(*args, **kwargs) with profiling requested."""
+    with request_profiling():
+        return fn(*args, **kwargs)
+
+
+@contextmanager
+def profile_job(output_prefix, enabled=None, sample_rate=0.0, interval=0.01, top_n=25, include_workers=False):
+    """Profiles the wrapped job when enabled (or requested / sampled); nested jobs reuse the outer profile.
+
+    Yields the profiler (or None). Files land at {output_prefix}_profile.collapsed/.txt.
+    """
+    if _active.get() is not None:
+        yield _active.get()
+        return
+    if enabled is None:
+        enabled = _requested.get() or (sample_rate > 0 and random.random() < sample_rate)
+    if not enabled:
+        yield None
+        return
+
+    prefix = f"{output_prefix}_profile"
+    previous_env = os.environ.get(WORKER_ENV)
+    if include_workers:
+        os.environ[WORKER_ENV] = prefix
+    profiler = SamplingProfiler(interval=interval, top_n=top_n).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        if include_workers:
+            if previous_env is None:
+                os.environ.pop(WORKER_ENV, None)
+            else:
+                os.environ[WORKER_ENV] = previous_env
+        try:
+            collapsed, summary = profiler.save(prefix)
+            print(f"[PROFILE] Saved {collapsed} and {summary}")
+        except Exception as e:
+            print(f"[PROFILE] Could not save profile: {e}")
+
+
+def profile_worker_from_env(interval=0.01, top_n=25):
+    """Worker processes: profile the whole process when the parent job asked for it."""
+    prefix = os.environ.get(WORKER_ENV)
+    if not prefix or _active.get() is not None:
+        return None
+    profiler = SamplingProfiler(interval=interval, top_n=top_n, all_threads=True).start()
+    atexit.register(lambda: (profiler.stop(), profiler.save(f"{prefix}.worker{os.getpid()}")))
+    return profiler
@@ -0,0 +1,294 @@
+
+import time
+import threading
+from contextlib import contextmanager
+
+# Requests/tokens per minute and starting concurrency per "provider:endpoint"
+DEFAULT_LIMITS = {
+    "openai:chat": {"rpm": 500, "tpm": 200000, "concurrency": 8, "max_concurrency": 32},
+    "openai:tts": {"rpm": 50, "concurrency": 4, "max_concurrency": 8},
+    "openai:images": {"rpm": 5, "concurrency": 2, "max_concurrency": 4},
+    "gemini:chat": {"rpm": 15, "tpm": 1000000, "concurrency": 4, "max_concurrency": 8},
+    "pexels:search": {"rpm": 3, "concurrency": 2, "max_concurrency": 4}
+}
+
+
+class ProviderThrottled(Exception):
+    """A provider answered 429 / quota exhausted."""
+
+    def __init__(self, message="Rate limited", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpen(Exception):
+    """The breaker for a provider is open; callers should route to the fallback."""
+
+
+def parse_retry_after(value, default=None):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """Blocking token bucket refilled continuously at `per_minute` tokens per minute."""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1, timeout=None):
+        """Waits until `amount` tokens are available; returns the seconds spent queued."""
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        with self.cond:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return time.monotonic() - started
+                wait = (amount - self.tokens) / self.rate
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for rate limit budget")
+                    wait = min(wait, remaining)
+                self.cond.wait(wait)
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency window: +1 per window of successes, halved on every throttle."""
+
+    def __init__(self, initial=4, minimum=1, maximum=32):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        started = time.monotonic()
+        with self.cond:
+            while self.in_flight >= int(self.limit):
+                remaining = None if timeout is None else timeout - (time.monotonic() - started)
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a concurrency slot")
+                self.cond.wait(remaining)
+            self.in_flight += 1
+        return time.monotonic() - started
+
+    def release(self, throttled=False, success=False):
+        with self.cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif success:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self.cond.notify_all()
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures; half-open probe after `cooldown`.
+
+    While half-open exactly one caller (the probe) is let through; its success closes the
+    breaker and its failure re-opens it. A probe that never reports back (it timed out in
+    the queue) is replaced by a new one after another `cooldown`.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_at = 0.0
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self.probe_at = now
+                return True
+            if self.state == "half_open" and now - self.probe_at >= self.cooldown:
+                self.probe_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                print(f"[LIMITER] Circuit opened after {self.failures} failures.")
+
+
+class _Slot:
+    """Handle yielded by ProviderLimiter.slot(); callers report throttles through it."""
+
+    def __init__(self):
+        self.throttled = False
+        self.retry_after = None
+
+    def throttle(self, retry_after=None):
+        self.throttled = True
+        self.retry_after = retry_after
+
+
+class ProviderLimiter:
+    """Token buckets (RPM/TPM), AIMD concurrency, Retry-After pauses and a breaker for one endpoint."""
+
+    def __init__(self, name, rpm=None, tpm=None, concurrency=4, max_concurrency=16,
+                 failure_threshold=5, cooldown=30, queue_timeout=300):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(initial=concurrency, maximum=max_concurrency)
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, cooldown=cooldown)
+        self.queue_timeout = queue_timeout
+        self.pause_until = 0.0
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "throttled": 0, "queued": 0, "queued_seconds": 0.0,
+                         "failures": 0, "rejected_open": 0}
+
+    def _count(self, key, amount=1):
+        with self.lock:
+            self.counters[key] += amount
+
+    def available(self):
+        """False while the breaker is open (the call should go to the fallback provider)."""
+        if self.breaker.allow():
+            return True
+        self._count("rejected_open")
+        return False
+
+    def acquire(self, tokens=0):
+        """Queues for budget and a concurrency slot; returns a _Slot to pass to release()."""
+        waited = 0.0
+        pause = self.pause_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        if self.requests:
+            waited += self.requests.acquire(1, timeout=self.queue_timeout)
+        if self.tokens and tokens:
+            waited += self.tokens.acquire(tokens, timeout=self.queue_timeout)
+        waited += self.concurrency.acquire(timeout=self.queue_timeout)
+
+        self._count("requests")
+        if waited > 0.01:
+            self._count("queued")
+            self._count("queued_seconds", waited)
+        return _Slot()
+
+    def release(self, slot, error=None):
+        if slot.throttled:
+            self._count("throttled")
+            # Honour Retry-After for everyone queued on this endpoint
+            delay = slot.retry_after if slot.retry_after is not None else 2.0
+            with self.lock:
+                self.pause_until = max(self.pause_until, time.monotonic() + delay)
+            self.breaker.record_failure()
+        elif error is not None:
+            self._count("failures")
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        self.concurrency.release(throttled=slot.throttled, success=error is None and not slot.throttled)
+
+    def abandon(self, slot):
+        """Hands back a slot that was never used (its caller was cancelled while queueing for it)."""
+        self.concurrency.release()
+
+    @contextmanager
+    def slot(self, tokens=0):
+        slot = self.acquire(tokens)
+        error = None
+        try:
+            yield slot
+        except ProviderThrottled as e:
+            slot.throttle(e.retry_after)
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.release(slot, error)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+        stats["queued_seconds"] = round(stats["queued_seconds"], 2)
+        stats["concurrency_limit"] = round(self.concurrency.limit, 2)
+        stats["in_flight"] = self.concurrency.in_flight
+        stats["breaker_state"] = self.breaker.state
+        stats["breaker_trips"] = self.breaker.trips
+        return stats
+
+
+class RateLimiterRegistry:
+    """Process-wide map of "provider:endpoint" -> ProviderLimiter."""
+
+    def __init__(self, limits=None):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.limiters = {}
+        self.lock = threading.Lock()
+
+    def get(self, provider, endpoint="chat"):
+        name = f"{provider}:{endpoint}"
+        with self.lock:
+            limiter = self.limiters.get(name)
+            if limiter is None:
+                limiter = ProviderLimiter(name, **self.limits.get(name, {}))
+                self.limiters[name] = limiter
+            return limiter
+
+    def update(self, limits=None):
+        """Applies new settings, keeping the state (buckets, windows, breakers) of limiters whose settings didn't change."""
+        merged = dict(DEFAULT_LIMITS)
+        merged.update(limits or {})
+        with self.lock:
+            for name in list(self.limiters):
+                if merged.get(name) != self.limits.get(name):
+                    del self.limiters[name]
+            self.limits = merged
+
+    def stats(self):
+        with self.lock:
+            limiters = dict(self.limiters)
+        return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+def estimate_tokens(*texts, max_tokens=None):
+    """Rough TPM cost: ~4 characters per token plus the completion budget."""
+    return sum(len(t or "") for t in texts) // 4 + (max_tokens or 500)
+
+
+def raise_for_status(response):
+    """Like response.raise_for_status(), but surfaces 429s as ProviderThrottled with Retry-After."""
+    if response.status_code == 429:
+        raise ProviderThrottled(f"429 Too Many Requests for {response.url}",
+                                retry_after=parse_retry_after(response.headers.get("Retry-After")))
+    response.raise_for_status()
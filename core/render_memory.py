@@ -0,0 +1,346 @@
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from core.tracing import get_metrics
+
+# Megabytes; renders range from a lean 720p short to a grain-heavy 4-clip feature chapter
+MEMORY_BUCKETS = (64, 128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 6144, 8192, 16384)
+
+
+class RenderAdmissionTimeout(RuntimeError):
+    """The memory budget stayed full for longer than the admission timeout."""
+
+
+# --- Measuring ---------------------------------------------------------------
+
+def _rss_mb(pid="self"):
+    with open(f"/proc/{pid}/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _children(pid):
+    kids = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                kids.extend(f.read().split())
+    except OSError:
+        pass
+    return kids
+
+
+def current_rss_mb(include_children=True):
+    """RSS of this process plus its ffmpeg/ImageMagick children; None where /proc is unavailable."""
+    try:
+        total = _rss_mb()
+    except (OSError, ValueError):
+        return None
+    if include_children:
+        pending = _children(os.getpid())
+        while pending:
+            pid = pending.pop()
+            try:
+                total += _rss_mb(pid)
+            except (OSError, ValueError):
+                continue
+            pending.extend(_children(pid))
+    return total
+
+
+def memory_limit_mb():
+    """Container (cgroup v2/v1) memory limit, else physical memory; None when unknown."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # "max" and the v1 "no limit" sentinel (~8 EiB) both mean unlimited
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value) / (1024 * 1024)
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+class PeakTracker:
+    """Samples RSS on a daemon thread while a block runs.
+
+    `peak_mb` is the highest RSS seen and `delta_mb` the growth over the RSS at entry,
+    i.e. what the block itself needed on top of the already-running process.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.baseline_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def delta_mb(self):
+        if self.peak_mb is None or self.baseline_mb is None:
+            return None
+        return round(max(0.0, self.peak_mb - self.baseline_mb), 1)
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = round(rss, 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.baseline_mb = current_rss_mb()
+        if self.baseline_mb is not None:
+            self._sample()
+            self._thread = threading.Thread(target=self._run, name="rss-peak", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._sample()
+        return False
+
+
+@contextmanager
+def track_peak(span, interval=0.05):
+    """Adds peak_rss_mb / rss_delta_mb to a tracing span and the stage_peak_rss_mb histogram."""
+    with PeakTracker(interval) as peak:
+        yield peak
+    if peak.peak_mb is not None:
+        span.set(peak_rss_mb=peak.peak_mb, rss_delta_mb=peak.delta_mb)
+        get_metrics().observe("stage_peak_rss_mb", peak.delta_mb, {"stage": span.name},
+                              help_text="Memory growth (MB) over the RSS at stage start", buckets=MEMORY_BUCKETS)
+
+
+# --- Estimating --------------------------------------------------------------
+
+class RenderMemoryModel:
+    """Peak-memory estimate for one render, corrected by measured peaks.
+
+    The raw estimate counts decoded RGB frames: every source clip holds its current
+    frame plus resize/crop buffers (and has an ffmpeg reader process), full-frame
+    overlays (grain) stay resident for the whole render, captions are partial-frame
+    RGBA masks and the compositor keeps a few output frames in flight. A per-shape correction factor (EWMA of actual / raw) is
+    learned from finished renders and persisted next to the output.
+    """
+
+    BASE_MB = 150        # moviepy/numpy working set before any frame is decoded
+    ENCODER_MB = 120     # ffmpeg libx264 writer process
+    READER_MB = 60       # ffmpeg reader process behind every VideoFileClip
+    CLIP_FRAMES = 3
+    LAYER_FRAMES = 2
+    CAPTION_FRACTION = 0.15
+    COMPOSITE_FRAMES = 4
+
+    def __init__(self, path=None, alpha=0.3):
+        self.path = path
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        self.shapes = {}
+        self.load()
+
+    @staticmethod
+    def shape_key(size, lean):
+        return f"{'lean' if lean else 'full'}:{size[0]}x{size[1]}"
+
+    def raw_estimate(self, size, clips, layers=1, captions=0):
+        frame_mb = size[0] * size[1] * 3 / (1024 * 1024)
+        frames = (clips * self.CLIP_FRAMES + layers * self.LAYER_FRAMES +
+                  captions * self.CAPTION_FRACTION + self.COMPOSITE_FRAMES)
+        return self.BASE_MB + self.ENCODER_MB + clips * self.READER_MB + frame_mb * frames
+
+    def estimate(self, size, clips, layers=1, captions=0, lean=False):
+        with self.lock:
+            factor = self.shapes.get(self.shape_key(size, lean), {}).get("factor", 1.0)
+        return round(self.raw_estimate(size, clips, layers, captions) * factor, 1)
+
+    def record(self, size, clips, layers, captions, lean, actual_mb, estimated_mb=None):
+        """Folds one measured peak into the shape's correction factor."""
+        raw = self.raw_estimate(size, clips, layers, captions)
+        if not actual_mb or raw <= 0:
+            return
+        ratio = actual_mb / raw
+        key = self.shape_key(size, lean)
+        with self.lock:
+            entry = self.shapes.setdefault(key, {"factor": 1.0, "samples": 0})
+            entry["factor"] = round(ratio if not entry["samples"] else
+                                    (1 - self.alpha) * entry["factor"] + self.alpha * ratio, 4)
+            entry["samples"] += 1
+            entry["last_estimate_mb"] = estimated_mb
+            entry["last_actual_mb"] = actual_mb
+        if estimated_mb:
+            get_metrics().observe("render_memory_estimate_ratio", actual_mb / estimated_mb, {"shape": key},
+                                  help_text="Measured / estimated render peak memory",
+                                  buckets=(0.25, 0.5, 0.75, 0.9, 1.0, 1.1, 1.25, 1.5, 2, 3, 5))
+        self.save()
+
+    def load(self):
+        if not (self.path and os.path.exists(self.path)):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.shapes = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[MEMORY] Could not load render memory model: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            with self.lock:
+                data = json.dumps(self.shapes, indent=4)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(data)
+        except OSError as e:
+            print(f"[MEMORY] Could not save render memory model: {e}")
+
+
+# --- Admitting ----------------------------------------------------------------
+
+class Ticket:
+    def __init__(self, mode, reserved_mb, estimated_mb):
+        self.mode = mode
+        self.reserved_mb = reserved_mb
+        self.estimated_mb = estimated_mb
+        # Set when another render ran at the same time; its RSS peak then isn't this job's alone
+        self.overlapped = False
+
+    @property
+    def lean(self):
+        return self.mode == "lean"
+
+
+class MemoryAdmission:
+    """Admits renders while their estimated peaks fit the memory budget.
+
+    A render that doesn't fit is downgraded to the lean mode when that fits, otherwise
+    it waits for running renders to release memory. A render larger than the whole
+    budget still runs, alone, so nothing waits forever. budget_mb=0 admits everything.
+    """
+
+    def __init__(self, budget_mb=0, timeout=900, allow_downgrade=True, model=None):
+        self.budget_mb = budget_mb
+        self.timeout = timeout
+        self.allow_downgrade = allow_downgrade
+        self.model = model or RenderMemoryModel()
+        self.cond = threading.Condition()
+        self.running = []
+        self.reserved_mb = 0.0
+        self.waiting = 0
+        self.counts = {"admitted": 0, "downgraded": 0, "queued": 0, "oversized": 0, "timeouts": 0}
+        self.queued_seconds = 0.0
+
+    def _fits(self, mb):
+        return not self.budget_mb or self.reserved_mb + mb <= self.budget_mb
+
+    def _choose(self, full_mb, lean_mb):
+        if self._fits(full_mb):
+            return "full", full_mb
+        if lean_mb is not None and self.allow_downgrade and self._fits(lean_mb):
+            return "lean", lean_mb
+        if not self.running:
+            self.counts["oversized"] += 1
+            if lean_mb is not None and self.allow_downgrade:
+                return "lean", lean_mb
+            return "full", full_mb
+        return None
+
+    def acquire(self, full_mb, lean_mb=None):
+        """Blocks until the render is admitted; returns its Ticket."""
+        started = time.monotonic()
+        deadline = started + self.timeout if self.timeout else None
+        with self.cond:
+            choice = self._choose(full_mb, lean_mb)
+            if choice is None:
+                self.counts["queued"] += 1
+                self.waiting += 1
+                print(f"[MEMORY] Render needs ~{full_mb:.0f}MB; {self.reserved_mb:.0f}/{self.budget_mb:.0f}MB "
+                      f"reserved by {len(self.running)} render(s). Queued.")
+                try:
+                    while choice is None:
+                        remaining = deadline - time.monotonic() if deadline else None
+                        if remaining is not None and remaining <= 0:
+                            self.counts["timeouts"] += 1
+                            raise RenderAdmissionTimeout(
+                                f"render needing ~{full_mb:.0f}MB waited {self.timeout}s for memory")
+                        self.cond.wait(remaining)
+                        choice = self._choose(full_mb, lean_mb)
+                finally:
+                    self.waiting -= 1
+                    self.queued_seconds += time.monotonic() - started
+
+            mode, mb = choice
+            ticket = Ticket(mode, mb, full_mb if mode == "full" else lean_mb)
+            if self.running:
+                ticket.overlapped = True
+                for other in self.running:
+                    other.overlapped = True
+            self.running.append(ticket)
+            self.reserved_mb += mb
+            self.counts["admitted"] += 1
+            if mode == "lean" and lean_mb is not None and mb != full_mb:
+                self.counts["downgraded"] += 1
+                print(f"[MEMORY] Downgrading render to lean mode (~{lean_mb:.0f}MB instead of ~{full_mb:.0f}MB).")
+            return ticket
+
+    def release(self, ticket):
+        with self.cond:
+            if ticket in self.running:
+                self.running.remove(ticket)
+                self.reserved_mb = max(0.0, self.reserved_mb - ticket.reserved_mb)
+            self.cond.notify_all()
+
+    @contextmanager
+    def reserve(self, full_mb, lean_mb=None):
+        ticket = self.acquire(full_mb, lean_mb)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self):
+        with self.cond:
+            return {
+                "budget_mb": round(self.budget_mb, 1),
+                "reserved_mb": round(self.reserved_mb, 1),
+                "running": len(self.running),
+                "waiting": self.waiting,
+                "queued_seconds": round(self.queued_seconds, 2),
+                **self.counts,
+                "rss_mb": current_rss_mb(),
+                "model": dict(self.model.shapes)
+            }
+
+
+_admission = MemoryAdmission()
+
+
+def get_render_admission():
+    return _admission
+
+
+def configure_render_memory(budget_mb=0, timeout=900, allow_downgrade=True, model_path=None):
+    """budget_mb=0 sizes the budget from the container limit (80%, minus what's already resident)."""
+    if not budget_mb:
+        limit = memory_limit_mb()
+        if limit:
+            budget_mb = max(512.0, limit * 0.8 - (current_rss_mb() or 0))
+    _admission.budget_mb = budget_mb or 0
+    _admission.timeout = timeout
+    _admission.allow_downgrade = allow_downgrade
+    if model_path and model_path != _admission.model.path:
+        _admission.model = RenderMemoryModel(model_path)
+    return _admission
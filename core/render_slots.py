@@ -0,0 +1,179 @@
+
+import os
+import math
+import time
+import threading
+from contextlib import contextmanager
+from core.tracing import get_metrics
+
+_HAS_AFFINITY = hasattr(os, "sched_setaffinity")
+
+
+def available_cpus():
+    """CPU ids this process may use, trimmed to the cgroup CPU quota when one is set."""
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = cpus[:max(1, math.ceil(int(quota) / int(period)))]
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def _thread_children(tid):
+    """Processes forked by one thread of this process (the ffmpeg reader/writer a render started)."""
+    try:
+        with open(f"/proc/self/task/{tid}/children") as f:
+            pending = [int(p) for p in f.read().split()]
+    except (OSError, ValueError):
+        return []
+    found = []
+    while pending:
+        pid = pending.pop()
+        found.append(pid)
+        try:
+            for task in os.listdir(f"/proc/{pid}/task"):
+                with open(f"/proc/{pid}/task/{task}/children") as f:
+                    pending.extend(int(p) for p in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return found
+
+
+class RenderSlot:
+    def __init__(self, label, tid):
+        self.label = label
+        self.tid = tid
+        self.cpus = []
+        # Encoder threads are fixed when ffmpeg starts; affinity follows rebalancing
+        self.threads = 1
+        self.started = time.monotonic()
+
+
+class RenderSlotAllocator:
+    """Splits the machine's cores between concurrent renders.
+
+    Every render gets a slot: a disjoint set of CPUs, an explicit encoder thread count
+    matching it, and CPU affinity for the render thread and the ffmpeg processes it
+    spawns. When renders start or finish the CPUs are re-partitioned and the affinity
+    of running renders (and their ffmpeg children) is updated in place. Renders beyond
+    max_slots wait, so each keeps at least min_threads cores. enabled=False hands out
+    unmanaged slots (no queueing, pinning or thread count) for comparison runs.
+    """
+
+    def __init__(self, cpus=None, min_threads=2, max_slots=0, pin=True, enabled=True):
+        self.enabled = enabled
+        self.cpus = list(cpus or available_cpus())
+        self.min_threads = max(1, min_threads)
+        self.max_slots = max_slots or max(1, len(self.cpus) // self.min_threads)
+        self.pin = pin and _HAS_AFFINITY
+        self.cond = threading.Condition()
+        self.active = []
+        self.waiting = 0
+        self.counts = {"granted": 0, "queued": 0, "rebalances": 0}
+        self.queued_seconds = 0.0
+
+    def _partition(self):
+        """Contiguous CPU chunks, earlier slots taking the remainder."""
+        n = len(self.active)
+        if not n:
+            return
+        share, extra = divmod(len(self.cpus), n)
+        start = 0
+        for i, slot in enumerate(self.active):
+            size = max(1, share + (1 if i < extra else 0))
+            slot.cpus = self.cpus[start:start + size] or self.cpus[-size:]
+            start += size
+        self.counts["rebalances"] += 1
+
+    def _apply(self, slot):
+        if not self.pin:
+            return
+        for pid in [slot.tid] + _thread_children(slot.tid):
+            try:
+                os.sched_setaffinity(pid, slot.cpus)
+            except OSError:
+                pass
+
+    def acquire(self, label=""):
+        started = time.monotonic()
+        slot = RenderSlot(label, threading.get_native_id())
+        if not self.enabled:
+            slot.cpus, slot.threads = list(self.cpus), None
+            return slot
+        with self.cond:
+            if len(self.active) >= self.max_slots:
+                self.counts["queued"] += 1
+                self.waiting += 1
+                print(f"[CPU] {len(self.active)} render(s) already hold all {len(self.cpus)} cores. Queued {label}.")
+                try:
+                    while len(self.active) >= self.max_slots:
+                        self.cond.wait()
+                finally:
+                    self.waiting -= 1
+            self.active.append(slot)
+            self._partition()
+            slot.threads = len(slot.cpus)
+            for other in self.active:
+                self._apply(other)
+            self.counts["granted"] += 1
+            waited = time.monotonic() - started
+            self.queued_seconds += waited
+        get_metrics().observe("render_slot_wait_seconds", waited, help_text="Time renders waited for CPU cores")
+        return slot
+
+    def release(self, slot):
+        if not self.enabled:
+            return
+        with self.cond:
+            if slot in self.active:
+                self.active.remove(slot)
+                self._partition()
+                for other in self.active:
+                    self._apply(other)
+            self.cond.notify_all()
+        if self.pin:
+            try:
+                # The render thread goes back to the whole machine for non-render work
+                os.sched_setaffinity(slot.tid, self.cpus)
+            except OSError:
+                pass
+
+    @contextmanager
+    def slot(self, label=""):
+        slot = self.acquire(label)
+        try:
+            yield slot
+        finally:
+            self.release(slot)
+
+    def stats(self):
+        with self.cond:
+            return {
+                "enabled": self.enabled,
+                "cpus": len(self.cpus),
+                "max_slots": self.max_slots,
+                "pinning": self.pin,
+                "waiting": self.waiting,
+                "queued_seconds": round(self.queued_seconds, 2),
+                **self.counts,
+                "active": [{"label": s.label, "cpus": s.cpus, "threads": s.threads,
+                            "seconds": round(time.monotonic() - s.started, 1)} for s in self.active]
+            }
+
+
+_allocator = RenderSlotAllocator()
+
+
+def get_slot_allocator():
+    return _allocator
+
+
+def configure_render_slots(max_slots=0, min_threads=2, pin=True, enabled=True, cpus=None):
+    """Re-sizes the shared allocator (over `cpus`, default all usable ones); call before renders start."""
+    global _allocator
+    _allocator = RenderSlotAllocator(cpus=cpus, min_threads=min_threads, max_slots=max_slots, pin=pin,
+                                     enabled=enabled)
+    return _allocator
@@ -0,0 +1,133 @@
+
+import json
+import time
+import asyncio
+import hashlib
+from core.tracing import get_metrics
+
+DEFAULT_POLICY = {"ttl": 30, "stale": 300}
+
+
+class CachedResponse:
+    def __init__(self, value, fetched_at):
+        self.value = value
+        self.fetched_at = fetched_at
+        body = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+        self.etag = '"%s"' % hashlib.sha256(body.encode("utf-8")).hexdigest()[:20]
+
+    def age(self, now=None):
+        return (now or time.time()) - self.fetched_at
+
+
+class ResponseCache:
+    """Stale-while-revalidate cache for read endpoints, shared by every open dashboard.
+
+    Within `ttl` a cached value is served as is; for `stale` seconds after that it is
+    still served immediately while one background task reloads it; past that, callers
+    wait for a reload. Concurrent misses share a single load, so upstream calls scale
+    with time rather than with the number of pollers. Each value carries an ETag of
+    its JSON so unchanged polls can be answered with 304. Parameterised endpoints pass
+    a `key` per query ("videos?sort=size"); they share the endpoint's policy and stats.
+    """
+
+    def __init__(self, policies=None):
+        self.policies = {k: {**DEFAULT_POLICY, **v} for k, v in (policies or {}).items()}
+        self.entries = {}
+        self.loading = {}
+        # Bumped by invalidate(): a load started before it must not store what it read
+        self.generations = {}
+        self.counters = {}
+
+    def policy(self, name):
+        return self.policies.get(name) or self.policies.get("default") or DEFAULT_POLICY
+
+    def _count(self, name, state):
+        counts = self.counters.setdefault(name, {})
+        counts[state] = counts.get(state, 0) + 1
+        get_metrics().inc("api_cache_requests_total", {"endpoint": name, "state": state},
+                          help_text="Cached read endpoint requests by outcome (fresh, stale, miss, not_modified)")
+
+    @staticmethod
+    def _name(key):
+        return key.split("?", 1)[0]
+
+    def _prune(self, name, now):
+        """Drops the endpoint's entries past their stale window, so one-off queries don't pile up."""
+        policy = self.policy(name)
+        for key in [k for k, e in self.entries.items()
+                    if self._name(k) == name and e.age(now) >= policy["ttl"] + policy["stale"]]:
+            del self.entries[key]
+
+    def _load(self, key, loader):
+        """One in-flight load per key; returns the task every caller awaits."""
+        task = self.loading.get(key)
+        if task is None:
+            generation = self.generations.get(key, 0)
+
+            async def load():
+                try:
+                    value = await loader()
+                    response = CachedResponse(value, time.time())
+                    if self.generations.get(key, 0) != generation:
+                        # Invalidated while loading: hand the value to whoever waited, but don't cache it
+                        return response
+                    self._prune(self._name(key), time.time())
+                    self.entries[key] = response
+                    return response
+                except Exception as e:
+                    if key not in self.entries:
+                        raise
+                    # A failed refresh keeps serving the previous value instead of an error
+                    print(f"[CACHE] Refresh of '{key}' failed: {e}")
+                    return self.entries[key]
+                finally:
+                    if self.loading.get(key) is task:
+                        del self.loading[key]
+            task = asyncio.ensure_future(load())
+            self.loading[key] = task
+        return task
+
+    async def get(self, name, loader, if_none_match=None, key=None):
+        """(CachedResponse, state) for an endpoint; `loader` is an async callable producing its value.
+
+        state is "fresh", "stale" or "miss", or "not_modified" when `if_none_match`
+        (the request's If-None-Match header) names the ETag being served.
+        """
+        policy = self.policy(name)
+        key = key or name
+        entry = self.entries.get(key)
+        age = entry.age() if entry else None
+        if entry and age < policy["ttl"]:
+            state = "fresh"
+        elif entry and age < policy["ttl"] + policy["stale"]:
+            self._load(key, loader)
+            state = "stale"
+        else:
+            entry, state = await asyncio.shield(self._load(key, loader)), "miss"
+        if if_none_match and entry.etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+            state = "not_modified"
+        self._count(name, state)
+        return entry, state
+
+    def invalidate(self, *names):
+        """Drops the named endpoints' entries (every query of each), or all of them when none are named.
+
+        Loads already running for them are detached: they finish for their waiting callers
+        without storing, and the next request starts a fresh load.
+        """
+        for key in list(self.entries) + list(self.loading):
+            if not names or self._name(key) in names:
+                self.entries.pop(key, None)
+                if self.loading.pop(key, None) is not None:
+                    self.generations[key] = self.generations.get(key, 0) + 1
+
+    def stats(self):
+        now = time.time()
+        return {name: {
+            **self.policy(name),
+            "age": round(self.entries[name].age(now), 1) if name in self.entries else None,
+            "etag": self.entries[name].etag if name in self.entries else None,
+            "variants": sum(1 for k in self.entries if self._name(k) == name),
+            "refreshing": any(self._name(k) == name for k in self.loading),
+            "requests": self.counters.get(name, {})
+        } for name in sorted(set(self.counters) | {self._name(k) for k in self.entries})}
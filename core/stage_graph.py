@@ -0,0 +1,103 @@
+
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from core.tracing import span
+from core.checkpoint import inputs_key
+
+
+class StageGraph:
+    """Tiny dependency graph that runs every ready stage concurrently on a thread pool.
+
+    Each stage is a callable receiving the dict of results produced so far; its return
+    value is stored under the stage name. Per-stage timings are kept in `timings`.
+    With a JobManifest, a stage whose inputs (`inputs` plus its dependencies' results)
+    and artifacts are unchanged since the last run is skipped and its result reused.
+    """
+
+    def __init__(self, name="pipeline", max_workers=4, manifest=None, inputs=None):
+        self.name = name
+        self.max_workers = max_workers
+        self.manifest = manifest
+        self.inputs = inputs
+        self.stages = {}
+        self.timings = {}
+
+    def add(self, name, fn, deps=()):
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = (fn, tuple(deps))
+        return self
+
+    def _timed(self, name, fn, results, origin):
+        started = time.perf_counter()
+        try:
+            with span(f"stage.{name}", graph=self.name) as s:
+                if self.manifest is None:
+                    return fn(results)
+                key = inputs_key(name, self.inputs, {d: results[d] for d in self.stages[name][1]})
+                hit, value = self.manifest.lookup(name, key)
+                s.set(checkpoint="hit" if hit else "miss")
+                if hit:
+                    return value
+                value = fn(results)
+                if value is not None:
+                    self.manifest.record(name, key, value)
+                return value
+        finally:
+            finished = time.perf_counter()
+            self.timings[name] = {
+                "start": round(started - origin, 3),
+                "duration": round(finished - started, 3)
+            }
+
+    def run(self, results=None):
+        """Executes the graph and returns the results dict. Re-raises the first stage failure."""
+        results = dict(results or {})
+        pending = dict(self.stages)
+        running = {}
+        origin = time.perf_counter()
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name) as pool:
+            while pending or running:
+                if error is None:
+                    ready = [n for n, (_, deps) in pending.items() if all(d in results for d in deps)]
+                    for name in ready:
+                        fn, _ = pending.pop(name)
+                        # Each stage sees a snapshot so later writes never race its reads;
+                        # the copied context keeps it inside the caller's trace
+                        ctx = contextvars.copy_context()
+                        running[pool.submit(ctx.run, self._timed, name, fn, dict(results), origin)] = name
+                else:
+                    pending.clear()
+
+                if not running:
+                    if pending:
+                        raise RuntimeError(f"Unresolvable stages in '{self.name}': {sorted(pending)}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        error = error or e
+
+        self.timings["_total"] = {"start": 0.0, "duration": round(time.perf_counter() - origin, 3)}
+        if error is not None:
+            raise error
+        return results
+
+    def summary(self):
+        """One line per stage in start order, for the production log."""
+        lines = []
+        ordered = sorted((n for n in self.timings if n != "_total"), key=lambda n: self.timings[n]["start"])
+        for name in ordered:
+            t = self.timings[name]
+            lines.append(f"  {name:<12} +{t['start']:>7.2f}s  {t['duration']:>7.2f}s")
+        if "_total" in self.timings:
+            lines.append(f"  {'total':<12} {self.timings['_total']['duration']:>16.2f}s")
+        return "\n".join(lines)
@@ -0,0 +1,247 @@
+
+import os
+import json
+import time
+import uuid
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from core.profiling import note_thread_enter, note_thread_exit
+
+# Seconds; covers fast LLM calls up to long encodes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+_current_trace = contextvars.ContextVar("trace_id", default=None)
+_current_span = contextvars.ContextVar("span", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Linear interpolation inside the matching bucket (what histogram_quantile() does)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, upper in enumerate(self.buckets):
+            if seen + self.counts[i] >= rank:
+                inside = (rank - seen) / self.counts[i] if self.counts[i] else 0
+                return round(lower + (upper - lower) * inside, 4)
+            seen += self.counts[i]
+            lower = upper
+        return self.buckets[-1]
+
+
+class Metrics:
+    """Process-wide counters and histograms keyed by (name, sorted labels)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, labels=None, amount=1, help_text=None):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+            if help_text:
+                self.help.setdefault(name, help_text)
+
+    def observe(self, name, value, labels=None, help_text=None, buckets=None):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets or DEFAULT_BUCKETS)
+            histogram.observe(value)
+            if help_text:
+                self.help.setdefault(name, help_text)
+
+    @staticmethod
+    def _labels(pairs, extra=()):
+        pairs = list(pairs) + list(extra)
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in pairs)
+        return "{" + body + "}"
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            declared = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in declared:
+                    declared.add(name)
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{self._labels(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                if name not in declared:
+                    declared.add(name)
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for upper, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{self._labels(labels, [('le', upper)])} {cumulative}")
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{name}_sum{self._labels(labels)} {round(h.sum, 6)}")
+                lines.append(f"{name}_count{self._labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, name):
+        """{labels: {count, p50, p95, mean}} for one histogram, for quick JSON dashboards."""
+        out = {}
+        with self.lock:
+            for (metric, labels), h in self.histograms.items():
+                if metric != name:
+                    continue
+                key = ",".join(f"{k}={v}" for k, v in labels) or "all"
+                out[key] = {"count": h.count, "p50": h.quantile(0.5), "p95": h.quantile(0.95),
+                            "mean": round(h.sum / h.count, 4) if h.count else None}
+        return out
+
+
+class Span:
+    def __init__(self, name, trace_id, parent_id, attrs):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attrs = dict(attrs)
+        self.start = time.time()
+        self.status = "ok"
+        self.error = None
+
+    def set(self, **attrs):
+        """Adds attributes (model, bytes, clip count, ...) while the span is open."""
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Writes finished spans as JSONL and feeds per-stage latency into Metrics."""
+
+    def __init__(self, path=None, enabled=True, metrics=None):
+        self.path = path
+        self.enabled = enabled
+        self.metrics = metrics or Metrics()
+        self.lock = threading.Lock()
+        # Called with each span as it opens (job progress, cancellation checks)
+        self.listeners = []
+
+    def add_listener(self, fn):
+        self.listeners.append(fn)
+
+    @contextmanager
+    def trace(self, name, trace_id=None, **attrs):
+        """Root span for one job; every span opened inside shares its trace id."""
+        # Nested jobs (e.g. produce_video inside produce_from_topic) join the outer trace
+        token = _current_trace.set(trace_id or _current_trace.get() or uuid.uuid4().hex)
+        try:
+            with self.span(name, **attrs) as span:
+                yield span
+        finally:
+            _current_trace.reset(token)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        parent = _current_span.get()
+        trace_id = _current_trace.get() or (parent.trace_id if parent else None) or uuid.uuid4().hex
+        span = Span(name, trace_id, parent.span_id if parent else None, attrs)
+        token = _current_span.set(span)
+        # Threads doing traced work for a profiled job are sampled while the span is open
+        profiler = note_thread_enter()
+        started = time.perf_counter()
+        try:
+            for listener in self.listeners:
+                listener(span)
+            yield span
+        except Exception as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            note_thread_exit(profiler)
+            _current_span.reset(token)
+            self._finish(span, time.perf_counter() - started)
+
+    def _finish(self, span, duration):
+        labels = {"stage": span.name, "status": span.status}
+        self.metrics.observe("stage_duration_seconds", duration, {"stage": span.name},
+                             help_text="Wall time per traced stage")
+        self.metrics.inc("stage_total", labels, help_text="Traced stage executions by outcome")
+        if not (self.enabled and self.path):
+            return
+
+        record = {
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "start": round(span.start, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "status": span.status,
+            "attrs": span.attrs
+        }
+        if span.error:
+            record["error"] = span.error
+        try:
+            line = json.dumps(record, default=str)
+            with self.lock:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except Exception as e:
+            print(f"[TRACE] Could not write span: {e}")
+
+
+def current_trace_id():
+    return _current_trace.get()
+
+
+_tracer = Tracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def get_metrics():
+    return _tracer.metrics
+
+
+def configure_tracing(path=None, enabled=True):
+    """Points the shared tracer at a JSONL file (metrics keep accumulating either way)."""
+    _tracer.path = path
+    _tracer.enabled = enabled
+    return _tracer
+
+
+def span(name, **attrs):
+    return _tracer.span(name, **attrs)
+
+
+def trace(name, trace_id=None, **attrs):
+    return _tracer.trace(name, trace_id=trace_id, **attrs)
@@ -0,0 +1,274 @@
+
+import os
+import re
+import json
+import time
+import base64
+import sqlite3
+import threading
+import subprocess
+from contextlib import closing
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    duration REAL NOT NULL DEFAULT 0,
+    width INTEGER,
+    height INTEGER,
+    orientation TEXT,
+    style TEXT,
+    title TEXT NOT NULL DEFAULT '',
+    thumbnail TEXT,
+    preview TEXT,
+    render_mode TEXT,
+    publish_status TEXT NOT NULL DEFAULT 'unpublished',
+    platforms TEXT,
+    created_at REAL NOT NULL,
+    probed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS videos_created ON videos (created_at, name);
+CREATE INDEX IF NOT EXISTS videos_duration ON videos (duration, name);
+CREATE INDEX IF NOT EXISTS videos_size ON videos (size, name);
+CREATE INDEX IF NOT EXISTS videos_title ON videos (title, name);
+CREATE INDEX IF NOT EXISTS videos_style ON videos (style, created_at, name);
+CREATE INDEX IF NOT EXISTS videos_orientation ON videos (orientation, created_at, name);
+CREATE INDEX IF NOT EXISTS videos_publish ON videos (publish_status, created_at, name);
+"""
+
+# Sort columns are NOT NULL (0 / '' = unknown), so a page is one range scan of the matching index
+SORTS = ("created_at", "duration", "size", "title", "name")
+FIELDS = ("duration", "width", "height", "orientation", "style", "title", "thumbnail", "preview", "render_mode",
+          "publish_status", "platforms")
+# Stored as JSON
+JSON_FIELDS = ("preview", "platforms")
+
+
+def orientation_of(width, height):
+    if not width or not height:
+        return None
+    return "vertical" if height > width else "square" if height == width else "landscape"
+
+
+def probe_video(path):
+    """Duration and frame size from `ffmpeg -i` (no MoviePy import); {} when unavailable."""
+    try:
+        import imageio_ffmpeg
+        proc = subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-i", path],
+                              capture_output=True, text=True, timeout=30)
+    except Exception:
+        return {}
+    info = {}
+    duration = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", proc.stderr)
+    if duration:
+        h, m, s = duration.groups()
+        info["duration"] = round(int(h) * 3600 + int(m) * 60 + float(s), 2)
+    size = re.search(r"Stream #.*Video:.*?(\d{2,5})x(\d{2,5})", proc.stderr)
+    if size:
+        info["width"], info["height"] = int(size.group(1)), int(size.group(2))
+    return info
+
+
+def _encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        value, name = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return value, name
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor")
+
+
+class VideoCatalog:
+    """SQLite index of the renders in OUTPUT_DIR, so the library never lists the directory per request.
+
+    Renders are recorded when create_video / merge_videos finish and annotated by the
+    pipeline (title, thumbnail, publish status); reconcile() brings the index in line
+    with the directory at startup. Queries use keyset pagination on indexed columns,
+    so a page costs the same at 50 videos or 50,000.
+    """
+
+    def __init__(self, path, output_dir):
+        self.path = path
+        self.output_dir = output_dir
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+            columns = {r["name"] for r in db.execute("PRAGMA table_info(videos)")}
+            if "preview" not in columns:
+                db.execute("ALTER TABLE videos ADD COLUMN preview TEXT")
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    @staticmethod
+    def _row(row):
+        if row is None:
+            return None
+        video = dict(row)
+        video["platforms"] = json.loads(video["platforms"]) if video["platforms"] else []
+        video["preview"] = json.loads(video["preview"]) if video["preview"] else None
+        video.pop("probed", None)
+        return video
+
+    # --- Writes -------------------------------------------------------------------
+
+    def record(self, path, **meta):
+        """Adds or updates a render; only the metadata given (not None) is changed."""
+        name = os.path.basename(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        meta = {k: v for k, v in meta.items() if k in FIELDS and v is not None}
+        for field in JSON_FIELDS:
+            if field in meta:
+                meta[field] = json.dumps(meta[field])
+        if "width" in meta and "height" in meta:
+            meta.setdefault("orientation", orientation_of(meta["width"], meta["height"]))
+        probed = 1 if "duration" in meta and "width" in meta else 0
+        columns = ["path", "size", "mtime", *meta]
+        values = [path, st.st_size, st.st_mtime, *meta.values()]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns)
+        try:
+            with closing(self._connect()) as db:
+                db.execute(f"INSERT INTO videos (name, created_at, probed, {', '.join(columns)}) "
+                           f"VALUES (?, ?, ?, {', '.join('?' * len(columns))}) "
+                           f"ON CONFLICT(name) DO UPDATE SET {updates}, probed = MAX(probed, excluded.probed)",
+                           [name, st.st_mtime, probed, *values])
+        except sqlite3.Error as e:
+            # The render itself succeeded; the next reconcile() picks it up
+            print(f"[CATALOG] Could not record {name}: {e}")
+
+    def remove(self, name):
+        with closing(self._connect()) as db:
+            db.execute("DELETE FROM videos WHERE name = ?", (os.path.basename(name),))
+
+    def reconcile(self, probe=True):
+        """Indexes renders added behind the catalog's back and drops rows whose file is gone."""
+        started = time.perf_counter()
+        try:
+            on_disk = {e.name: e.stat() for e in os.scandir(self.output_dir)
+                       if e.is_file() and e.name.endswith(".mp4")}
+        except OSError:
+            on_disk = {}
+        with closing(self._connect()) as db:
+            known = {r["name"]: (r["size"], r["mtime"]) for r in db.execute("SELECT name, size, mtime FROM videos")}
+            db.execute("BEGIN")
+            gone = [n for n in known if n not in on_disk]
+            db.executemany("DELETE FROM videos WHERE name = ?", [(n,) for n in gone])
+            changed = 0
+            for name, st in on_disk.items():
+                if known.get(name) == (st.st_size, st.st_mtime):
+                    continue
+                changed += 1
+                # A replaced file keeps its row (title, style...) but must be probed again
+                db.execute("INSERT INTO videos (name, path, size, mtime, created_at) VALUES (?, ?, ?, ?, ?) "
+                           "ON CONFLICT(name) DO UPDATE SET path = excluded.path, size = excluded.size, "
+                           "mtime = excluded.mtime, probed = 0",
+                           (name, os.path.join(self.output_dir, name), st.st_size, st.st_mtime, st.st_mtime))
+            db.execute("COMMIT")
+        print(f"[CATALOG] Reconciled {len(on_disk)} renders ({changed} new/changed, {len(gone)} removed) "
+              f"in {time.perf_counter() - started:.2f}s")
+        if probe:
+            self.probe_missing()
+        return {"files": len(on_disk), "changed": changed, "removed": len(gone)}
+
+    def probe_missing(self, limit=None):
+        """Fills duration and resolution for rows indexed without them (reconciled or uploaded files)."""
+        with closing(self._connect()) as db:
+            rows = db.execute("SELECT name, path FROM videos WHERE probed = 0" + (f" LIMIT {int(limit)}" if limit
+                                                                                   else "")).fetchall()
+        for row in rows:
+            info = probe_video(row["path"])
+            with closing(self._connect()) as db:
+                db.execute("UPDATE videos SET duration = COALESCE(?, duration), width = COALESCE(?, width), "
+                           "height = COALESCE(?, height), orientation = COALESCE(?, orientation), probed = 1 "
+                           "WHERE name = ?", (info.get("duration"), info.get("width"), info.get("height"),
+                                              orientation_of(info.get("width"), info.get("height")), row["name"]))
+        return len(rows)
+
+    def without_preview(self, limit=None, names=None):
+        where, args = "preview IS NULL", []
+        if names is not None:
+            where += f" AND name IN ({', '.join('?' * len(names))})"
+            args = list(names)
+        with closing(self._connect()) as db:
+            rows = db.execute(f"SELECT * FROM videos WHERE {where} ORDER BY created_at DESC"
+                              + (f" LIMIT {int(limit)}" if limit else ""), args).fetchall()
+        return [self._row(r) for r in rows]
+
+    def reconcile_in_background(self):
+        thread = threading.Thread(target=self.reconcile, name="catalog-reconcile", daemon=True)
+        thread.start()
+        return thread
+
+    # --- Reads --------------------------------------------------------------------
+
+    def get(self, name):
+        with closing(self._connect()) as db:
+            return self._row(db.execute("SELECT * FROM videos WHERE name = ?", (os.path.basename(name),)).fetchone())
+
+    @staticmethod
+    def _filters(style=None, orientation=None, publish_status=None, q=None):
+        where, args = [], []
+        for column, value in (("style", style), ("orientation", orientation), ("publish_status", publish_status)):
+            if value:
+                where.append(f"{column} = ?")
+                args.append(value)
+        if q:
+            where.append("(title LIKE ? OR name LIKE ?)")
+            args += [f"%{q}%", f"%{q}%"]
+        return where, args
+
+    def query(self, limit=50, cursor=None, sort="created_at", order="desc", **filters):
+        """One page of videos plus the cursor of the next page (None on the last one)."""
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {', '.join(SORTS)}")
+        order = "ASC" if str(order).lower() == "asc" else "DESC"
+        where, args = self._filters(**filters)
+        if cursor:
+            value, name = _decode_cursor(cursor)
+            op = ">" if order == "ASC" else "<"
+            if sort == "name":
+                where.append(f"name {op} ?")
+                args.append(name)
+            else:
+                where.append(f"({sort}, name) {op} (?, ?)")
+                args += [value, name]
+        sql = "SELECT * FROM videos" + (f" WHERE {' AND '.join(where)}" if where else "")
+        sql += f" ORDER BY {sort} {order}" + (f", name {order}" if sort != "name" else "") + " LIMIT ?"
+        with closing(self._connect()) as db:
+            rows = [self._row(r) for r in db.execute(sql, args + [limit + 1]).fetchall()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor([rows[-1][sort], rows[-1]["name"]])
+        return {"items": rows, "next_cursor": next_cursor}
+
+    def count(self, **filters):
+        where, args = self._filters(**filters)
+        with closing(self._connect()) as db:
+            return db.execute("SELECT COUNT(*) FROM videos" + (f" WHERE {' AND '.join(where)}" if where else ""),
+                              args).fetchone()[0]
+
+
+_catalog = None
+
+
+def get_catalog():
+    """The configured catalog, or None (e.g. a VideoEditor used on its own)."""
+    return _catalog
+
+
+def configure_catalog(path, output_dir):
+    global _catalog
+    _catalog = VideoCatalog(path, output_dir)
+    return _catalog
@@ -0,0 +1,257 @@
+
+"""Per-job scratch workspaces, and the cache worthwhile intermediates are promoted to.
+
+Everything a job produces on the way to its render (voiceovers, streamed paragraph
+audio, AI images, thumbnail backdrops, long-form chapters) goes to its own directory
+under WORKSPACE_DIR instead of shared paths in ASSETS_DIR/OUTPUT_DIR, so two jobs with
+the same output prefix (or two thumbnails at once) never overwrite each other. The
+workspace is removed when the job succeeds and kept when it fails, so the retry finds
+its checkpointed artifacts; core.disk_gc ages abandoned ones out.
+"""
+import os
+import time
+import uuid
+import shutil
+import socket
+import hashlib
+import threading
+import contextvars
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+OWNER_FILE = ".owner"
+
+_current = contextvars.ContextVar("workspace", default=None)
+_lock = threading.Lock()
+# Workspaces held by this process (the owner file covers other processes)
+_held = set()
+# Absolute, so a render_dir taken from a workspace isn't joined onto the editor's OUTPUT_DIR
+_root = os.path.abspath(os.path.join("assets", "workspaces"))
+_cache = None
+
+
+def _safe(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in str(name))[:80] or "job"
+
+
+def holder_alive(path):
+    """True while the process holding workspace `path` runs, False when it is free, None when it is
+    held from another host (can't tell)."""
+    if os.path.abspath(path) in _held:
+        return True
+    owner = os.path.join(path, OWNER_FILE)
+    try:
+        with open(owner) as f:
+            host, pid = f.read().split()
+            pid = int(pid)
+    except ValueError:
+        # Just created and not written yet: held, unless a claimer died in between
+        try:
+            return time.time() - os.path.getmtime(owner) < 10
+        except OSError:
+            return False
+    except OSError:
+        return False
+    if host != socket.gethostname():
+        return None
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Workspace:
+    """One job's scratch directory; set `keep` to leave it behind when the job ends."""
+
+    def __init__(self, path):
+        self.path = path
+        self.keep = False
+
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+
+def current_workspace():
+    return _current.get()
+
+
+def _take(path):
+    """Creates the owner file exclusively, so of several processes claiming `path` exactly one wins."""
+    os.makedirs(path, exist_ok=True)
+    try:
+        fd = os.open(os.path.join(path, OWNER_FILE), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    try:
+        os.write(fd, f"{socket.gethostname()} {os.getpid()}".encode())
+    finally:
+        os.close(fd)
+    return True
+
+
+def _break_stale(path):
+    """Removes the owner file of a holder that died; serialised between this host's processes so a
+    breaker can't remove the file a faster one has just written."""
+    os.makedirs(_root, exist_ok=True)
+    with open(os.path.join(_root, ".claim.lock"), "a") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        if holder_alive(path) is False:
+            try:
+                os.remove(os.path.join(path, OWNER_FILE))
+            except FileNotFoundError:
+                pass
+            return _take(path)
+    return False
+
+
+def _claim(name):
+    """Takes `name` (resuming whatever an earlier run left there), or name-2, name-3... while held."""
+    base = os.path.join(_root, _safe(name))
+    for n in range(1, 1000):
+        path = base if n == 1 else f"{base}-{n}"
+        with _lock:
+            if path in _held:
+                continue
+            if _take(path) or _break_stale(path):
+                _held.add(path)
+                return Workspace(path)
+    raise RuntimeError(f"no free workspace for {name}")
+
+
+@contextmanager
+def job_workspace(name=None):
+    """Runs the block in a workspace named after the job (a fresh one when unnamed).
+
+    Nested calls (a chapter inside a long-form job, a video inside a queued job) share
+    the outer workspace; only the outermost one cleans up. It is removed on success and
+    kept (for the retry to resume from) on an exception or when `keep` was set.
+    """
+    outer = _current.get()
+    if outer is not None:
+        yield outer
+        return
+    workspace = _claim(name or uuid.uuid4().hex[:12])
+    token = _current.set(workspace)
+    try:
+        yield workspace
+    except BaseException:
+        workspace.keep = True
+        raise
+    finally:
+        _current.reset(token)
+        try:
+            if workspace.keep:
+                os.remove(os.path.join(workspace.path, OWNER_FILE))
+                print(f"[WORKSPACE] Kept {workspace.path} for the retry")
+            else:
+                shutil.rmtree(workspace.path, ignore_errors=True)
+        except OSError:
+            pass
+        with _lock:
+            _held.discard(workspace.path)
+
+
+def scratch_path(name):
+    """Path for an intermediate file: in the current workspace, or a unique loose file under
+    WORKSPACE_DIR (collected by age) when called outside a job."""
+    workspace = _current.get()
+    if workspace is not None:
+        return workspace.file(name)
+    os.makedirs(_root, exist_ok=True)
+    return os.path.join(_root, f"{uuid.uuid4().hex[:8]}_{name}")
+
+
+def scratch_dir():
+    """Directory for a group of intermediates: the current workspace, or a fresh one-off directory
+    under WORKSPACE_DIR (collected by age) outside a job."""
+    workspace = _current.get()
+    if workspace is not None:
+        return workspace.path
+    path = os.path.join(_root, f"loose-{uuid.uuid4().hex[:12]}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class ArtifactCache:
+    """Content-addressed store for intermediates worth keeping across jobs (AI images, backdrops).
+
+    Entries are keyed by what produced them (model, prompt...), so an identical request
+    is served from disk instead of the paid API. A hit refreshes the entry's mtime, which
+    the garbage collector uses for LRU eviction under the cache's quota. With a remote
+    artifact store, entries are also shared through it (cache/<key>) with the other nodes.
+    """
+
+    def __init__(self, root, store=None):
+        self.root = root
+        self.store = store if store is not None and store.remote else None
+        self.counters = {"hits": 0, "remote_hits": 0, "misses": 0, "stored": 0}
+
+    @staticmethod
+    def key(*parts):
+        return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key, suffix):
+        return os.path.join(self.root, key + suffix)
+
+    @staticmethod
+    def _link(src, dst):
+        """Hard link when possible (the cache and the workspace then share the bytes), else a copy."""
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        tmp = f"{dst}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+
+    def fetch(self, key, suffix, dest):
+        """Places the cached entry at `dest`; returns dest, or None on a miss."""
+        path = self._path(key, suffix)
+        try:
+            os.utime(path)
+            self._link(path, dest)
+        except OSError:
+            shared = self.store.fetch(f"cache/{key}{suffix}") if self.store else None
+            if not shared:
+                self.counters["misses"] += 1
+                return None
+            self._link(shared, path)
+            self._link(path, dest)
+            self.counters["remote_hits"] += 1
+            return dest
+        self.counters["hits"] += 1
+        return dest
+
+    def promote(self, key, suffix, path):
+        """Keeps a copy of a freshly produced intermediate; the job's own file stays where it is."""
+        try:
+            self._link(path, self._path(key, suffix))
+            self.counters["stored"] += 1
+        except OSError as e:
+            print(f"[WORKSPACE] Could not cache {os.path.basename(path)}: {e}")
+        if self.store:
+            self.store.upload(path, f"cache/{key}{suffix}")
+
+    def stats(self):
+        return {"root": self.root, **self.counters}
+
+
+def get_artifact_cache():
+    """The configured cache, or None (e.g. a MediaFetcher used on its own)."""
+    return _cache
+
+
+def configure_workspaces(root, cache_dir=None, store=None):
+    global _root, _cache
+    _root = os.path.abspath(root)
+    _cache = ArtifactCache(cache_dir, store=store) if cache_dir else None
+    return _cache
@@ -1,10 +1,11 @@
 
-import requests
+from core.llm_gateway import get_gateway
 import json
 
 class RepurposingEngine:
     def __init__(self, api_key=None):
         self.api_key = api_key
+        self.llm = get_gateway()
 
     def identify_viral_shorts(self, script):
         """Identifies the top 3 'Viral Hooks' in a script suitable for vertical Shorts/Reels."""
@@ -30,16 +31,7 @@ class RepurposingEngine:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
-            content = response.json()['choices'][0]['message']['content']
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key)
             if "```json" in content:
                 content = content.replace("```json", "").replace("```", "")
             return json.loads(content)
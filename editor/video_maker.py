@@ -1,6 +1,16 @@
 
 import os
 import math
+import re
+import time
+from proglog import ProgressBarLogger
+from core.tracing import span
+from core.job_queue import current_job
+from core.render_memory import get_render_admission, track_peak, RenderAdmissionTimeout
+from core.render_slots import get_slot_allocator
+from core.video_catalog import get_catalog
+from core.previews import get_preview_builder
+from core.artifact_store import get_artifact_store
 try:
     # MoviePy v2 (Railway / production)
     from moviepy import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, concatenate_videoclips, CompositeAudioClip, ColorClip
@@ -8,6 +18,39 @@ except ImportError:
     # MoviePy v1 fallback
     from moviepy.editor import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, concatenate_videoclips, CompositeAudioClip, ColorClip
 
+class EncodeProgress(ProgressBarLogger):
+    """MoviePy logger that reports frame progress and encode fps to the running job.
+
+    Called from write_videofile's frame loop, so it is also where a cancelled job stops
+    mid-encode instead of finishing the file.
+    """
+
+    def __init__(self, job, interval=0.5):
+        super().__init__()
+        self.job = job
+        self.interval = interval
+        self.started = time.monotonic()
+        self.reported = 0.0
+        self.fps = None
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        # MoviePy v2 counts "frame_index", v1 iterates "t"; both advance once per frame
+        if attr != "index" or bar not in ("frame_index", "t"):
+            return
+        now = time.monotonic()
+        self.fps = value / max(now - self.started, 1e-6)
+        total = self.bars[bar].get("total")
+        if now - self.reported >= self.interval or (total and value + 1 >= total):
+            self.reported = now
+            self.job.encode(value + 1, total, self.fps)
+
+
+def encode_logger():
+    """write_videofile logger: job progress inside a worker, MoviePy's usual bar otherwise."""
+    job = current_job()
+    return EncodeProgress(job) if job is not None else "bar"
+
+
 class VideoEditor:
     STYLE_CONFIGS = {
         "standard": {
@@ -18,6 +61,9 @@ class VideoEditor:
             "padding": 50
         }
     }
+    # Lean mode: 720p and no full-frame grain layer, roughly half the decoded-frame memory
+    FULL_SIZE = (1920, 1080)
+    LEAN_SIZE = (1280, 720)
 
     def __init__(self, output_dir="output", config_styles=None):
         self.output_dir = output_dir
@@ -37,14 +83,72 @@ class VideoEditor:
 
     def create_video(self, audio_path, video_paths, script_text, output_filename="final_video.mp4", 
                      background_music_path=None, intro_video_path=None, style="standard", 
-                     watermark_handle="@ValuesThatMatters", vertical=False):
-        """Compiles the final documentary with professional style, branding, and optional vertical aspect ratio."""
-        print(f"Creating video with style: {style} (Vertical: {vertical})")
+                     watermark_handle="@ValuesThatMatters", vertical=False, lean=None):
+        """Compiles the final documentary with professional style, branding, and optional vertical aspect ratio.
+
+        The render waits for room in the memory budget; lean=None lets admission downgrade it
+        to the lean (720p, no grain) mode under pressure, lean=True/False pins the mode.
+        """
+        style_cfg = self.styles.get(style, self.STYLE_CONFIGS["standard"])
+        with span("render.create_video", style=style, vertical=vertical, sources=len(video_paths or [])) as s:
+            admission = get_render_admission()
+            full = self._render_shape(video_paths, script_text, style_cfg, vertical, lean=False)
+            small = self._render_shape(video_paths, script_text, style_cfg, vertical, lean=True)
+            full_mb = admission.model.estimate(**full, lean=False)
+            lean_mb = admission.model.estimate(**small, lean=True)
+            if lean:
+                full_mb, lean_mb = lean_mb, None
+            elif lean is False:
+                lean_mb = None
+
+            try:
+                ticket = admission.acquire(full_mb, lean_mb)
+            except RenderAdmissionTimeout as e:
+                print(f"Error creating video: {e}")
+                s.set(ok=False)
+                return None
+            use_lean = bool(lean or ticket.lean)
+            try:
+                # CPU slot: disjoint cores and a matching encoder thread count for this render
+                with get_slot_allocator().slot(os.path.basename(output_filename)) as slot, track_peak(s) as peak:
+                    s.set(cpus=len(slot.cpus), threads=slot.threads)
+                    output_path = self._create_video(audio_path, video_paths, script_text, output_filename,
+                                                     background_music_path, intro_video_path, style,
+                                                     watermark_handle, vertical, lean=use_lean,
+                                                     threads=slot.threads)
+            finally:
+                admission.release(ticket)
+
+            s.set(ok=bool(output_path), bytes=os.path.getsize(output_path) if output_path else None,
+                  render_mode="lean" if use_lean else "full", estimated_mb=ticket.estimated_mb)
+            # Only a render that had the process to itself measures its own peak
+            if output_path and not ticket.overlapped and peak.delta_mb:
+                admission.model.record(**(small if use_lean else full), lean=use_lean, actual_mb=peak.delta_mb,
+                                       estimated_mb=ticket.estimated_mb)
+            return output_path
+
+    def _target_size(self, vertical, lean=False):
+        width, height = self.LEAN_SIZE if lean else self.FULL_SIZE
+        return (height, width) if vertical else (width, height)
+
+    def _render_shape(self, video_paths, script_text, style_cfg, vertical, lean=False):
+        """What drives a render's memory: output size, source clips, full-frame layers and caption count."""
+        words = len(re.sub(r'\[.*?\]', '', script_text or "").split())
+        return {
+            "size": self._target_size(vertical, lean),
+            "clips": sum(1 for p in video_paths or [] if os.path.exists(p)),
+            "layers": 1 + (1 if style_cfg.get("grain") and not lean else 0),
+            "captions": math.ceil(words / 7)
+        }
+
+    def _create_video(self, audio_path, video_paths, script_text, output_filename, background_music_path,
+                      intro_video_path, style, watermark_handle, vertical, lean=False, threads=None):
+        print(f"Creating video with style: {style} (Vertical: {vertical}{', lean' if lean else ''})")
         style_cfg = self.styles.get(style, self.STYLE_CONFIGS["standard"])
         
         try:
             # Target size
-            target_size = (1080, 1920) if vertical else (1920, 1080)
+            target_size = self._target_size(vertical, lean)
             
             # Load voiceover audio
             voiceover = AudioFileClip(audio_path)
@@ -63,29 +167,31 @@ class VideoEditor:
                 final_audio = CompositeAudioClip([voiceover, bg_music])
 
             # Load content video clips
-            clips = []
-            for path in video_paths:
-                if os.path.exists(path):
-                    clip = VideoFileClip(path)
+            with span("render.load_clips") as load_span, track_peak(load_span):
+                clips = []
+                for path in video_paths:
+                    if os.path.exists(path):
+                        clip = VideoFileClip(path)
                     
-                    # Handle resizing for vertical if needed
-                    if vertical:
-                        # Crop to center 9:16
-                        w, h = clip.size
-                        target_ratio = 9/16
-                        if w/h > target_ratio:
-                            # Too wide, crop width
-                            new_w = h * target_ratio
-                            clip = clip.crop(x_center=w/2, width=new_w)
+                        # Handle resizing for vertical if needed
+                        if vertical:
+                            # Crop to center 9:16
+                            w, h = clip.size
+                            target_ratio = 9/16
+                            if w/h > target_ratio:
+                                # Too wide, crop width
+                                new_w = h * target_ratio
+                                clip = clip.crop(x_center=w/2, width=new_w)
+                            else:
+                                # Too tall, crop height
+                                new_h = w / target_ratio
+                                clip = clip.crop(y_center=h/2, height=new_h)
+                            clip = clip.resize(height=target_size[1])
                         else:
-                            # Too tall, crop height
-                            new_h = w / target_ratio
-                            clip = clip.crop(y_center=h/2, height=new_h)
-                        clip = clip.resize(height=1920)
-                    else:
-                        clip = clip.resize(width=1920)
+                            clip = clip.resize(width=target_size[0])
                         
-                    clips.append(clip)
+                        clips.append(clip)
+                load_span.set(clips=len(clips))
 
             if not clips:
                 print("No clips loaded.")
@@ -103,12 +209,14 @@ class VideoEditor:
             final_layers = [content_video_clip]
             
             # Add Grain Overlay if requested
-            if style_cfg.get("grain"):
+            if style_cfg.get("grain") and not lean:
                 grain = self._create_grain_overlay(content_video_clip.size, duration)
                 final_layers.append(grain)
             
             # 2. Timed Subtitles (Auto-Captioning)
-            subtitle_clips = self._create_timed_subtitles(script_text, duration, content_video_clip.size, style_cfg)
+            with span("render.captions") as caption_span, track_peak(caption_span):
+                subtitle_clips = self._create_timed_subtitles(script_text, duration, content_video_clip.size, style_cfg)
+                caption_span.set(captions=len(subtitle_clips))
             final_layers.extend(subtitle_clips)
 
             # 3. Advanced Watermark (Subtle/Moving)
@@ -120,8 +228,12 @@ class VideoEditor:
 
             # 3. Finalize
             output_path = os.path.join(self.output_dir, output_filename)
-            final_content.write_videofile(output_path, fps=24, codec="libx264", audio_codec="aac")
-            
+            with span("render.encode", duration=round(duration, 2), fps=24,
+                      size=list(content_video_clip.size)) as encode_span, track_peak(encode_span):
+                final_content.write_videofile(output_path, fps=24, codec="libx264", audio_codec="aac", threads=threads,
+                                              logger=encode_logger())
+            self._publish_render(output_path, duration, content_video_clip.size, threads, style=style,
+                                 render_mode="lean" if lean else "full")
             return output_path
 
         except Exception as e:
@@ -130,15 +242,37 @@ class VideoEditor:
 
     def merge_videos(self, video_paths, output_filename):
         try:
-            clips = [VideoFileClip(p) for p in video_paths]
-            final_clip = concatenate_videoclips(clips, method="compose")
-            output_path = os.path.join(self.output_dir, output_filename)
-            final_clip.write_videofile(output_path, fps=24)
+            admission = get_render_admission()
+            needed = admission.model.estimate(self.FULL_SIZE, clips=len(video_paths))
+            with span("render.merge", clips=len(video_paths)) as s, admission.reserve(needed), \
+                    get_slot_allocator().slot(output_filename) as slot, track_peak(s):
+                clips = [VideoFileClip(p) for p in video_paths]
+                final_clip = concatenate_videoclips(clips, method="compose")
+                output_path = os.path.join(self.output_dir, output_filename)
+                final_clip.write_videofile(output_path, fps=24, threads=slot.threads, logger=encode_logger())
+                s.set(duration=round(final_clip.duration, 2), bytes=os.path.getsize(output_path))
+                self._publish_render(output_path, final_clip.duration, final_clip.size, slot.threads)
             return output_path
         except Exception as e:
             print(f"Error merging: {e}")
             return None
 
+    def _publish_render(self, output_path, duration, size, threads, **meta):
+        """Preview ladder (still on the render's cores), catalog entry and store upload for a finished master."""
+        if os.path.dirname(os.path.abspath(output_path)) != os.path.abspath(self.output_dir):
+            # Rendered into a job workspace (a long-form chapter): an intermediate, not a library video
+            return
+        previews = get_preview_builder()
+        preview = previews.build(output_path, duration=duration, size=size, threads=threads) if previews else None
+        catalog = get_catalog()
+        if catalog:
+            width, height = size
+            catalog.record(output_path, duration=round(duration, 2), width=width, height=height, preview=preview,
+                           **meta)
+        store = get_artifact_store()
+        if store.remote:
+            store.upload(output_path, f"videos/{os.path.basename(output_path)}")
+
     def _create_watermark(self, size, handle, duration):
         w, h = size
         watermark = TextClip(
@@ -1,10 +1,12 @@
 
-import requests
+from core.llm_gateway import get_gateway
 
 class BrandingEngine:
-    def __init__(self, api_key=None, model="gpt-4o"):
+    def __init__(self, api_key=None, model="gpt-4o", use_cache=True):
         self.api_key = api_key
         self.model = model
+        self.use_cache = use_cache
+        self.llm = get_gateway()
 
     def generate_slogan(self, topic_or_niche):
         """Generates a high-stakes, cinematic slogan for a specific niche or video."""
@@ -14,16 +16,8 @@ class BrandingEngine:
         prompt = f"Generate a short, powerful, high-stakes cinematic slogan for a documentary series centered on: {topic_or_niche}. It should be pithy and evoke mystery, power, or deep human values. Return ONLY the slogan."
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content'].strip().replace('"', '')
+            content = self.llm.chat(prompt, model=self.model, api_key=self.api_key, cache=self.use_cache)
+            return content.strip().replace('"', '')
         except Exception as e:
             print(f"Slogan generation failed: {e}")
             return "Matters of Value: The Core of Everything."
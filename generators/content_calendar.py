@@ -1,12 +1,13 @@
 
 import os
 import json
-import requests
+from core.llm_gateway import get_gateway
 from datetime import datetime, timedelta
 
 class ContentCalendar:
     def __init__(self, api_key=None, config=None):
         self.api_key = api_key
+        self.llm = get_gateway()
         self.config = config
         self.calendar_path = os.path.join("config", "content_calendar.json")
 
@@ -28,17 +29,8 @@ class ContentCalendar:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "response_format": { "type": "json_object" }
-                }
-            )
-            response.raise_for_status()
-            plan_data = json.loads(response.json()['choices'][0]['message']['content'])
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key, response_format="json")
+            plan_data = json.loads(content)
             
             # Save the plan
             with open(self.calendar_path, 'w') as f:
@@ -1,10 +1,11 @@
 
-import requests
+from core.llm_gateway import get_gateway
 import json
 
 class HookOptimizer:
     def __init__(self, api_key=None):
         self.api_key = api_key
+        self.llm = get_gateway()
 
     def generate_variants(self, topic, base_script):
         """Generates multiple 'Angle' variants (hooks) for the same topic to test different demographics."""
@@ -22,17 +23,8 @@ class HookOptimizer:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "response_format": { "type": "json_object" }
-                }
-            )
-            response.raise_for_status()
-            return json.loads(response.json()['choices'][0]['message']['content'])
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key, response_format="json")
+            return json.loads(content)
         except Exception as e:
             print(f"Hook optimization failed: {e}")
             return {"default": base_script}
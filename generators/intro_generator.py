@@ -1,9 +1,10 @@
 
-import requests
+from core.llm_gateway import get_gateway
 
 class IntroHookGenerator:
     def __init__(self, api_key=None):
         self.api_key = api_key
+        self.llm = get_gateway()
 
     def generate_cgi_hook(self, topic):
         """Generates a high-quality visual prompt for an ultra-high-stakes 5-second CGI intro."""
@@ -22,16 +23,8 @@ class IntroHookGenerator:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content'].strip()
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key)
+            return content.strip()
         except Exception as e:
             print(f"Intro hook generation failed: {e}")
             return f"Cinematic landscape of {topic}, atmospheric lightning, 4k."
@@ -1,8 +1,12 @@
 
 import os
-import requests
 import random
 import re # Added re import for extract_keywords_from_script
+from core.llm_gateway import get_gateway
+from core.rate_limiter import raise_for_status
+from core.tracing import span
+from core.workspace import get_artifact_cache
+from core.artifact_store import get_artifact_store
 
 class MediaFetcher:
     def extract_keywords_from_script(self, script, limit=3):
@@ -16,61 +20,90 @@ class MediaFetcher:
         # Return unique keywords
         return list(set(words))[:limit]
 
-    def __init__(self, pexels_api_key=None, openai_api_key=None, stock_dir="assets/stock", config_styles=None):
+    def __init__(self, pexels_api_key=None, openai_api_key=None, stock_dir="assets/stock", config_styles=None,
+                 pexels_base_url="https://api.pexels.com"):
         self.api_key = pexels_api_key
         self.openai_key = openai_api_key
         self.stock_dir = stock_dir
         self.styles = config_styles or {}
-        self.base_url = "https://api.pexels.com/videos/search"
+        self.base_url = f"{pexels_base_url.rstrip('/')}/videos/search"
         self.headers = {"Authorization": self.api_key} if self.api_key else {}
+        self.llm = get_gateway()
         
         if not os.path.exists(self.stock_dir):
             os.makedirs(self.stock_dir)
 
     def _search_local_stock(self, query):
-        """Scans the local stock directory for matching clips."""
-        local_clips = []
-        if not os.path.exists(self.stock_dir):
+        """Scans the stock library (the local directory, plus stock/ in a remote artifact store) for matching clips."""
+        extensions = ('.mp4', '.mov', '.avi')
+        files = []
+        if os.path.exists(self.stock_dir):
+            # Get all video files in stock dir
+            files = [f for f in os.listdir(self.stock_dir) if f.endswith(extensions)]
+        # Clips only in the bucket are downloaded (once per node) through the store's read-through cache
+        store = get_artifact_store()
+        remote = {os.path.basename(k): k for k in store.list("stock/") if k.endswith(extensions)}
+        files += [f for f in remote if f not in files]
+        if not files:
             return []
-            
-        # Get all video files in stock dir
-        files = [f for f in os.listdir(self.stock_dir) if f.endswith(('.mp4', '.mov', '.avi'))]
-        
+
         # Simple keyword matching
         query_words = query.lower().split()
-        for f in files:
-            if any(word in f.lower() for word in query_words):
-                local_clips.append(os.path.join(self.stock_dir, f))
+        chosen = [f for f in files if any(word in f.lower() for word in query_words)]
         
         # If no specific match, just return some random premium clips from the folder if it's not empty
-        if not local_clips and files:
-            local_clips = [os.path.join(self.stock_dir, f) for f in random.sample(files, min(len(files), 2))]
-            
+        if not chosen:
+            chosen = random.sample(files, min(len(files), 2))
+
+        local_clips = []
+        for f in chosen:
+            path = os.path.join(self.stock_dir, f)
+            if f in remote and not os.path.exists(path):
+                path = store.fetch(remote[f])
+            if path:
+                local_clips.append(path)
         return local_clips
 
+    @staticmethod
+    def _checked(response):
+        raise_for_status(response)
+        return response
+
     def generate_ai_image(self, prompt, filename):
         """Generates a high-end cinematic image using DALL-E 3."""
         if not self.openai_key:
             return None
             
+        full_prompt = f"Cinematic documentary shot, {prompt}, hyper-realistic, 8k, moody lighting, wide angle."
+        # Same prompt, same image: served from the artifact cache instead of a paid generation
+        cache = get_artifact_cache()
+        key = cache.key("dall-e-3", "1024x1024", full_prompt) if cache else None
+        if cache and cache.fetch(key, ".png", filename):
+            print(f"[CACHE] Reusing AI Synthesis: {prompt}")
+            return filename
+
         print(f"Generating AI Synthesis: {prompt}")
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/images/generations",
-                headers={"Authorization": f"Bearer {self.openai_key}"},
-                json={
-                    "model": "dall-e-3",
-                    "prompt": f"Cinematic documentary shot, {prompt}, hyper-realistic, 8k, moody lighting, wide angle.",
-                    "n": 1,
-                    "size": "1024x1024"
-                }
-            )
-            response.raise_for_status()
-            image_url = response.json()['data'][0]['url']
-            
-            img_data = requests.get(image_url).content
-            with open(filename, 'wb') as f:
-                f.write(img_data)
+            with span("image.generate", model="dall-e-3") as s:
+                response = self.llm.limited("openai", "images", lambda: self._checked(self.llm.http.post(
+                    f"{self.llm.openai_base_url}/images/generations",
+                    headers={"Authorization": f"Bearer {self.openai_key}"},
+                    json={
+                        "model": "dall-e-3",
+                        "prompt": full_prompt,
+                        "n": 1,
+                        "size": "1024x1024"
+                    },
+                    timeout=120
+                )))
+                image_url = response.json()['data'][0]['url']
+
+                img_data = self.llm.http.get(image_url, timeout=60).content
+                with open(filename, 'wb') as f:
+                    f.write(img_data)
+                s.set(bytes=len(img_data))
+            if cache:
+                cache.promote(key, ".png", filename)
             return filename
         except Exception as e:
             print(f"AI Image Synthesis failed: {e}")
@@ -95,10 +128,13 @@ class MediaFetcher:
                     "per_page": per_page - len(local_assets),
                     "orientation": orientation
                 }
-                response = requests.get(self.base_url, headers=self.headers, params=params)
-                response.raise_for_status()
-                videos = response.json().get("videos", [])
-                pexels_videos = [v["video_files"][0]["link"] for v in videos]
+                with span("pexels.search", query=query, orientation=orientation) as s:
+                    response = self.llm.limited("pexels", "search", lambda: self._checked(
+                        self.llm.http.get(self.base_url, headers=self.headers, params=params, timeout=30)
+                    ))
+                    videos = response.json().get("videos", [])
+                    pexels_videos = [v["video_files"][0]["link"] for v in videos]
+                    s.set(clips=len(pexels_videos))
             except Exception as e:
                 print(f"Pexels search failed: {e}")
 
@@ -110,11 +146,9 @@ class MediaFetcher:
     def download_video(self, url, output_path):
         """Downloads a video file."""
         try:
-            with requests.get(url, stream=True) as r:
-                r.raise_for_status()
-                with open(output_path, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
+            with span("media.download") as s:
+                self.llm.download(url, output_path, timeout=60)
+                s.set(bytes=os.path.getsize(output_path))
             return output_path
         except Exception as e:
             print(f"Error downloading video: {e}")
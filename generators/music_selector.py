@@ -1,12 +1,22 @@
 import os
 import random
 import json
+from core.llm_gateway import get_gateway, LLMError
+from core.artifact_store import get_artifact_store
 
 class MusicSelector:
+    # Voice / genre tone -> music category folder
+    TONE_CATEGORIES = {
+        "onyx": "mystery", "alloy": "finance", "echo": "action", 
+        "nova": "peaceful", "shimmer": "peaceful", "fable": "mystery",
+        "lyrics": "rhythm", "rnb": "rnb", "rap": "rap", "afrobeat": "afrobeat"
+    }
+
     def __init__(self, assets_dir="assets", api_key=None, gemini_api_key=None):
         self.assets_dir = assets_dir
         self.api_key = api_key
         self.gemini_api_key = gemini_api_key
+        self.llm = get_gateway()
         self.music_dir = os.path.join(assets_dir, "music")
         if not os.path.exists(self.music_dir):
             os.makedirs(self.music_dir)
@@ -41,38 +51,15 @@ class MusicSelector:
         return result or "Cinematic suspenseful theme with steady pacing."
 
     def _call_llm(self, prompt, system):
-        import requests
-        # Try OpenAI
-        if self.api_key:
-            try:
-                response = requests.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    json={"model": "gpt-4o-mini", "messages": [{"role": "system", "content": system}, {"role": "user", "content": prompt}]}
-                )
-                if response.status_code == 200:
-                    return response.json()['choices'][0]['message']['content']
-            except: pass
-            
-        # Try Gemini Fallback
-        if self.gemini_api_key:
-            try:
-                import google.generativeai as genai
-                genai.configure(api_key=self.gemini_api_key)
-                model = genai.GenerativeModel("gemini-1.5-flash", system_instruction=system)
-                return model.generate_content(prompt).text
-            except: pass
-        return None
+        try:
+            return self.llm.chat(prompt, system=system, model="gpt-4o-mini",
+                                 api_key=self.api_key, gemini_api_key=self.gemini_api_key)
+        except LLMError:
+            return None
 
     def select_music(self, tone):
         """Selects the best background music based on the analyzed tone."""
-        mapping = {
-            "onyx": "mystery", "alloy": "finance", "echo": "action", 
-            "nova": "peaceful", "shimmer": "peaceful", "fable": "mystery",
-            "lyrics": "rhythm", "rnb": "rnb", "rap": "rap", "afrobeat": "afrobeat"
-        }
-        
-        category = mapping.get(tone, "mystery")
+        category = self.TONE_CATEGORIES.get(tone, tone if tone in self.categories else "mystery")
         print(f"[MUSIC ENGINE] Mapping tone '{tone}' to category '{category}'")
         
         target_dir = os.path.join(self.music_dir, category)
@@ -80,6 +67,16 @@ class MusicSelector:
             files = [f for f in os.listdir(target_dir) if f.endswith('.mp3')]
             if files:
                 return os.path.join(target_dir, random.choice(files))
+
+        # Tracks kept in a remote artifact store (music/<category>/), pulled through its local cache
+        store = get_artifact_store()
+        if store.remote:
+            tracks = [k for k in store.list(f"music/{category}/") if k.endswith('.mp3')]
+            track = store.fetch(random.choice(tracks)) if tracks else None
+            if track:
+                return track
         
         global_music = os.path.join(self.music_dir, "default_background.mp3")
+        if not os.path.exists(global_music) and store.remote:
+            return store.fetch("music/default_background.mp3")
         return global_music if os.path.exists(global_music) else None
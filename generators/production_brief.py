@@ -0,0 +1,138 @@
+
+import json
+from core.llm_gateway import get_gateway
+from generators.script_writer import ScriptWriter
+from publishers.social_bot import SocialMediaBot
+
+class ProductionBriefEngine:
+    """Asks for slogan, voice, enhanced script, social package, music brief and sponsor spots
+    in one schema-constrained LLM response instead of one round trip each."""
+
+    def __init__(self, api_key=None, gemini_api_key=None, model="gpt-4o"):
+        self.api_key = api_key
+        self.gemini_api_key = gemini_api_key
+        self.model = model
+        self.llm = get_gateway()
+
+    def _schema(self, fields):
+        text = {"type": "string"}
+        platform = {
+            "type": "object",
+            "properties": {
+                "description": text,
+                "hashtags": {"type": "array", "items": text},
+                "pinned_comment": text
+            },
+            "required": ["description", "hashtags", "pinned_comment"],
+            "additionalProperties": False
+        }
+        properties = {
+            "slogan": text,
+            "voice": {"type": "string", "enum": ScriptWriter.VOICE_NAMES},
+            "enhanced_script": text,
+            "engagement_package": {
+                "type": "object",
+                "properties": {p: platform for p in SocialMediaBot.PLATFORMS},
+                "required": list(SocialMediaBot.PLATFORMS),
+                "additionalProperties": False
+            },
+            "music_brief": text,
+            "sponsor_spots": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"position": text, "context": text, "cue": text},
+                    "required": ["position", "context", "cue"],
+                    "additionalProperties": False
+                }
+            }
+        }
+        return {
+            "name": "production_brief",
+            "schema": {
+                "type": "object",
+                "properties": {f: properties[f] for f in fields},
+                "required": list(fields),
+                "additionalProperties": False
+            }
+        }
+
+    def _prompt(self, title, script, fields):
+        tasks = {
+            "slogan": "slogan: a short, powerful, high-stakes cinematic slogan for the series (no quotes).",
+            "voice": f"voice: the best narrator voice for the script's emotional weight, one of {ScriptWriter.VOICE_NAMES}.",
+            "enhanced_script": "enhanced_script: the FULL script with dramatic [SFX] cues and visual [Action] markers inserted. Keep every original line.",
+            "engagement_package": "engagement_package: for each platform a culture-optimized description, 5 strategic hashtags and a pinned comment.",
+            "music_brief": "music_brief: genre & mood, instrumentation, energy arc and a prompt for an AI music generator.",
+            "sponsor_spots": "sponsor_spots: 2 brand-safe cliffhanger breaks for a 30-60s ad read (position, context, cue)."
+        }
+        task_lines = "\n".join(f"- {tasks[f]}" for f in fields)
+        return f"""Prepare the full production brief for a faceless documentary video.
+        Title: {title}
+
+        Return ONE JSON object with these fields:
+        {task_lines}
+
+        SCRIPT:
+        {script}
+        """
+
+    def _validate(self, field, value, script):
+        """Returns True when a field is usable as-is; otherwise the caller falls back to the dedicated call."""
+        if field == "slogan":
+            return isinstance(value, str) and 0 < len(value.strip()) <= 200
+        if field == "voice":
+            return isinstance(value, str) and value.strip().lower() in ScriptWriter.VOICE_NAMES
+        if field == "enhanced_script":
+            # Reject truncated rewrites: the enhancement must keep most of the original words
+            return isinstance(value, str) and len(value.split()) >= 0.8 * len(script.split())
+        if field == "engagement_package":
+            return isinstance(value, dict) and all(isinstance(value.get(p), dict) for p in SocialMediaBot.PLATFORMS)
+        if field == "music_brief":
+            return isinstance(value, str) and len(value.strip()) > 20
+        if field == "sponsor_spots":
+            return isinstance(value, list) and bool(value) and all(
+                isinstance(s, dict) and {"position", "context", "cue"} <= set(s) for s in value
+            )
+        return False
+
+    def generate(self, title, script, enhance=False, extras=False):
+        """Returns a dict holding only the fields that passed local validation."""
+        if not self.api_key and not self.gemini_api_key:
+            return {}
+
+        fields = ["slogan", "voice", "engagement_package"]
+        if enhance:
+            fields.append("enhanced_script")
+        if extras:
+            fields += ["music_brief", "sponsor_spots"]
+
+        max_tokens = 1500 + (len(script.split()) * 2 if enhance else 0)
+        try:
+            content = self.llm.chat(
+                self._prompt(title, script, fields),
+                system="You are the executive producer of 'Matters of Value'. Respond with JSON only.",
+                model=self.model,
+                max_tokens=max_tokens,
+                response_format=self._schema(fields),
+                api_key=self.api_key,
+                gemini_api_key=self.gemini_api_key
+            )
+            if "```json" in content:
+                content = content.split("```json")[1].split("```")[0]
+            data = json.loads(content)
+        except Exception as e:
+            print(f"[BRIEF] Production brief failed, using individual calls: {e}")
+            return {}
+
+        brief = {}
+        for field in fields:
+            if self._validate(field, data.get(field), script):
+                brief[field] = data[field]
+            else:
+                print(f"[BRIEF] Field '{field}' failed validation; falling back to its dedicated call.")
+        if "voice" in brief:
+            brief["voice"] = brief["voice"].strip().lower()
+        if "slogan" in brief:
+            brief["slogan"] = brief["slogan"].strip().replace('"', '')
+        return brief
@@ -1,14 +1,13 @@
 import os
 import re
 import json
-import google.generativeai as genai
+from core.llm_gateway import get_gateway
 
 class RepurposingEngine:
     def __init__(self, api_key=None, gemini_api_key=None):
         self.api_key = api_key
         self.gemini_api_key = gemini_api_key
-        if self.gemini_api_key:
-            genai.configure(api_key=self.gemini_api_key)
+        self.llm = get_gateway()
 
     def identify_viral_shorts(self, script):
         """
@@ -54,38 +53,24 @@ class RepurposingEngine:
         SCRIPT:
         {script}"""
 
-        # 1. Try OpenAI
-        if self.api_key:
-            try:
-                import openai
-                client = openai.OpenAI(api_key=self.api_key)
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "system", "content": "You are a viral content strategist."}, {"role": "user", "content": prompt}],
-                    response_format={ "type": "json_object" }
-                )
-                data = json.loads(response.choices[0].message.content)
-                shorts = data.get("segments", data if isinstance(data, list) else [])
-                for s in shorts: s["estimated_duration"] = round(len(s.get("text", "").split()) / 2.5, 1)
-                return shorts
-            except Exception as e:
-                print(f"[REPURPOSING] OpenAI Fallback: {e}")
-
-        # 2. Try Gemini
-        if self.gemini_api_key:
-            try:
-                model = genai.GenerativeModel("gemini-1.5-flash")
-                response = model.generate_content(prompt)
-                # Parse JSON from text blocks
-                text = response.text
-                if "```json" in text:
-                    text = text.split("```json")[1].split("```")[0].strip()
-                data = json.loads(text)
-                shorts = data.get("segments", data if isinstance(data, list) else [])
-                for s in shorts: s["estimated_duration"] = round(len(s.get("text", "").split()) / 2.5, 1)
-                return shorts
-            except Exception as e:
-                print(f"[REPURPOSING] Gemini Fallback Failed: {e}")
+        try:
+            text = self.llm.chat(
+                prompt,
+                system="You are a viral content strategist.",
+                model="gpt-4o-mini",
+                response_format="json",
+                api_key=self.api_key,
+                gemini_api_key=self.gemini_api_key
+            )
+            # Parse JSON from text blocks
+            if "```json" in text:
+                text = text.split("```json")[1].split("```")[0].strip()
+            data = json.loads(text)
+            shorts = data.get("segments", []) if isinstance(data, dict) else data
+            for s in shorts: s["estimated_duration"] = round(len(s.get("text", "").split()) / 2.5, 1)
+            return shorts
+        except Exception as e:
+            print(f"[REPURPOSING] AI analysis failed: {e}")
 
         return None
 
@@ -93,22 +78,9 @@ class RepurposingEngine:
         """Generates 3 different hook variations."""
         prompt = f"Generate 3 viral video hooks for: {topic}. Keep under 15 words. Return as plain list."
         
-        if self.api_key:
-            try:
-                import openai
-                client = openai.OpenAI(api_key=self.api_key)
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return [l.strip() for l in response.choices[0].message.content.split('\n') if l.strip()][:3]
-            except: pass
-
-        if self.gemini_api_key:
-            try:
-                model = genai.GenerativeModel("gemini-1.5-flash")
-                response = model.generate_content(prompt)
-                return [l.strip() for l in response.text.split('\n') if l.strip()][:3]
-            except: pass
+        try:
+            text = self.llm.chat(prompt, model="gpt-4o-mini", api_key=self.api_key, gemini_api_key=self.gemini_api_key)
+            return [l.strip() for l in text.split('\n') if l.strip()][:3]
+        except: pass
 
         return [f"This changes everything about {topic}.", f"The truth about {topic}.", f"What they don't want you to know: {topic}."]
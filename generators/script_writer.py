@@ -1,69 +1,78 @@
 import os
-import requests
-import google.generativeai as genai
+from core.llm_gateway import get_gateway, LLMError
+from generators.tone_classifier import ToneClassifier
 
 class ScriptWriter:
-    def __init__(self, api_key=None, gemini_api_key=None, model="gpt-4o", config_styles=None):
+    VOICE_NAMES = ["onyx", "alloy", "echo", "fable", "nova", "shimmer"]
+
+    def __init__(self, api_key=None, gemini_api_key=None, model="gpt-4o", config_styles=None, use_cache=True,
+                 tone_threshold=0.35):
         self.api_key = api_key
         self.gemini_api_key = gemini_api_key
         self.model = model
         self.styles = config_styles or {}
-        
-        # Configure Gemini
-        if self.gemini_api_key:
-            genai.configure(api_key=self.gemini_api_key)
+        self.use_cache = use_cache
+        self.llm = get_gateway()
+        # Local fast path for analyze_tone; None disables it (always ask the LLM)
+        self.tone_threshold = tone_threshold
+        self.tone_classifier = ToneClassifier(voices=self.VOICE_NAMES)
 
-    def _call_llm(self, prompt, system_instruction="You are a professional video scriptwriter for 'Matters of Value'.", max_tokens=1000):
-        """Unified LLM caller with OpenAI -> Gemini fallback."""
-        
-        # 1. Try OpenAI
-        if self.api_key:
-            try:
-                print(f"[LLM] Attempting OpenAI ({self.model})...")
-                response = requests.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": system_instruction},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "max_tokens": max_tokens
-                    },
-                    timeout=60
-                )
-                if response.status_code == 429:
-                    print("[LLM] OpenAI Quota Exceeded (429). Falling back...")
-                else:
-                    response.raise_for_status()
-                    return response.json()['choices'][0]['message']['content']
-            except Exception as e:
-                print(f"[LLM] OpenAI Error: {e}")
-        
-        # 2. Try Gemini Fallback
-        if self.gemini_api_key:
-            try:
-                print("[LLM] Attempting Gemini Fallback...")
-                model = genai.GenerativeModel(
-                    model_name="gemini-1.5-flash",
-                    system_instruction=system_instruction
-                )
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        max_output_tokens=max_tokens,
-                        temperature=0.7
-                    )
-                )
-                return response.text
-            except Exception as e:
-                print(f"[LLM] Gemini Fallback Error: {e}")
-        
-        return None
+    @staticmethod
+    def is_failed(script):
+        """True for empty scripts and the placeholder bodies returned when every provider failed."""
+        return not script or not script.strip() or script.startswith(("Error generating", "Error:"))
+
+    def _call_llm(self, prompt, system_instruction="You are a professional video scriptwriter for 'Matters of Value'.", max_tokens=1000, cache=False, stream=False):
+        """Unified LLM caller with OpenAI -> Gemini fallback (via the shared gateway).
 
-    def generate_script(self, topic, style="cinematic_documentary", structure="cinematic"):
-        """Generates a high-stakes script using Viral Psychology & Retention Hooks."""
+        With stream=True, returns an iterator of completed paragraphs instead of the full text.
+        """
+        if stream:
+            return self._stream_paragraphs(prompt, system_instruction, max_tokens)
+        try:
+            print(f"[LLM] Requesting completion ({self.model})...")
+            return self.llm.chat(
+                prompt,
+                system=system_instruction,
+                model=self.model,
+                max_tokens=max_tokens,
+                api_key=self.api_key,
+                gemini_api_key=self.gemini_api_key,
+                cache=cache
+            )
+        except LLMError as e:
+            print(f"[LLM] All providers failed: {e}")
+            return None
+
+    def _stream_paragraphs(self, prompt, system_instruction, max_tokens):
+        """Yields each blank-line separated paragraph as soon as the stream completes it."""
+        buffer = ""
+        try:
+            print(f"[LLM] Streaming completion ({self.model})...")
+            for delta in self.llm.stream_chat(
+                prompt,
+                system=system_instruction,
+                model=self.model,
+                max_tokens=max_tokens,
+                api_key=self.api_key,
+                gemini_api_key=self.gemini_api_key
+            ):
+                buffer += delta
+                while "\n\n" in buffer:
+                    paragraph, buffer = buffer.split("\n\n", 1)
+                    if paragraph.strip():
+                        yield paragraph.strip()
+        except Exception as e:
+            print(f"[LLM] Stream failed: {e}")
+        if buffer.strip():
+            yield buffer.strip()
+
+    def generate_script(self, topic, style="cinematic_documentary", structure="cinematic", on_paragraph=None):
+        """Generates a high-stakes script using Viral Psychology & Retention Hooks.
+
+        If on_paragraph is given, the script is streamed and the callback receives each
+        finished paragraph while the rest is still being written.
+        """
         if not self.api_key and not self.gemini_api_key:
             return f"The mystery of {topic} remains unsolved. A journey into the depths of values that matters."
 
@@ -74,7 +83,14 @@ class ScriptWriter:
             prompt = f"Write a high-retention, cinematic documentary script for the topic: {topic}. Style: {style}. Use CURIOSITY HOOK, NON-OBVIOUS TAKE, and OPEN LOOPS."
             system = "You are a professional documentary scriptwriter. Focus on high-stakes delivery and non-obvious takes. Return ONLY the script content."
 
-        result = self._call_llm(prompt, system_instruction=system)
+        if on_paragraph is None:
+            result = self._call_llm(prompt, system_instruction=system)
+        else:
+            paragraphs = []
+            for paragraph in self._call_llm(prompt, system_instruction=system, stream=True):
+                paragraphs.append(paragraph)
+                on_paragraph(paragraph)
+            result = "\n\n".join(paragraphs)
         return result or f"Error generating script for {topic}"
 
     def generate_from_concept(self, title, concept, style="cinematic_documentary", duration_minutes=2):
@@ -107,14 +123,25 @@ class ScriptWriter:
         return result or script
 
     def analyze_tone(self, script):
-        """Analyzes script tone and recommends the best voice."""
+        """Analyzes script tone and recommends the best voice (local classifier first, LLM below threshold)."""
+        if self.tone_threshold is not None:
+            local = self.tone_classifier.classify(script)
+            no_llm = not (self.api_key or self.gemini_api_key or self.llm.openai_api_key or self.llm.gemini_api_key)
+            if local["confidence"] >= self.tone_threshold or no_llm:
+                print(f"[TONE] Local classifier: {local['voice']} (confidence {local['confidence']})")
+                return local["voice"]
+            print(f"[TONE] Low confidence ({local['confidence']}); escalating to LLM...")
+        return self.analyze_tone_llm(script)
+
+    def analyze_tone_llm(self, script):
+        """Asks the LLM for the best voice."""
         prompt = f"Analyze script tone and pick best voice: [onyx, alloy, echo, fable, nova, shimmer]. Return ONLY the name. \n\nScript: {script}"
         system = "Pick the best voice from the list based on the script's emotional weight. Return only the single word name."
         
-        result = self._call_llm(prompt, system_instruction=system, max_tokens=10)
+        result = self._call_llm(prompt, system_instruction=system, max_tokens=10, cache=self.use_cache)
         if result:
             voice = result.strip().lower()
-            return voice if voice in ["onyx", "alloy", "echo", "fable", "nova", "shimmer"] else "onyx"
+            return voice if voice in self.VOICE_NAMES else "onyx"
         return "onyx"
 
     def generate_lyrics(self, topic, genre="hip-hop"):
@@ -1,10 +1,11 @@
 
-import requests
+from core.llm_gateway import get_gateway
 import json
 
 class SeriesPlanner:
     def __init__(self, api_key=None):
         self.api_key = api_key
+        self.llm = get_gateway()
 
     def plan_trilogy(self, topic):
         """Generates a cohesive 3-part documentary arc for a single topic."""
@@ -31,16 +32,7 @@ class SeriesPlanner:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
-            content = response.json()['choices'][0]['message']['content']
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key)
             # Sanitize json string if needed (simple strip)
             if "```json" in content:
                 content = content.replace("```json", "").replace("```", "")
@@ -1,10 +1,12 @@
 
-import requests
+from core.llm_gateway import get_gateway
 import json
 
 class SponsorManager:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, use_cache=True):
         self.api_key = api_key
+        self.use_cache = use_cache
+        self.llm = get_gateway()
 
     def find_safe_spots(self, script):
         """Analyzes script to find brand-safe, retention-preserving ad insertion points."""
@@ -30,16 +32,7 @@ class SponsorManager:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
-            content = response.json()['choices'][0]['message']['content']
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key, cache=self.use_cache)
             if "```json" in content:
                 content = content.replace("```json", "").replace("```", "")
             return json.loads(content)
@@ -0,0 +1,92 @@
+
+import os
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+class StreamingVoiceover:
+    """Voices each script paragraph (and extracts its keywords) while the script is still streaming.
+
+    Feed it from ScriptWriter.generate_script(on_paragraph=...), then call finish() to get
+    the artifacts produce_video can reuse instead of redoing TTS and stock search.
+    """
+
+    def __init__(self, voice_engine, media_engine, script_engine, assets_dir, output_prefix,
+                 voice="auto", style="cinematic_documentary", max_workers=2):
+        self.voice_engine = voice_engine
+        self.media_engine = media_engine
+        self.script_engine = script_engine
+        self.style = style
+        self.voice = None if voice == "auto" else voice
+        self.segment_dir = os.path.join(assets_dir, f"segments_{output_prefix}")
+        os.makedirs(self.segment_dir, exist_ok=True)
+
+        # Room for the stock search alongside the TTS workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers + 1, thread_name_prefix="tts")
+        self.lock = threading.Lock()
+        self.paragraphs = []
+        self.segments = []
+        self.keywords = []
+        self.stock_future = None
+
+    def feed(self, paragraph):
+        """Callback for each finished paragraph."""
+        with self.lock:
+            self.paragraphs.append(paragraph)
+
+            for word in self.media_engine.extract_keywords_from_script(paragraph):
+                if word not in self.keywords:
+                    self.keywords.append(word)
+            if self.stock_future is None and len(self.keywords) >= 3:
+                query = " ".join(self.keywords[:3])
+                self.stock_future = self._submit(
+                    self.media_engine.search_videos, query=query, per_page=10, style=self.style
+                )
+
+            # "auto" voice: decide as soon as the local classifier is confident on the text so far
+            if self.voice is None and self.script_engine.tone_threshold is not None:
+                local = self.script_engine.tone_classifier.classify("\n\n".join(self.paragraphs))
+                if local["confidence"] >= self.script_engine.tone_threshold:
+                    self.voice = local["voice"]
+                    print(f"[STREAM] Voice resolved early: {self.voice}")
+
+            if self.voice is not None:
+                self._submit_pending()
+
+    def _submit(self, fn, **kwargs):
+        """Runs fn on the pool inside the caller's trace context."""
+        return self.pool.submit(contextvars.copy_context().run, fn, **kwargs)
+
+    def _submit_pending(self):
+        for index in range(len(self.segments), len(self.paragraphs)):
+            output_file = os.path.join(self.segment_dir, f"{index:03d}.mp3")
+            self.segments.append(self._submit(
+                self.voice_engine.generate_audio, text=self.paragraphs[index],
+                output_file=output_file, voice=self.voice
+            ))
+
+    def finish(self):
+        """Waits for outstanding segments and returns the prepared artifacts."""
+        with self.lock:
+            script = "\n\n".join(self.paragraphs)
+            if self.voice is None:
+                self.voice = self.script_engine.analyze_tone(script) if script else "onyx"
+            self._submit_pending()
+            query = " ".join(self.keywords[:3])
+            if self.stock_future is None and query:
+                self.stock_future = self._submit(
+                    self.media_engine.search_videos, query=query, per_page=10, style=self.style
+                )
+
+        segments = [f.result() for f in self.segments]
+        video_sources = self.stock_future.result() if self.stock_future else None
+        self.pool.shutdown(wait=False)
+
+        return {
+            "script": script,
+            "voice": self.voice,
+            "segments": [s for s in segments if s],
+            "complete": all(seg or not self.voice_engine._clean_text(p) for seg, p in zip(segments, self.paragraphs)),
+            "keywords": query,
+            "video_sources": video_sources
+        }
@@ -1,10 +1,13 @@
 
 import os
+import uuid
 try:
     from moviepy import ImageClip, TextClip, CompositeVideoClip, ColorClip
 except ImportError:
     from moviepy.editor import ImageClip, TextClip, CompositeVideoClip, ColorClip
 from generators.media_fetcher import MediaFetcher
+from core.llm_gateway import get_gateway, LLMError
+from core.workspace import scratch_path
 
 class ThumbnailGenerator:
     def __init__(self, config):
@@ -14,6 +17,7 @@ class ThumbnailGenerator:
             openai_api_key=config.OPENAI_API_KEY,
             config_styles=config.STYLES
         )
+        self.llm = get_gateway()
 
     def generate_ab_concepts(self, topic):
         """Generates two distinct high-performing thumbnail concepts using Intelligence (A/B Test)."""
@@ -57,28 +61,11 @@ class ThumbnailGenerator:
         }
 
     def _call_llm(self, prompt, system):
-        import requests
-        # 1. Try OpenAI
-        if self.config.OPENAI_API_KEY:
-            try:
-                response = requests.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={"Authorization": f"Bearer {self.config.OPENAI_API_KEY}"},
-                    json={"model": "gpt-4o-mini", "messages": [{"role": "system", "content": system}, {"role": "user", "content": prompt}]}
-                )
-                if response.status_code == 200:
-                    return response.json()['choices'][0]['message']['content']
-            except: pass
-            
-        # 2. Try Gemini Fallback
-        if self.config.GEMINI_API_KEY:
-            try:
-                import google.generativeai as genai
-                genai.configure(api_key=self.config.GEMINI_API_KEY)
-                model = genai.GenerativeModel("gemini-1.5-flash", system_instruction=system)
-                return model.generate_content(prompt).text
-            except: pass
-        return None
+        try:
+            return self.llm.chat(prompt, system=system, model="gpt-4o-mini",
+                                 api_key=self.config.OPENAI_API_KEY, gemini_api_key=self.config.GEMINI_API_KEY)
+        except LLMError:
+            return None
 
     def generate_thumbnail(self, title, style="cinematic_documentary", concept_visual=None, concept_text=None):
         """Creates a high-end YouTube thumbnail using AI synthesis and professional branding."""
@@ -90,7 +77,8 @@ class ThumbnailGenerator:
         # Use provided concept visual if available, otherwise fallback to title-based prompt
         prompt = concept_visual if concept_visual else f"{title}. {style_cfg.get('aesthetic')}. Bold, high-contrast, professional YouTube thumbnail style."
         
-        backdrop_path = os.path.join(self.config.ASSETS_DIR, "thumb_backdrop_raw.png")
+        # Unique scratch file in the job's workspace, so concurrent thumbnails never share a backdrop
+        backdrop_path = scratch_path(f"thumb_backdrop_{uuid.uuid4().hex[:8]}.png")
         backdrop_file = self.media.generate_ai_image(prompt, backdrop_path)
         
         if not backdrop_file:
@@ -0,0 +1,103 @@
+
+import re
+from collections import Counter
+from generators.music_selector import MusicSelector
+
+try:
+    from textblob import TextBlob
+except ImportError:
+    TextBlob = None
+
+class ToneClassifier:
+    """Offline lexicon classifier that maps a script to a narrator voice and a music category.
+
+    Runs in milliseconds; ScriptWriter only escalates to the LLM when `confidence`
+    falls below its threshold.
+    """
+
+    # Word stems (prefix match) that signal each voice's register
+    LEXICON = {
+        "onyx": ["myster", "secret", "hidden", "dark", "unknown", "vanish", "disappear", "conspira", "shadow",
+                 "unsolved", "murder", "crime", "strange", "evidence", "investigat", "cover-up", "classified",
+                 "silence", "night", "fear", "truth", "clue", "cipher", "encrypt", "surveil"],
+        "alloy": ["money", "market", "invest", "wealth", "stock", "econom", "bank", "crypto", "bitcoin", "price",
+                  "profit", "fund", "dollar", "trade", "inflation", "asset", "portfolio", "revenue",
+                  "billion", "million", "tax", "debt", "income", "business"],
+        "echo": ["breaking", "shock", "urgent", "viral", "insane", "explos", "crisis", "war", "alert",
+                 "massive", "chaos", "attack", "collapse", "warning", "exposed", "scandal", "outrage",
+                 "trending", "record", "fastest", "biggest"],
+        "fable": ["once", "legend", "ancient", "tale", "myth", "centur", "empire", "king", "queen",
+                  "caravan", "dynasty", "medieval", "journey", "voyage", "forgotten", "ruin", "temple"],
+        "nova": ["amazing", "fun", "happy", "love", "excit", "bright", "joy", "smile", "celebrat", "awesome",
+                 "beautiful", "delight", "wonderful", "friend", "summer", "party", "dance"],
+        "shimmer": ["peace", "calm", "breath", "disciplin", "dream", "believe", "mindset", "purpose",
+                    "gratitude", "heal", "patience", "grow", "habit", "focus", "inspir", "motivat", "champion",
+                    "success", "never give up", "rise"]
+    }
+
+    # Lyrics genres override the voice-derived music category (lyrics only)
+    GENRE_LEXICON = {
+        "rap": ["rap", "bars", "mic", "spit", "flow", "hood"],
+        "rnb": ["baby", "soul", "heart", "tonight", "touch"],
+        "afrobeat": ["afro", "lagos", "naija", "omo", "wahala", "jollof"]
+    }
+
+    def __init__(self, voices=None, tone_categories=None):
+        self.voices = voices or list(self.LEXICON.keys())
+        self.tone_categories = tone_categories or MusicSelector.TONE_CATEGORIES
+
+    def _tokens(self, script):
+        # Strip [Action]/[SFX] cues so production markup doesn't skew the register
+        text = re.sub(r'\[.*?\]', ' ', script).lower()
+        return text, re.findall(r"[a-z][a-z'\-]+", text)
+
+    def _score(self, lexicon, text, tokens):
+        scores = Counter()
+        for label, stems in lexicon.items():
+            for stem in stems:
+                if " " in stem:
+                    scores[label] += text.count(stem) * 2
+                else:
+                    scores[label] += sum(1 for t in tokens if t.startswith(stem))
+        return scores
+
+    def classify(self, script):
+        """Returns {"voice", "music_category", "confidence", "scores"} with confidence in [0, 1]."""
+        text, tokens = self._tokens(script or "")
+        scores = self._score({v: self.LEXICON[v] for v in self.voices if v in self.LEXICON}, text, tokens)
+
+        # Sentiment and punctuation shift the energetic/calm/dark balance
+        if TextBlob is not None and tokens:
+            polarity = TextBlob(text[:5000]).sentiment.polarity
+            if polarity > 0.2:
+                scores["shimmer"] += polarity * 3
+                scores["nova"] += polarity * 2
+            elif polarity < -0.1:
+                scores["onyx"] += -polarity * 3
+        scores["echo"] += min(text.count("!"), 5) * 0.5
+
+        ranked = scores.most_common()
+        if not ranked or ranked[0][1] <= 0:
+            return {"voice": "onyx", "music_category": self.tone_categories.get("onyx", "mystery"),
+                    "confidence": 0.0, "scores": {}}
+
+        voice, top = ranked[0]
+        second = ranked[1][1] if len(ranked) > 1 else 0.0
+        # Margin over the runner-up, damped when there is little lexical evidence at all
+        margin = (top - second) / top
+        evidence = min(1.0, top / 4.0)
+        confidence = round(margin * evidence, 3)
+
+        category = self.tone_categories.get(voice, "mystery")
+        if re.search(r'\[(verse|chorus|hook)', (script or "").lower()):
+            category = self.tone_categories.get("lyrics", "rhythm")
+            genre_scores = self._score(self.GENRE_LEXICON, text, tokens).most_common(1)
+            if genre_scores and genre_scores[0][1] >= 3:
+                category = genre_scores[0][0]
+
+        return {
+            "voice": voice,
+            "music_category": category,
+            "confidence": confidence,
+            "scores": {k: round(v, 2) for k, v in ranked}
+        }
@@ -1,9 +1,11 @@
 
-import requests
+from core.llm_gateway import get_gateway
 
 class TranslationEngine:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, use_cache=True):
         self.api_key = api_key
+        self.use_cache = use_cache
+        self.llm = get_gateway()
         self.target_languages = {
             "Spanish": "es",
             "French": "fr",
@@ -20,16 +22,8 @@ class TranslationEngine:
         prompt = f"Translate the following documentary script into fluent, cinematic {target_lang_name}. Maintain the high-stakes tone and all [SFX] or [Action] markers. \n\nScript: {script}"
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content'].strip()
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key, cache=self.use_cache)
+            return content.strip()
         except Exception as e:
             print(f"Translation to {target_lang_name} failed: {e}")
             return script
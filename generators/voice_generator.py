@@ -1,14 +1,20 @@
 import os
 import re
-import requests
+import shutil
+import tempfile
+import subprocess
 import asyncio
 from gtts import gTTS
+from core.llm_gateway import get_gateway
+from core.rate_limiter import raise_for_status
+from core.tracing import span
 
 class VoiceGenerator:
     def __init__(self, api_key=None, lang="en", config_voices=None):
         self.api_key = api_key
         self.lang = lang
         self.voice_presets = config_voices or {}
+        self.llm = get_gateway()
 
     def _clean_text(self, text):
         """Removes [Action] and [VISUAL] tags from the script."""
@@ -32,12 +38,34 @@ class VoiceGenerator:
         communicate = edge_tts.Communicate(text, edge_voice)
         await communicate.save(output_file)
 
+    def _openai_speech(self, text, voice):
+        response = self.llm.http.post(
+            f"{self.llm.openai_base_url}/audio/speech",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={
+                "model": "tts-1",
+                "voice": voice if voice in ["alloy", "echo", "fable", "onyx", "nova", "shimmer"] else "onyx",
+                "input": text
+            },
+            timeout=120
+        )
+        raise_for_status(response)
+        return response
+
     def generate_audio(self, text, output_file="output.mp3", voice="onyx"):
         """Generates speech using configured voice settings."""
         cleaned_text = self._clean_text(text)
         if not cleaned_text:
             return None
 
+        with span("tts", voice=voice, chars=len(cleaned_text)) as s:
+            result = self._synthesize(cleaned_text, output_file, voice, s)
+            if result:
+                s.set(bytes=os.path.getsize(result))
+            return result
+
+    def _synthesize(self, cleaned_text, output_file, voice, s):
+        """OpenAI -> Edge-TTS -> gTTS; records the engine that answered on the span."""
         # 1. Try OpenAI Pro Voice if key exists
         preset = self.voice_presets.get(voice, {"engine": "openai"})
         engine = preset.get("engine", "openai")
@@ -45,18 +73,10 @@ class VoiceGenerator:
         if self.api_key and engine == "openai":
             try:
                 print(f"Generating Pro Voice ({voice})...")
-                response = requests.post(
-                    "https://api.openai.com/v1/audio/speech",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    json={
-                        "model": "tts-1",
-                        "voice": voice if voice in ["alloy", "echo", "fable", "onyx", "nova", "shimmer"] else "onyx",
-                        "input": cleaned_text
-                    }
-                )
-                response.raise_for_status()
+                response = self.llm.limited("openai", "tts", lambda: self._openai_speech(cleaned_text, voice))
                 with open(output_file, 'wb') as f:
                     f.write(response.content)
+                s.set(engine="openai")
                 return output_file
             except Exception as e:
                 print(f"Pro Voice failed, falling back to High-Quality Free Voice: {e}")
@@ -65,6 +85,7 @@ class VoiceGenerator:
         try:
             print(f"Generating High-Quality Free Voice (Edge-TTS)...")
             asyncio.run(self._generate_edge_tts(cleaned_text, output_file, voice))
+            s.set(engine="edge-tts")
             return output_file
         except Exception as e:
             print(f"Edge-TTS failed, falling back to gTTS: {e}")
@@ -74,7 +95,39 @@ class VoiceGenerator:
             print("Generating Standard Voice (gTTS)...")
             tts = gTTS(text=cleaned_text, lang=self.lang, slow=False)
             tts.save(output_file)
+            s.set(engine="gtts")
             return output_file
         except Exception as e:
             print(f"Error generating voice: {e}")
             return None
+
+    def concat_audio(self, segment_files, output_file):
+        """Joins per-paragraph voice segments into one voiceover track."""
+        segment_files = [f for f in segment_files if f and os.path.exists(f)]
+        if not segment_files:
+            return None
+        if len(segment_files) == 1:
+            shutil.copyfile(segment_files[0], output_file)
+            return output_file
+
+        try:
+            import imageio_ffmpeg
+            with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+                for f in segment_files:
+                    listing.write(f"file '{os.path.abspath(f)}'\n")
+            subprocess.run(
+                [imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                 "-i", listing.name, "-c", "copy", output_file],
+                check=True, capture_output=True
+            )
+            os.remove(listing.name)
+            return output_file
+        except Exception as e:
+            print(f"ffmpeg concat failed, joining MP3 frames directly: {e}")
+
+        # MP3 streams can be concatenated frame-wise as a last resort
+        with open(output_file, 'wb') as out:
+            for f in segment_files:
+                with open(f, 'rb') as seg:
+                    out.write(seg.read())
+        return output_file
@@ -1,84 +1,188 @@
 
 import os
+import threading
 from config import settings
-from sources.reddit_scraper import RedditScraper
-from generators.script_writer import ScriptWriter
-from generators.voice_generator import VoiceGenerator
-from generators.media_fetcher import MediaFetcher
-from editor.video_maker import VideoEditor
-
-from generators.news_integrator import NewsIntegrator
-from generators.translation_engine import TranslationEngine
-from generators.hook_optimizer import HookOptimizer
-from publishers.sentiment_tracker import SentimentTracker
-from generators.lipsync_engine import LipSyncEngine
-from publishers.comment_responder import CommentResponder
-from publishers.community_manager import CommunityManager
-from publishers.pivot_analyzer import PivotAnalyzer
-from generators.intro_generator import IntroHookGenerator
-from generators.series_planner import SeriesPlanner
-from generators.voice_cloning import VoiceCloningEngine
-from publishers.publishing_pipeline import PublishingPipeline
-from generators.branding_engine import BrandingEngine
-from generators.music_selector import MusicSelector
-from generators.content_calendar import ContentCalendar
-from generators.thumbnail_generator import ThumbnailGenerator
-from generators.sponsor_manager import SponsorManager
-from publishers.publishing_hub import PublishingHub
-from generators.repurposing_engine import RepurposingEngine
+from core.llm_gateway import configure_gateway, get_gateway
+from core.llm_cache import LLMCache
+from core.stage_graph import StageGraph
+from core.tracing import configure_tracing, trace, span
+from core.profiling import profile_job, profile_worker_from_env, request_profiling
+from core.render_memory import configure_render_memory
+from core.render_slots import configure_render_slots
+from core.video_catalog import configure_catalog, get_catalog
+from core.previews import configure_previews
+from core.artifact_store import configure_artifact_store
+from core.workspace import configure_workspaces, job_workspace, current_workspace, scratch_path, scratch_dir
+from core.checkpoint import JobManifest, inputs_key
+from core.batch_pipeline import BatchPipeline
+from core.engine_registry import EngineRegistry, ConfigReader
+from generators.streaming_voiceover import StreamingVoiceover
+
+# Engines are built on first use (see EngineRegistry): attribute -> ("module:Class", factory(cls, config))
+ENGINES = {
+    "reddit": ("sources.reddit_scraper:RedditScraper", lambda cls, c: cls(
+        client_id=c.REDDIT_CLIENT_ID, client_secret=c.REDDIT_CLIENT_SECRET, user_agent=c.REDDIT_USER_AGENT,
+        json_base_url=c.REDDIT_BASE_URL)),
+    "script_engine": ("generators.script_writer:ScriptWriter", lambda cls, c: cls(
+        api_key=c.OPENAI_API_KEY, gemini_api_key=c.GEMINI_API_KEY, config_styles=c.STYLES,
+        tone_threshold=c.TONE_CLASSIFIER_THRESHOLD)),
+    "branding_engine": ("generators.branding_engine:BrandingEngine", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "translation_engine": ("generators.translation_engine:TranslationEngine",
+                           lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "hook_engine": ("generators.hook_optimizer:HookOptimizer", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "sentiment_engine": ("publishers.sentiment_tracker:SentimentTracker", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "news_engine": ("generators.news_integrator:NewsIntegrator", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "community_engine": ("publishers.community_manager:CommunityManager",
+                         lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+
+    # Strategic Intelligence & Visual Hooks
+    "pivot_engine": ("publishers.pivot_analyzer:PivotAnalyzer", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "intro_engine": ("generators.intro_generator:IntroHookGenerator", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "series_engine": ("generators.series_planner:SeriesPlanner", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "sync_engine": ("generators.lipsync_engine:LipSyncEngine", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "comment_bot": ("publishers.comment_responder:CommentResponder", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+
+    # Monetization, Distribution, & Personalization
+    "sponsor_engine": ("generators.sponsor_manager:SponsorManager", lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "repurpose_engine": ("generators.repurposing_engine:RepurposingEngine", lambda cls, c: cls(
+        api_key=c.OPENAI_API_KEY, gemini_api_key=c.GEMINI_API_KEY)),
+    "voice_cloning_engine": ("generators.voice_cloning:VoiceCloningEngine",
+                             lambda cls, c: cls(api_key=c.OPENAI_API_KEY)),
+    "publishing_pipeline": ("publishers.publishing_pipeline:PublishingPipeline", lambda cls, c: cls(config=c)),
+
+    "voice_engine": ("generators.voice_generator:VoiceGenerator", lambda cls, c: cls(
+        api_key=c.OPENAI_API_KEY, config_voices=c.VOICES)),
+    "music_engine": ("generators.music_selector:MusicSelector", lambda cls, c: cls(
+        assets_dir=c.ASSETS_DIR, api_key=c.OPENAI_API_KEY, gemini_api_key=c.GEMINI_API_KEY)),
+    "media_engine": ("generators.media_fetcher:MediaFetcher", lambda cls, c: cls(
+        pexels_api_key=c.PEXELS_API_KEY, openai_api_key=c.OPENAI_API_KEY, config_styles=c.STYLES,
+        pexels_base_url=c.PEXELS_BASE_URL)),
+    "editor": ("editor.video_maker:VideoEditor", lambda cls, c: cls(output_dir=c.OUTPUT_DIR, config_styles=c.STYLES)),
+    "calendar": ("generators.content_calendar:ContentCalendar", lambda cls, c: cls(api_key=c.OPENAI_API_KEY, config=c)),
+    "thumbnailer": ("generators.thumbnail_generator:ThumbnailGenerator", lambda cls, c: cls(c)),
+    "publisher": ("publishers.publishing_hub:PublishingHub", lambda cls, c: cls(
+        output_dir=c.OUTPUT_DIR, api_key=c.OPENAI_API_KEY)),
+    "brief_engine": ("generators.production_brief:ProductionBriefEngine", lambda cls, c: cls(
+        api_key=c.OPENAI_API_KEY, gemini_api_key=c.GEMINI_API_KEY))
+}
 
 class FacelessVideoBot:
     def __init__(self):
         self.config = settings.Config()
-        
-        # Initialize modules
-        self.reddit = RedditScraper(client_id=self.config.REDDIT_CLIENT_ID, 
-                                   client_secret=self.config.REDDIT_CLIENT_SECRET,
-                                   user_agent=self.config.REDDIT_USER_AGENT)
-        
-        self.script_engine = ScriptWriter(
-            api_key=self.config.OPENAI_API_KEY, 
-            gemini_api_key=self.config.GEMINI_API_KEY,
-            config_styles=self.config.STYLES
+
+        # Worker processes spawned by a profiled job profile themselves
+        profile_worker_from_env(interval=self.config.PROFILE_INTERVAL_MS / 1000, top_n=self.config.PROFILE_TOP_N)
+        self._configure_runtime()
+
+        # Modules are created on first use; see ENGINES
+        self.engines = EngineRegistry(self.config)
+        for name, (target, factory) in ENGINES.items():
+            self.engines.register(name, target, factory)
+
+        self.last_stage_timings = {}
+        self.last_trace_id = None
+        self.last_batch_summary = None
+
+    def __getattr__(self, name):
+        # Only reached for attributes not set on the instance: engines resolve through the registry
+        engines = self.__dict__.get("engines")
+        if engines is not None and name in engines:
+            return engines.get(name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def _configure_runtime(self):
+        """Process-wide services (tracing, LLM gateway, render admission and slots) from the current config."""
+        config = ConfigReader(self.config)
+        configure_tracing(
+            path=config.TRACE_FILE or os.path.join(config.OUTPUT_DIR, "traces.jsonl"),
+            enabled=config.TRACING_ENABLED
         )
-        self.branding_engine = BrandingEngine(api_key=self.config.OPENAI_API_KEY)
-        self.translation_engine = TranslationEngine(api_key=self.config.OPENAI_API_KEY)
-        self.hook_engine = HookOptimizer(api_key=self.config.OPENAI_API_KEY)
-        self.sentiment_engine = SentimentTracker(api_key=self.config.OPENAI_API_KEY)
-        self.news_engine = NewsIntegrator(api_key=self.config.OPENAI_API_KEY)
-        self.community_engine = CommunityManager(api_key=self.config.OPENAI_API_KEY)
-        
-        # Strategic Intelligence & Visual Hooks
-        self.pivot_engine = PivotAnalyzer(api_key=self.config.OPENAI_API_KEY)
-        self.intro_engine = IntroHookGenerator(api_key=self.config.OPENAI_API_KEY)
-        self.series_engine = SeriesPlanner(api_key=self.config.OPENAI_API_KEY)
-        self.sync_engine = LipSyncEngine(api_key=self.config.OPENAI_API_KEY)
-        self.comment_bot = CommentResponder(api_key=self.config.OPENAI_API_KEY)
-        
-        # Monetization, Distribution, & Personalization
-        self.sponsor_engine = SponsorManager(api_key=self.config.OPENAI_API_KEY)
-        self.repurpose_engine = RepurposingEngine(
-            api_key=self.config.OPENAI_API_KEY,
-            gemini_api_key=self.config.GEMINI_API_KEY
+
+        # Shared pooled LLM/HTTP gateway (one warm connection pool per process)
+        llm_cache = None
+        if config.LLM_CACHE_ENABLED:
+            path = os.path.join(config.ASSETS_DIR, "cache", "llm_cache.sqlite")
+            llm_cache = get_gateway().cache
+            if llm_cache is None or llm_cache.path != path:
+                llm_cache = LLMCache(path=path)
+            # Same database: keep its connection and stats, only the limits change
+            llm_cache.ttl_seconds = config.LLM_CACHE_TTL_HOURS * 3600
+            llm_cache.max_bytes = config.LLM_CACHE_MAX_MB * 1024 * 1024
+            llm_cache.bypass = config.LLM_CACHE_BYPASS
+        self.llm = configure_gateway(
+            openai_api_key=config.OPENAI_API_KEY,
+            gemini_api_key=config.GEMINI_API_KEY,
+            timeout=config.LLM_TIMEOUT_SECONDS,
+            cache=llm_cache,
+            limits=config.RATE_LIMITS,
+            max_retries=config.LLM_MAX_RETRIES,
+            openai_base_url=config.OPENAI_BASE_URL,
+            gemini_base_url=config.GEMINI_BASE_URL
         )
-        self.voice_cloning_engine = VoiceCloningEngine(api_key=self.config.OPENAI_API_KEY)
-        self.publishing_pipeline = PublishingPipeline(config=self.config)
-        
-        self.voice_engine = VoiceGenerator(api_key=self.config.OPENAI_API_KEY, config_voices=self.config.VOICES)
-        self.music_engine = MusicSelector(
-            assets_dir=self.config.ASSETS_DIR,
-            api_key=self.config.OPENAI_API_KEY,
-            gemini_api_key=self.config.GEMINI_API_KEY
+
+        configure_render_memory(
+            budget_mb=config.RENDER_MEMORY_BUDGET_MB,
+            timeout=config.RENDER_ADMISSION_TIMEOUT,
+            allow_downgrade=config.RENDER_LEAN_FALLBACK,
+            model_path=os.path.join(config.OUTPUT_DIR, "render_memory.json")
+        )
+        configure_render_slots(
+            max_slots=config.RENDER_MAX_CONCURRENT,
+            min_threads=config.RENDER_MIN_THREADS,
+            pin=config.RENDER_CPU_AFFINITY
+        )
+        configure_catalog(
+            path=config.CATALOG_DB or os.path.join(config.OUTPUT_DIR, "catalog.db"),
+            output_dir=config.OUTPUT_DIR
+        )
+        configure_previews(
+            output_dir=config.OUTPUT_DIR,
+            enabled=config.PREVIEWS_ENABLED,
+            ladder=config.PREVIEW_LADDER,
+            segment_seconds=config.PREVIEW_SEGMENT_SECONDS,
+            sprite_interval=config.PREVIEW_SPRITE_INTERVAL
         )
-        self.media_engine = MediaFetcher(
-            pexels_api_key=self.config.PEXELS_API_KEY, 
-            openai_api_key=self.config.OPENAI_API_KEY,
-            config_styles=self.config.STYLES
+        store = configure_artifact_store(
+            backend=config.ARTIFACT_STORE,
+            cache_dir=config.S3_CACHE_DIR or os.path.join(config.ASSETS_DIR, "cache", "store"),
+            **({
+                "bucket": config.S3_BUCKET,
+                "prefix": config.S3_PREFIX,
+                "endpoint_url": config.S3_ENDPOINT_URL,
+                "region": config.S3_REGION,
+                "access_key": config.S3_ACCESS_KEY_ID,
+                "secret_key": config.S3_SECRET_ACCESS_KEY,
+                "part_size_mb": config.S3_MULTIPART_MB,
+                "max_concurrency": config.S3_MAX_CONCURRENCY,
+                "url_expiry": config.S3_URL_EXPIRY
+            } if config.ARTIFACT_STORE == "s3" else {})
         )
-        self.editor = VideoEditor(output_dir=self.config.OUTPUT_DIR, config_styles=self.config.STYLES)
-        self.calendar = ContentCalendar(api_key=self.config.OPENAI_API_KEY, config=self.config)
-        self.thumbnailer = ThumbnailGenerator(self.config)
-        self.publisher = PublishingHub(output_dir=self.config.OUTPUT_DIR, api_key=self.config.OPENAI_API_KEY)
+        configure_workspaces(
+            root=config.WORKSPACE_DIR or os.path.join(config.ASSETS_DIR, "workspaces"),
+            cache_dir=os.path.join(config.ASSETS_DIR, "cache", "artifacts") if config.ARTIFACT_CACHE_ENABLED else None,
+            store=store
+        )
+        self._runtime_keys = config.keys
+
+    def apply_settings(self, new_settings):
+        """Saves new settings and rebuilds only what read a changed key. Returns (changed keys, rebuilt engines)."""
+        before = {k: getattr(self.config, k, None) for k in new_settings}
+        self.config.update(new_settings)
+        changed = {k for k in new_settings if k in self.config.defaults and getattr(self.config, k) != before[k]}
+        if changed & self._runtime_keys:
+            self._configure_runtime()
+        return sorted(changed), self.engines.invalidate(changed)
+
+    def reload_settings(self):
+        """Picks up settings another process saved (the API, for a worker). Returns the changed keys."""
+        fresh = settings.Config(self.config.config_file)
+        changed = {k for k in self.config.defaults if getattr(fresh, k) != getattr(self.config, k, None)}
+        for k in changed:
+            setattr(self.config, k, getattr(fresh, k))
+        if changed & self._runtime_keys:
+            self._configure_runtime()
+        self.engines.invalidate(changed)
+        return sorted(changed)
 
     def generate_series_plan(self, topic):
         """Generates a 3-part documentary arc."""
@@ -141,16 +245,20 @@ class FacelessVideoBot:
     def produce_dubbed_variants(self, title, script_content, languages=["Spanish", "French"]):
         """Generates international versions of a video automatically."""
         print(f"--- GLOBAL DUBBING INITIATED: {title} ---")
+        produced = []
         for lang in languages:
             print(f"Translating and voicing for {lang}...")
             translated_script = self.translation_engine.translate_script(script_content, lang)
-            self.produce_video(
+            path = self.produce_video(
                 title=f"{title} ({lang})",
                 script_content=translated_script,
                 output_prefix=f"intl_{lang.lower()}_{title[:10].replace(' ', '_')}",
                 voice="auto", # AI will pick best multi-lang voice if configured
                 publish=True
             )
+            if path:
+                produced.append(path)
+        return produced
 
     def run_angle_test(self, topic):
         """Dupes and tests every possible angle/hook for a specific topic."""
@@ -158,7 +266,11 @@ class FacelessVideoBot:
         variants = self.hook_engine.generate_variants(topic, "")
         for angle_name, hook_text in variants.items():
             print(f"Testing Angle: {angle_name}")
-            full_script = hook_text + "\n\n" + self.script_engine.generate_script(topic)
+            script = self.script_engine.generate_script(topic)
+            if self.script_engine.is_failed(script):
+                print(f"[PIPELINE] Skipping angle '{angle_name}': script generation failed.")
+                continue
+            full_script = hook_text + "\n\n" + script
             self.produce_video(
                 title=f"{topic} [{angle_name}]",
                 script_content=full_script,
@@ -174,6 +286,17 @@ class FacelessVideoBot:
             return
 
         print(f"--- INITIALIZING BULK RENDER FOR {len(plan['days'])} PRODUCTIONS ---")
+        if self.config.BATCH_PIPELINED:
+            self.run_batch("bulk", [{
+                "title": day_plan['topic'],
+                "style": day_plan['style'],
+                "output_prefix": f"bulk_{day_plan['day'].lower()}",
+                "voice": "auto",
+                "enhance_script": True,
+                "publish": True
+            } for day_plan in plan['days']])
+            return
+
         for i, day_plan in enumerate(plan['days']):
             print(f"\n[Bulk {i+1}/{len(plan['days'])}] Targeting: {day_plan['topic']}")
             
@@ -191,90 +314,402 @@ class FacelessVideoBot:
                 publish=True
             )
 
-    def produce_video(self, title, script_content, content_source_name="generic", output_prefix="video", 
-                      style="cinematic_documentary", voice="auto", sign_off=True,
-                      generate_thumb=True, enhance_script=False, publish=False, vertical=False):
-        """Standard pipeline with AI Tone Analysis, Music Selection, Custom Branding & Social Bot."""
-        print(f"Producing branded video: {title} (Vertical: {vertical})")
-        
+    def run_batch(self, name, items):
+        """Produces a batch of videos as a pipeline: while video N renders, the scripts, voiceovers
+        and media of the next videos are already being prepared.
+
+        Each item is a dict with title, style, output_prefix and optionally script, structure,
+        voice, generate_thumb, enhance_script, publish and vertical. Bounded queues between
+        the script, prepare and render stages keep preparation at most BATCH_QUEUE_SIZE
+        videos ahead of rendering. Returns the final video paths (None where a video failed).
+        """
+        def script(item):
+            if not item.get("script"):
+                item["script"] = self.script_engine.generate_script(
+                    topic=item["title"], style=item["style"], structure=item.get("structure", "cinematic")
+                )
+            if self.script_engine.is_failed(item["script"]):
+                print(f"[BATCH] Skipping '{item['title']}': script generation failed.")
+                return None
+            return item
+
+        def prepare(item):
+            with trace("produce_video", title=item["title"], style=item["style"],
+                       output_prefix=item["output_prefix"], batch=name) as s:
+                item["trace_id"] = s.trace_id
+                item["job"] = self._prepare_production(
+                    item["title"], item["script"], item["output_prefix"], item["style"], item.get("voice", "auto"),
+                    True, item.get("generate_thumb", True), item.get("enhance_script", False),
+                    item.get("publish", False), item.get("vertical", False), None, None
+                )
+            return item if item["job"] else None
+
+        def render(item):
+            if "final_video" in item["job"]:
+                return item["job"]["final_video"]
+            # Same trace as the video's preparation, though it runs on another thread
+            with trace("produce_video.render", trace_id=item["trace_id"], title=item["title"]):
+                return self._finish_production(item["job"])
+
+        pipeline = BatchPipeline(name=name, queue_size=self.config.BATCH_QUEUE_SIZE)
+        pipeline.add("script", script, workers=self.config.BATCH_SCRIPT_CONCURRENCY)
+        pipeline.add("prepare", prepare, workers=self.config.BATCH_PREPARE_CONCURRENCY)
+        pipeline.add("render", render, workers=self.config.BATCH_RENDER_CONCURRENCY)
+        # One workspace for the batch (intermediates are named per item); kept if any video failed
+        with job_workspace(f"batch_{name}") as workspace:
+            videos = pipeline.run(items)
+            workspace.keep = workspace.keep or not all(videos)
+
+        completed = sum(1 for v in videos if v)
+        print(f"[BATCH] {name}: {completed}/{len(items)} videos\n{pipeline.summary(completed)}")
+        self.last_batch_summary = {
+            "name": name,
+            "videos": completed,
+            "items": len(items),
+            "wall_seconds": round(pipeline.wall, 2),
+            "videos_per_hour": round(completed / pipeline.wall * 3600, 1) if pipeline.wall else None,
+            "stages": {stage: {**stats, "utilization": round(pipeline.utilization(stage), 3)}
+                       for stage, stats in pipeline.stats.items()}
+        }
+        return videos
+
+    def stream_script(self, topic, style="cinematic_documentary", structure="cinematic",
+                      output_prefix="video", voice="auto"):
+        """Streams a script while voicing and keyword-indexing each paragraph as it lands.
+
+        Returns (script, prepared); prepared is None when streaming is off or didn't apply.
+        """
+        if not self.config.STREAMING_TTS:
+            return self.script_engine.generate_script(topic=topic, style=style, structure=structure), None
+
+        session = StreamingVoiceover(
+            voice_engine=self.voice_engine,
+            media_engine=self.media_engine,
+            script_engine=self.script_engine,
+            assets_dir=scratch_dir(),
+            output_prefix=output_prefix,
+            voice=voice,
+            style=style
+        )
+        with span("script.stream", style=style) as s:
+            script = self.script_engine.generate_script(
+                topic=topic, style=style, structure=structure, on_paragraph=session.feed
+            )
+            prepared = session.finish()
+            s.set(paragraphs=len(prepared["segments"]), words=len(script.split()))
+        # Placeholder/error scripts never streamed, so there is nothing to reuse
+        if prepared["script"] != script:
+            return script, None
+        return script, prepared
+
+    def _profile(self, name, profile=None):
+        """Profiles the job when asked (profile=True / request_profiling()) or for PROFILE_SAMPLE_RATE of jobs."""
+        return profile_job(
+            os.path.join(self.config.OUTPUT_DIR, name),
+            enabled=profile,
+            sample_rate=self.config.PROFILE_SAMPLE_RATE,
+            interval=self.config.PROFILE_INTERVAL_MS / 1000,
+            top_n=self.config.PROFILE_TOP_N,
+            include_workers=self.config.PROFILE_WORKERS
+        )
+
+    def produce_from_topic(self, title, style="cinematic_documentary", structure="cinematic", voice="auto",
+                           output_prefix="video", profile=None, **produce_kwargs):
+        """Writes the script with streaming TTS, then renders it."""
+        with self._profile(output_prefix, profile), trace("produce_from_topic", title=title, style=style), \
+                job_workspace(output_prefix):
+            script, prepared = self.stream_script(
+                topic=title, style=style, structure=structure, output_prefix=output_prefix, voice=voice
+            )
+            return self.produce_video(
+                title=title, script_content=script, output_prefix=output_prefix, style=style,
+                voice=voice, prepared=prepared, **produce_kwargs
+            )
+
+    def _manifest(self, output_prefix):
+        """Checkpoint manifest for one job (OUTPUT_DIR/manifests/<prefix>.json), or None when disabled."""
+        if not self.config.CHECKPOINTS_ENABLED:
+            return None
+        return JobManifest(os.path.join(self.config.OUTPUT_DIR, "manifests", f"{output_prefix}.json"))
+
+    @staticmethod
+    def _checkpointed(manifest, stage, key, fn):
+        return manifest.step(stage, key, fn) if manifest else fn()
+
+    def _build_preproduction_graph(self, title, script_content, output_prefix, style, voice,
+                                   sign_off, enhance_script, brief_mode=False, prepared=None,
+                                   manifest=None, job_inputs=None):
+        """Expresses the pre-render steps of produce_video as a StageGraph.
+
+        `prepared` carries artifacts from stream_script (voice, paragraph audio, keywords, stock)
+        that are reused when they still match the final script. With a manifest, stages whose
+        inputs and artifacts are unchanged since an earlier (e.g. crashed) run are skipped.
+        """
+        if not prepared or prepared.get("script") != script_content:
+            prepared = {}
+        graph = StageGraph(name=f"pre_{output_prefix}", max_workers=self.config.PIPELINE_MAX_WORKERS,
+                           manifest=manifest, inputs=job_inputs)
+
+        # Optional single-call production brief; missing fields fall back to dedicated calls
+        def brief(_):
+            if not brief_mode:
+                return {}
+            print("[BRIEF] Requesting structured production brief...")
+            return self.brief_engine.generate(
+                title, script_content, enhance=enhance_script, extras=self.config.PRODUCTION_BRIEF_EXTRAS
+            )
+
         # 0. Custom Branding
-        slogan = self.branding_engine.generate_slogan(title)
-        branding_intro = f"[Action: Cinematic Title Overlay: {title}]\n[{slogan}]\n\n"
-        script_content = branding_intro + script_content
+        def branding(r):
+            slogan = r["brief"].get("slogan") or self.branding_engine.generate_slogan(title)
+            return f"[Action: Cinematic Title Overlay: {title}]\n[{slogan}]\n\n"
 
         # 1. AI Tone & Voice Selection
-        if voice == "auto":
+        def pick_voice(r):
+            if voice != "auto":
+                return voice
+            if prepared.get("voice"):
+                return prepared["voice"]
+            if r["brief"].get("voice"):
+                return r["brief"]["voice"]
             print("Analyzing script tone for automatic voice selection...")
-            voice = self.script_engine.analyze_tone(script_content)
-            print(f"AI Recommended Voice: {voice}")
+            chosen = self.script_engine.analyze_tone(r["branding"] + script_content)
+            print(f"AI Recommended Voice: {chosen}")
+            return chosen
 
         # 2. Dynamic Music Selection
-        bg_music = self.music_engine.select_music(voice)
-        print(f"AI Recommended Music: {bg_music}")
+        def music(r):
+            bg_music = self.music_engine.select_music(r["voice"])
+            print(f"AI Recommended Music: {bg_music}")
+            return bg_music
+
+        # 3. Optional AI Enhancement + Brand Signature
+        def final_script(r):
+            text = r["branding"] + script_content
+            if enhance_script and r["brief"].get("enhanced_script"):
+                text = r["branding"] + r["brief"]["enhanced_script"]
+            elif enhance_script:
+                print("Enhancing script with AI SFX cues...")
+                text = self.script_engine.enhance_script(text)
+            if sign_off:
+                signature = "\n\n[Action: Brand Logo Appears]\nThis is Matters of Value."
+                if signature not in text:
+                    text += signature
+            return text
+
+        # 4. Generate Audio
+        def audio(r):
+            audio_file = scratch_path(f"voiceover_{output_prefix}.mp3")
+            # Streamed paragraph audio is only valid while the spoken text is unchanged
+            if prepared.get("segments") and prepared.get("complete") and not enhance_script:
+                segments = list(prepared["segments"])
+                spoken_tail = r["script"][len(r["branding"] + script_content):]
+                if self.voice_engine._clean_text(spoken_tail):
+                    tail_file = scratch_path(f"voiceover_{output_prefix}_tail.mp3")
+                    segments.append(self.voice_engine.generate_audio(text=spoken_tail, output_file=tail_file, voice=r["voice"]))
+                if all(segments):
+                    print(f"[STREAM] Reusing {len(prepared['segments'])} pre-voiced paragraphs.")
+                    return self.voice_engine.concat_audio(segments, audio_file)
+            return self.voice_engine.generate_audio(text=r["script"], output_file=audio_file, voice=r["voice"])
+
+        # 5. Fetch Visuals
+        def keywords(r):
+            if prepared.get("keywords") and not enhance_script:
+                return prepared["keywords"]
+            found = self.media_engine.extract_keywords_from_script(r["script"])
+            return " ".join(found) if found else title
+
+        def stock(r):
+            if prepared.get("video_sources") and r["keywords"] == prepared.get("keywords"):
+                return prepared["video_sources"]
+            return self.media_engine.search_videos(query=r["keywords"], per_page=10, style=style)
 
-        # 3. Optional AI Enhancement
-        if enhance_script:
-            print("Enhancing script with AI SFX cues...")
-            script_content = self.script_engine.enhance_script(script_content)
-
-        # Add Brand Signature if requested
-        if sign_off:
-            signature = "\n\n[Action: Brand Logo Appears]\nThis is Matters of Value."
-            if signature not in script_content:
-                script_content += signature
-
-        # 1. Generate Audio
-        audio_file = os.path.join(self.config.ASSETS_DIR, f"voiceover_{output_prefix}.mp3")
-        audio_path = self.voice_engine.generate_audio(text=script_content, output_file=audio_file, voice=voice)
-        
-        # 2. Fetch Visuals
-        keywords = self.media_engine.extract_keywords_from_script(script_content)
-        query = " ".join(keywords) if keywords else title
-        
-        # Determine orientation for stock search
-        orientation = "portrait" if vertical else "landscape"
-        video_sources = self.media_engine.search_videos(query=query, per_page=10, style=style)
-        
         # If no videos found, synthesize an AI image
-        if not video_sources:
-            img_path = os.path.join(self.config.ASSETS_DIR, f"ai_synthesis_{output_prefix}.png")
-            fallback_img = self.media_engine.generate_ai_image(query, img_path)
-            video_sources = [fallback_img] if fallback_img else []
+        def ai_image(r):
+            if r["stock"]:
+                return r["stock"]
+            img_path = scratch_path(f"ai_synthesis_{output_prefix}.png")
+            fallback_img = self.media_engine.generate_ai_image(r["keywords"], img_path)
+            return [fallback_img] if fallback_img else []
+
+        graph.add("brief", brief)
+        graph.add("branding", branding, deps=["brief"])
+        graph.add("voice", pick_voice, deps=["branding"])
+        graph.add("music", music, deps=["voice"])
+        graph.add("script", final_script, deps=["brief", "branding"])
+        graph.add("audio", audio, deps=["script", "voice"])
+        graph.add("keywords", keywords, deps=["script"])
+        graph.add("stock", stock, deps=["keywords"])
+        graph.add("ai_image", ai_image, deps=["stock"])
+        return graph
+
+    def produce_video(self, title, script_content, content_source_name="generic", output_prefix="video", 
+                      style="cinematic_documentary", voice="auto", sign_off=True,
+                      generate_thumb=True, enhance_script=False, publish=False, vertical=False, brief_mode=None,
+                      prepared=None, profile=None, render_dir=None):
+        """Standard pipeline with AI Tone Analysis, Music Selection, Custom Branding & Social Bot.
+
+        profile=True saves a sampled CPU profile next to the output ({output_prefix}_profile.*).
+        Intermediates go to the job's workspace; render_dir renders there too (long-form chapters).
+        """
+        with self._profile(output_prefix, profile), \
+                trace("produce_video", title=title, style=style, vertical=vertical, output_prefix=output_prefix) as s, \
+                job_workspace(output_prefix) as workspace:
+            self.last_trace_id = s.trace_id
+            final_video = self._produce_video(
+                title, script_content, output_prefix, style, voice, sign_off, generate_thumb,
+                enhance_script, publish, vertical, brief_mode, prepared, render_dir
+            )
+            s.set(ok=bool(final_video))
+            # The retry resumes from the checkpointed voiceover and media left in the workspace
+            workspace.keep = workspace.keep or not final_video
+            return final_video
+
+    def _produce_video(self, title, script_content, output_prefix, style, voice, sign_off, generate_thumb,
+                       enhance_script, publish, vertical, brief_mode, prepared, render_dir=None):
+        job = self._prepare_production(title, script_content, output_prefix, style, voice, sign_off,
+                                       generate_thumb, enhance_script, publish, vertical, brief_mode, prepared,
+                                       render_dir=render_dir)
+        if job is None or "final_video" in job:
+            return job and job["final_video"]
+        return self._finish_production(job)
+
+    def _prepare_production(self, title, script_content, output_prefix, style, voice, sign_off, generate_thumb,
+                            enhance_script, publish, vertical, brief_mode, prepared, render_dir=None):
+        """Everything before the render (LLM, TTS, media). Returns the job state for _finish_production,
+        {"final_video": path} when a checkpoint already covers the whole job, or None on a failed script."""
+        print(f"Producing branded video: {title} (Vertical: {vertical})")
+        # Never render/publish the placeholder body left behind by a failed (e.g. throttled) script call
+        if self.script_engine.is_failed(script_content):
+            print(f"[PIPELINE] Skipping '{title}': script generation failed.")
+            return None
+        if brief_mode is None:
+            brief_mode = self.config.PRODUCTION_BRIEF_MODE
+
+        # Identical whole-job inputs with the final video still on disk: nothing to do
+        manifest = self._manifest(output_prefix)
+        job_inputs = [title, script_content, style, voice, sign_off, enhance_script, vertical, brief_mode]
+        job_key = inputs_key(job_inputs, generate_thumb, publish)
+        if manifest:
+            done, final_video = manifest.lookup("final", job_key)
+            if done:
+                print(f"[CHECKPOINT] '{title}' is unchanged since the last run; reusing {final_video}")
+                return {"final_video": final_video}
+
+        # Pre-render stages run as a dependency graph: independent LLM, TTS and
+        # stock-search calls overlap instead of waiting on each other.
+        graph = self._build_preproduction_graph(
+            title, script_content, output_prefix, style, voice, sign_off, enhance_script, brief_mode, prepared,
+            manifest=manifest, job_inputs=job_inputs
+        )
+        stages = graph.run()
+        self.last_stage_timings = graph.timings
+        print(f"[PIPELINE] Pre-render stage timings:\n{graph.summary()}")
 
-        # 4. Create Video
-        final_video = self.editor.create_video(
+        if stages["brief"]:
+            self._save_brief(output_prefix, stages["brief"])
+        return {
+            "title": title, "output_prefix": output_prefix, "style": style, "vertical": vertical,
+            "generate_thumb": generate_thumb, "publish": publish, "manifest": manifest, "job_key": job_key,
+            "script": stages["script"], "audio": stages["audio"], "music": stages["music"],
+            "sources": stages["ai_image"], "brief": stages["brief"], "render_dir": render_dir
+        }
+
+    def _finish_production(self, job):
+        """Render, thumbnail and publish for a job prepared by _prepare_production."""
+        title, output_prefix, style, vertical = job["title"], job["output_prefix"], job["style"], job["vertical"]
+        manifest, script_content, brief = job["manifest"], job["script"], job["brief"]
+        audio_path, bg_music, video_sources = job["audio"], job["music"], job["sources"]
+
+        # 4. Create Video (voiceover + music mix, clips and captions; skipped when all are unchanged)
+        render_key = inputs_key(audio_path, video_sources, script_content, bg_music, style, vertical)
+        final_video = self._checkpointed(manifest, "render", render_key, lambda: self.editor.create_video(
             audio_path=audio_path,
             video_paths=video_sources,
             script_text=script_content,
-            output_filename=f"{output_prefix}_final.mp4",
+            output_filename=os.path.join(job.get("render_dir") or "", f"{output_prefix}_final.mp4"),
             background_music_path=bg_music,
             style=style,
             vertical=vertical
-        )
+        ))
         
         if final_video:
             print(f"Video created successfully: {final_video}")
             # 4. Optional: Generate Branded Thumbnail
-            if generate_thumb:
-                self.thumbnailer.generate_thumbnail(title, style)
+            thumbnail = None
+            if job["generate_thumb"]:
+                with span("thumbnail", style=style):
+                    thumbnail = self.thumbnailer.generate_thumbnail(title, style)
 
             # 5. Optional: Automated Publishing
-            if publish:
-                self.publisher.publish_video(video_path=final_video, title=title, script=script_content)
+            published = None
+            if job["publish"]:
+                published = self.publisher.publish_video(
+                    video_path=final_video, title=title, script=script_content,
+                    social_package=brief.get("engagement_package")
+                )
+            self._catalog(final_video, title, style, thumbnail, published)
+            if manifest:
+                manifest.record("final", job["job_key"], final_video)
         else:
             print("Video creation failed.")
         
         return final_video
 
+    @staticmethod
+    def _catalog(video_path, title, style, thumbnail=None, published=None):
+        """Adds what only the pipeline knows (title, thumbnail, publish status) to the render's catalog entry."""
+        catalog = get_catalog()
+        if not catalog:
+            return
+        platforms = [p for p, r in (published or {}).items() if r.get("status") == "Published"]
+        catalog.record(video_path, title=title, style=style, thumbnail=thumbnail,
+                       publish_status=("published" if platforms else "failed") if published is not None else None,
+                       platforms=platforms if published is not None else None)
+
+    def _save_brief(self, output_prefix, brief):
+        """Keeps the production brief (music brief, sponsor spots, social copy) next to the render."""
+        import json
+        brief_path = os.path.join(self.config.OUTPUT_DIR, f"{output_prefix}_brief.json")
+        try:
+            os.makedirs(self.config.OUTPUT_DIR, exist_ok=True)
+            with open(brief_path, 'w') as f:
+                json.dump(brief, f, indent=4)
+        except Exception as e:
+            print(f"[BRIEF] Could not save brief: {e}")
+
     def produce_long_form(self, title, full_script, style="cinematic_documentary", voice="onyx", 
-                          generate_thumb=True, enhance_script=False, publish=False):
+                          generate_thumb=True, enhance_script=False, publish=False, profile=None):
         """Splits a long script into chapters, renders them, and merges into a feature documentary."""
+        with self._profile(f"FEATURE_{title.replace(' ', '_')}", profile), trace("produce_long_form", title=title, style=style, words=len((full_script or "").split())) as s, \
+                job_workspace(f"FEATURE_{title.replace(' ', '_')}") as workspace:
+            self.last_trace_id = s.trace_id
+            final_path = self._produce_long_form(title, full_script, style, voice, generate_thumb,
+                                                 enhance_script, publish)
+            s.set(ok=bool(final_path))
+            workspace.keep = workspace.keep or not final_path
+            return final_path
+
+    def _produce_long_form(self, title, full_script, style, voice, generate_thumb, enhance_script, publish):
         print(f"--- INITIALIZING LONG-FORM PRODUCTION: {title} ---")
+        if self.script_engine.is_failed(full_script):
+            print(f"[PIPELINE] Skipping '{title}': script generation failed.")
+            return None
+
+        # Chapters checkpoint themselves; this manifest covers the enhanced script and the merge
+        manifest = self._manifest(f"FEATURE_{title.replace(' ', '_')}")
+        job_key = inputs_key(title, full_script, style, voice, generate_thumb, enhance_script, publish)
+        if manifest:
+            done, final_path = manifest.lookup("final", job_key)
+            if done:
+                print(f"[CHECKPOINT] '{title}' is unchanged since the last run; reusing {final_path}")
+                return final_path
         
         # 0. Optional AI Enhancement for the ENTIRE script first
         if enhance_script:
             print("Enhancing long-form script with AI SFX cues...")
-            full_script = self.script_engine.enhance_script(full_script)
+            full_script = self._checkpointed(manifest, "enhanced_script", inputs_key(full_script),
+                                             lambda: self.script_engine.enhance_script(full_script))
 
         # 1. Split script into chapters
         # [Existing split logic...]
@@ -294,6 +729,8 @@ class FacelessVideoBot:
         if current_chapter:
             chapters.append("\n\n".join(current_chapter))
 
+        # Chapters are intermediates: rendered into the workspace, only the merged feature lands in OUTPUT_DIR
+        chapter_dir = current_workspace().path
         chapter_files = []
         for i, chapter_text in enumerate(chapters):
             filename = f"long_{title[:10].replace(' ', '_')}_ch{i}_final.mp4"
@@ -305,23 +742,30 @@ class FacelessVideoBot:
                 voice=voice,
                 sign_off=(i == len(chapters)-1),
                 generate_thumb=False, # Don't generate thumb for individual chapters
-                publish=False # Don't publish individual chapters
+                publish=False, # Don't publish individual chapters
+                render_dir=chapter_dir
             )
             
-            chapter_path = os.path.join(self.config.OUTPUT_DIR, filename)
+            chapter_path = os.path.join(chapter_dir, filename)
             if os.path.exists(chapter_path):
                 chapter_files.append(chapter_path)
 
         # 2. Merge and Finalize
         if chapter_files:
             final_filename = f"FEATURE_{title.replace(' ', '_')}.mp4"
-            final_path = self.editor.merge_videos(chapter_files, final_filename)
+            final_path = self._checkpointed(manifest, "merge", inputs_key(chapter_files),
+                                            lambda: self.editor.merge_videos(chapter_files, final_filename))
             
             if final_path:
+                thumbnail = published = None
                 if generate_thumb:
-                    self.thumbnailer.generate_thumbnail(title, style)
+                    with span("thumbnail", style=style):
+                        thumbnail = self.thumbnailer.generate_thumbnail(title, style)
                 if publish:
-                    self.publisher.publish_video(video_path=final_path, title=title)
+                    published = self.publisher.publish_video(video_path=final_path, title=title)
+                self._catalog(final_path, title, style, thumbnail, published)
+                if manifest:
+                    manifest.record("final", job_key, final_path)
             return final_path
         return None
 
@@ -361,12 +805,23 @@ class FacelessVideoBot:
         import random
         subreddit = random.choice(niche_config["subreddits"])
         posts = self.reddit.get_top_posts(subreddit_name=subreddit, limit=count)
+        structure = niche_config.get("structure", "cinematic")
+
+        # Without a human review step the batch can be pipelined
+        if not interactive and self.config.BATCH_PIPELINED:
+            self.run_batch(f"niche_{niche}", [{
+                "title": post['title'],
+                "style": niche_config["style"],
+                "structure": structure,
+                "output_prefix": f"niche_{niche}_{i}",
+                "voice": niche_config["voice"]
+            } for i, post in enumerate(posts)])
+            return
         
         for i, post in enumerate(posts):
             print(f"\n[Video {i+1}/{count}] Topic Discovered: {post['title']}")
             
             # Step A: Generate Script
-            structure = niche_config.get("structure", "cinematic")
             script = self.script_engine.generate_script(topic=post['title'], style=niche_config["style"], structure=structure)
             
             # Step B: Interactive Review (The "Modify at any point" option)
@@ -412,8 +867,9 @@ class FacelessVideoBot:
 
         print(f"Found post: {post['title']}")
 
-        # 2. Generate Script
-        script = self.script_engine.generate_script(topic=post['title'], prompt=None, style=style)
+        # 2. Generate Script (paragraphs are voiced while the rest streams in)
+        output_prefix = f"reddit_{subreddit}"
+        script, prepared = self.stream_script(topic=post['title'], style=style, output_prefix=output_prefix)
         if not script:
             return
         
@@ -421,14 +877,15 @@ class FacelessVideoBot:
             title=post['title'],
             script_content=script,
             content_source_name="Reddit",
-            output_prefix=f"reddit_{subreddit}",
-            style=style
+            output_prefix=output_prefix,
+            style=style,
+            prepared=prepared
         )
 
     def run_nairaland_pipeline(self, category="romance", style="standard"):
         """Runs pipeline for Nairaland content."""
         from sources.nairaland_scraper import NairalandScraper
-        self.nairaland = NairalandScraper()
+        self.nairaland = NairalandScraper(base_url=self.config.NAIRALAND_BASE_URL)
         
         print(f"Starting Nairaland Bot execution for {category} (Style: {style})...")
         
@@ -458,8 +915,9 @@ class FacelessVideoBot:
         """Specialized pipeline for professional documentary-style videos."""
         print(f"Starting Documentary Pipeline for: {topic}...")
         
-        # 1. Generate Script with Documentary Style
-        script = self.script_engine.generate_script(topic=topic, style=style)
+        # 1. Generate Script with Documentary Style (streamed into paragraph-level TTS)
+        output_prefix = f"doc_{topic[:10].replace(' ', '_')}"
+        script, prepared = self.stream_script(topic=topic, style=style, output_prefix=output_prefix)
         if not script:
             return
 
@@ -468,8 +926,9 @@ class FacelessVideoBot:
             title=topic,
             script_content=script,
             content_source_name="Documentary",
-            output_prefix=f"doc_{topic[:10].replace(' ', '_')}",
-            style=style
+            output_prefix=output_prefix,
+            style=style,
+            prepared=prepared
         )
 
     def run_custom_script_pipeline(self, script_path, style="cinematic_documentary"):
@@ -518,30 +977,52 @@ class FacelessVideoBot:
             except Exception as e:
                 print(f"Failed to upload using {uploader.platform}: {e}")
 
+
+_bot = None
+_bot_lock = threading.Lock()
+
+
+def get_bot():
+    """The process-wide FacelessVideoBot shared by the API, workers and studios."""
+    global _bot
+    if _bot is None:
+        with _bot_lock:
+            if _bot is None:
+                _bot = FacelessVideoBot()
+    return _bot
+
+
 if __name__ == "__main__":
-    bot = FacelessVideoBot()
+    bot = get_bot()
     
     import sys
-    if len(sys.argv) > 1:
-        mode = sys.argv[1]
-        topic_or_path = sys.argv[2] if len(sys.argv) > 2 else "AskReddit"
-        style = sys.argv[3] if len(sys.argv) > 3 else "standard"
+    from contextlib import nullcontext
+    # --profile: sample every production in this run and save the profile next to each video
+    profiling = request_profiling() if "--profile" in sys.argv else nullcontext()
+    if "--profile" in sys.argv:
+        sys.argv.remove("--profile")
+
+    with profiling:
+        if len(sys.argv) > 1:
+            mode = sys.argv[1]
+            topic_or_path = sys.argv[2] if len(sys.argv) > 2 else "AskReddit"
+            style = sys.argv[3] if len(sys.argv) > 3 else "standard"
         
-        if mode == "reddit":
-            bot.run_reddit_pipeline(subreddit=topic_or_path, style=style)
-        elif mode == "nairaland":
-            bot.run_nairaland_pipeline(category=topic_or_path, style=style)
-        elif mode == "documentary":
-            bot.run_documentary_pipeline(topic=topic_or_path, style=style)
-        elif mode == "niche":
-            niche = topic_or_path
-            count = int(sys.argv[3]) if len(sys.argv) > 3 else 1
-            # Check for --no-review flag
-            interactive = "--no-review" not in sys.argv
-            bot.run_niche_pipeline(niche=niche, count=count, interactive=interactive)
+            if mode == "reddit":
+                bot.run_reddit_pipeline(subreddit=topic_or_path, style=style)
+            elif mode == "nairaland":
+                bot.run_nairaland_pipeline(category=topic_or_path, style=style)
+            elif mode == "documentary":
+                bot.run_documentary_pipeline(topic=topic_or_path, style=style)
+            elif mode == "niche":
+                niche = topic_or_path
+                count = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+                # Check for --no-review flag
+                interactive = "--no-review" not in sys.argv
+                bot.run_niche_pipeline(niche=niche, count=count, interactive=interactive)
+            else:
+                print("Unknown mode. Use 'reddit', 'nairaland', 'documentary', 'script', or 'niche'.")
         else:
-            print("Unknown mode. Use 'reddit', 'nairaland', 'documentary', 'script', or 'niche'.")
-    else:
-        # Default behavior for testing
-        print("No args provided. Running default Reddit bot...")
-        bot.run_reddit_pipeline()
+            # Default behavior for testing
+            print("No args provided. Running default Reddit bot...")
+            bot.run_reddit_pipeline()
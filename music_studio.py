@@ -2,12 +2,12 @@
 import os
 import sys
 from config import settings
-from main import FacelessVideoBot
-from generators.script_writer import ScriptWriter
+from main import get_bot
 
 class MusicStudio:
-    def __init__(self):
-        self.bot = FacelessVideoBot()
+    def __init__(self, bot=None):
+        # Reuses the process's bot rather than building a second one
+        self.bot = bot or get_bot()
         self.config = self.bot.config
         
     def produce_music_video(self, topic, genre="hip-hop", output_name="music_video"):
@@ -33,19 +33,24 @@ document.querySelectorAll('.nav-item').forEach(item => {
 const stats = {
     load: async () => {
         try {
-            const response = await fetch('/api/videos');
-            const videos = await response.json();
+            const response = await fetch('/api/videos?limit=1&total=true');
+            const page = await response.json();
 
             // Update Stats
-            document.getElementById('stat-total').textContent = videos.length;
-            document.getElementById('stat-reach').textContent = (videos.length * 2.5).toFixed(1) + 'k';
+            document.getElementById('stat-total').textContent = page.total;
+            document.getElementById('stat-reach').textContent = (page.total * 2.5).toFixed(1) + 'k';
 
-            // Update Cinema Feed with LATEST video
-            if (videos.length > 0) {
-                const latest = videos[0]; // Assuming first is latest
+            // Update Cinema Feed with LATEST video (the catalog sorts newest first)
+            if (page.items.length > 0) {
+                const latest = page.items[0];
                 const player = document.getElementById('live-preview');
-                player.src = `/exports/${latest.name}`;
-                document.getElementById('preview-title').textContent = `Now Playing: ${latest.name}`;
+                if (latest.preview) {
+                    previews.play(player, latest.preview);
+                    document.getElementById('preview-title').textContent = `Now Playing: ${latest.title || latest.name}`;
+                } else {
+                    // Masters are for downloads only; the preview appears once it has been packaged
+                    document.getElementById('preview-title').textContent = `Preview pending: ${latest.title || latest.name}`;
+                }
 
                 // Mock Sentiment Update
                 const directives = [
@@ -124,8 +129,8 @@ const analytics = {
         analytics.fetchCalendar();
         analytics.fetchHealth();
         try {
-            const response = await fetch('/api/videos');
-            const videos = await response.json();
+            const response = await fetch('/api/videos?limit=5');
+            const videos = (await response.json()).items;
 
             // Simple Bar Chart Logic (Rendering mock bars based on count)
             const chart = document.getElementById('velocity-chart');
@@ -140,7 +145,7 @@ const analytics = {
 
             // Production Ledger
             const ledger = document.getElementById('production-ledger');
-            ledger.innerHTML = videos.slice(0, 5).map(v => `
+            ledger.innerHTML = videos.map(v => `
                 <div style="margin-bottom:5px; border-bottom:1px solid #222; padding-bottom:5px;">
                     <span style="color:var(--accent-gold)">[HD EXPORT]</span> ${v.name} (${(v.size / 1024 / 1024).toFixed(1)}MB)
                 </div>
@@ -864,33 +869,175 @@ const library = {
     }
 };
 
+// Streaming previews (HLS ladder, poster, scrub sprite) so the dashboard never pulls full masters
+const previews = {
+    hlsLoader: null,
+
+    loadHls: () => {
+        if (window.Hls) return Promise.resolve(window.Hls);
+        if (!previews.hlsLoader) {
+            previews.hlsLoader = new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                script.src = 'https://cdn.jsdelivr.net/npm/hls.js@1/dist/hls.min.js';
+                script.onload = () => resolve(window.Hls);
+                script.onerror = reject;
+                document.head.appendChild(script);
+            });
+        }
+        return previews.hlsLoader;
+    },
+
+    play: async (player, preview) => {
+        player.poster = preview.poster;
+        if (player.hls) { player.hls.destroy(); player.hls = null; }
+        // Safari plays HLS natively; elsewhere hls.js feeds it through Media Source Extensions
+        if (player.canPlayType('application/vnd.apple.mpegurl')) {
+            player.src = preview.hls;
+            return;
+        }
+        try {
+            const Hls = await previews.loadHls();
+            if (!Hls.isSupported()) return;
+            player.hls = new Hls({ capLevelToPlayerSize: true });
+            player.hls.loadSource(preview.hls);
+            player.hls.attachMedia(player);
+        } catch (err) { console.error(err); }
+    },
+
+    // Hovering across a poster shows the sprite tile for that point in the video
+    attachScrub: (el, preview) => {
+        const sprite = preview.sprite;
+        el.addEventListener('mousemove', e => {
+            const rect = el.getBoundingClientRect();
+            const index = Math.min(sprite.count - 1, Math.floor((e.clientX - rect.left) / rect.width * sprite.count));
+            const scale = rect.width / sprite.width;
+            el.style.backgroundImage = `url(${sprite.file})`;
+            el.style.backgroundSize = `${sprite.columns * sprite.width * scale}px auto`;
+            el.style.backgroundPosition = `-${(index % sprite.columns) * sprite.width * scale}px ` +
+                `-${Math.floor(index / sprite.columns) * sprite.height * scale}px`;
+        });
+        el.addEventListener('mouseleave', () => {
+            el.style.backgroundImage = `url(${preview.poster})`;
+            el.style.backgroundSize = 'cover';
+            el.style.backgroundPosition = 'center';
+        });
+    }
+};
+
+// Live job progress: one server-sent event stream instead of refetching to spot new renders
+const liveJobs = {
+    source: null,
+
+    connect: () => {
+        if (!window.EventSource || liveJobs.source) return;
+        const source = new EventSource('/api/events');
+        liveJobs.source = source;
+        source.addEventListener('snapshot', e => {
+            const data = JSON.parse(e.data);
+            data.jobs.forEach(job => liveJobs.show(job));
+            liveJobs.showThroughput(data.throughput);
+        });
+        ['job.queued', 'job.started', 'job.progress'].forEach(kind =>
+            source.addEventListener(kind, e => liveJobs.show(JSON.parse(e.data))));
+        source.addEventListener('job.finished', e => {
+            const job = JSON.parse(e.data);
+            liveJobs.show(job);
+            if (job.status === 'succeeded') logToTerminal(`[SUCCESS] ${job.type} job "${job.title || job.id}" finished.`);
+            else logToTerminal(`[ERROR] ${job.type} job "${job.title || job.id}" ${job.status}${job.error ? `: ${job.error}` : ''}`);
+        });
+        source.addEventListener('video.ready', e => {
+            const data = JSON.parse(e.data);
+            showNotification(`New render: ${data.videos[0]}`);
+            if (state.activeTab === 'dashboard') stats.load();
+            if (state.activeTab === 'library') loadLibrary();
+            if (state.activeTab === 'analytics') analytics.load();
+        });
+        source.addEventListener('throughput', e => liveJobs.showThroughput(JSON.parse(e.data)));
+        // EventSource reconnects by itself (sending Last-Event-ID), so errors need no handling here
+    },
+
+    // One terminal line per job, updated in place
+    show: (job) => {
+        const terminal = document.getElementById('terminal-feed');
+        let line = document.getElementById(`job-${job.id}`);
+        if (!line) {
+            line = document.createElement('div');
+            line.id = `job-${job.id}`;
+            terminal.appendChild(line);
+            terminal.scrollTop = terminal.scrollHeight;
+        }
+        const detail = job.detail || {};
+        const encode = detail.percent !== undefined ? ` | encode ${detail.percent}% @ ${detail.fps} fps` : '';
+        line.innerHTML = `<span style="color: #bd00ff; font-weight: bold;">[RENDERER]</span> ` +
+            `${job.type} "${job.title || job.id}": ${job.status} ${Math.round(job.progress * 100)}% ` +
+            `<span style="opacity: 0.6;">${job.message || ''}${encode}</span>`;
+    },
+
+    showThroughput: (throughput) => {
+        const heading = document.querySelector('.terminal-container h2');
+        if (!throughput || !heading) return;
+        let badge = document.getElementById('live-throughput');
+        if (!badge) {
+            badge = document.createElement('span');
+            badge.id = 'live-throughput';
+            badge.style.cssText = 'font-size: 11px; opacity: 0.7; margin-left: 12px;';
+            heading.appendChild(badge);
+        }
+        badge.textContent = `${throughput.running} running, ${throughput.queued} queued` +
+            (throughput.encoding ? ` | ${throughput.encode_fps} fps across ${throughput.encoding} encode(s)` : '');
+    }
+};
+
+liveJobs.connect();
+
 // Library Logic
-async function loadLibrary() {
+// One catalog page at a time; "Load more" follows next_cursor
+async function loadLibrary(cursor = null) {
     const listEl = document.getElementById('video-list');
-    listEl.innerHTML = '<div class="loading">Sourcing branded content...</div>';
+    if (!cursor) listEl.innerHTML = '<div class="loading">Sourcing branded content...</div>';
 
     try {
-        const response = await fetch('/api/videos');
-        const videos = await response.json();
+        const response = await fetch(`/api/videos?limit=24${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`);
+        const page = await response.json();
 
-        listEl.innerHTML = '';
-        if (videos.length === 0) {
+        if (!cursor) listEl.innerHTML = '';
+        listEl.querySelector('.load-more')?.remove();
+        if (!cursor && page.items.length === 0) {
             listEl.innerHTML = '<div class="empty">No videos in production yet.</div>';
             return;
         }
 
-        videos.forEach(v => {
+        page.items.forEach(v => {
             const sizeMB = (v.size / (1024 * 1024)).toFixed(2);
+            const details = [
+                `${sizeMB} MB`,
+                v.duration ? `${Math.floor(v.duration / 60)}:${String(Math.round(v.duration % 60)).padStart(2, '0')}` : null,
+                v.height ? `${v.height}p ${v.orientation}` : 'HD Render',
+                v.publish_status === 'published' ? 'Published' : null
+            ].filter(Boolean).join(' | ');
             const card = document.createElement('div');
             card.className = 'video-card';
+            const ratio = v.width && v.height ? `${v.width} / ${v.height}` : '16 / 9';
+            const cover = v.preview
+                ? `<div class="v-scrub" style="width:100%; aspect-ratio:${ratio}; border-radius:6px; background:url(${v.preview.poster}) center / cover;"></div>`
+                : v.thumbnail ? `<img src="${v.thumbnail}" alt="" style="width:100%; border-radius:6px;">` : '<div class="v-icon">🎬</div>';
             card.innerHTML = `
-                    <div class="v-icon">🎬</div>
-                    <div class="v-name">${v.name}</div>
-                    <div class="v-size">${sizeMB} MB | HD Render</div>
+                    ${cover}
+                    <div class="v-name">${v.title || v.name}</div>
+                    <div class="v-size">${details}</div>
                     <a href="${v.path}" download class="btn-niche" style="display:block; font-size: 12px; margin-top:10px;">Download Branded File</a>
                 `;
+            if (v.preview) previews.attachScrub(card.querySelector('.v-scrub'), v.preview);
             listEl.appendChild(card);
         });
+
+        if (page.next_cursor) {
+            const more = document.createElement('button');
+            more.className = 'btn-niche load-more';
+            more.textContent = 'Load more';
+            more.onclick = () => loadLibrary(page.next_cursor);
+            listEl.appendChild(more);
+        }
     } catch (err) {
         listEl.innerHTML = `<div class="error">Failed to load library: ${err.message}</div>`;
     }
@@ -1,9 +1,10 @@
 
-import requests
+from core.llm_gateway import get_gateway
 
 class CommentResponder:
     def __init__(self, api_key=None):
         self.api_key = api_key
+        self.llm = get_gateway()
 
     def draft_response(self, topic, script, viewer_comment):
         """Generates a high-engagement response that maintains the 'Non-Obvious Take'."""
@@ -25,16 +26,8 @@ class CommentResponder:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content'].strip()
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key)
+            return content.strip()
         except Exception as e:
             print(f"Comment response failed: {e}")
             return "Perspective is everything. What's yours?"
@@ -1,9 +1,10 @@
 
-import requests
+from core.llm_gateway import get_gateway
 
 class CommunityManager:
     def __init__(self, api_key=None):
         self.api_key = api_key
+        self.llm = get_gateway()
 
     def draft_community_package(self, topic, script):
         """Generates a high-engagement community tab package (Polls, Teasers, Questions)."""
@@ -27,17 +28,8 @@ class CommunityManager:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key)
             # In a real scenario, use json.loads. Mocking here.
-            content = response.json()['choices'][0]['message']['content']
             return content
         except Exception as e:
             print(f"Community drafting failed: {e}")
@@ -1,9 +1,10 @@
 
-import requests
+from core.llm_gateway import get_gateway
 
 class PivotAnalyzer:
     def __init__(self, api_key=None):
         self.api_key = api_key
+        self.llm = get_gateway()
 
     def analyze_pivot_opportunity(self, current_stats, trending_news):
         """Analyzes viral performance vs. world trends to suggest a strategic niche pivot."""
@@ -28,16 +29,8 @@ class PivotAnalyzer:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content'].strip()
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key)
+            return content.strip()
         except Exception as e:
             print(f"Pivot analysis failed: {e}")
             return {"error": "Analysis offline."}
@@ -3,6 +3,7 @@ import os
 import json
 import time
 from publishers.social_bot import SocialMediaBot
+from core.tracing import span
 
 class PublishingHub:
     def __init__(self, output_dir="output", api_key=None):
@@ -10,30 +11,35 @@ class PublishingHub:
         self.log_file = os.path.join(output_dir, "publishing_log.json")
         self.social_bot = SocialMediaBot(api_key=api_key)
 
-    def publish_video(self, video_path, title, script="", platforms=["youtube", "tiktok", "twitter", "instagram", "facebook", "whatsapp"]):
+    def publish_video(self, video_path, title, script="", platforms=["youtube", "tiktok", "twitter", "instagram", "facebook", "whatsapp"],
+                      social_package=None):
         """Distributes the video and its AI-generated engagement package."""
         print(f"--- INITIALIZING GLOBAL DISTRIBUTION HUB: {title} ---")
-        
-        # 1. Generate Social Assets
-        print("Generating platform-specific descriptions and tags...")
-        social_package = self.social_bot.generate_engagement_package(title, script)
-        
-        results = {}
-        for platform in platforms:
-            print(f"Publishing to {platform.upper()}...")
-            time.sleep(0.5) 
-            
-            # Simulated Upload Logic
-            results[platform] = {
-                "status": "Published",
-                "timestamp": time.ctime(),
-                "url": f"https://www.{platform}.com/ValuesThatMatters/status/...",
-                "metadata": social_package.get(platform.capitalize(), {}) if social_package else {}
-            }
-            print(f"[{platform.upper()}] Success: {results[platform]['url']}")
+        with span("publish", platforms=len(platforms),
+                  bytes=os.path.getsize(video_path) if os.path.exists(video_path) else None):
+            # 1. Generate Social Assets (unless the production brief already supplied them)
+            if not social_package:
+                print("Generating platform-specific descriptions and tags...")
+                with span("publish.engagement_package"):
+                    social_package = self.social_bot.generate_engagement_package(title, script)
+
+            results = {}
+            for platform in platforms:
+                print(f"Publishing to {platform.upper()}...")
+                with span("publish.upload", platform=platform):
+                    time.sleep(0.5)
+
+                    # Simulated Upload Logic
+                    results[platform] = {
+                        "status": "Published",
+                        "timestamp": time.ctime(),
+                        "url": f"https://www.{platform}.com/ValuesThatMatters/status/...",
+                        "metadata": social_package.get(platform.capitalize(), {}) if social_package else {}
+                    }
+                print(f"[{platform.upper()}] Success: {results[platform]['url']}")
 
-        self._log_publish(video_path, title, results)
-        return results
+            self._log_publish(video_path, title, results)
+            return results
 
     def _log_publish(self, video_path, title, results):
         log_entry = {
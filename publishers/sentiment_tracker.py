@@ -1,10 +1,11 @@
 
-import requests
+from core.llm_gateway import get_gateway
 import json
 
 class SentimentTracker:
     def __init__(self, api_key=None):
         self.api_key = api_key
+        self.llm = get_gateway()
 
     def analyze_feedback(self, comments_list):
         """Analyzes a list of viewer comments to extract strategic sentiment and suggestions."""
@@ -20,16 +21,8 @@ class SentimentTracker:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content'].strip()
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key)
+            return content.strip()
         except Exception as e:
             print(f"Sentiment analysis failed: {e}")
             return "Unable to analyze sentiment. Continue with viral trends."
@@ -1,12 +1,15 @@
 
 import os
-import requests
+from core.llm_gateway import get_gateway
 import json
 
 class SocialMediaBot:
+    PLATFORMS = ["YouTube", "TikTok", "Instagram", "Twitter", "Facebook", "WhatsApp"]
+
     def __init__(self, api_key=None):
         self.api_key = api_key
-        self.platforms = ["YouTube", "TikTok", "Instagram", "Twitter", "Facebook", "WhatsApp"]
+        self.llm = get_gateway()
+        self.platforms = list(self.PLATFORMS)
 
     def generate_engagement_package(self, title, script):
         """Generates platform-specific descriptions, tags, and engagement comments."""
@@ -26,17 +29,8 @@ class SocialMediaBot:
         """
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": "gpt-4o",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "response_format": { "type": "json_object" }
-                }
-            )
-            response.raise_for_status()
-            return json.loads(response.json()['choices'][0]['message']['content'])
+            content = self.llm.chat(prompt, model="gpt-4o", api_key=self.api_key, response_format="json")
+            return json.loads(content)
         except Exception as e:
             print(f"Engagement generation failed: {e}")
             return None
@@ -3,8 +3,8 @@ import requests
 from bs4 import BeautifulSoup
 
 class NairalandScraper:
-    def __init__(self):
-        self.base_url = "https://www.nairaland.com"
+    def __init__(self, base_url="https://www.nairaland.com"):
+        self.base_url = base_url.rstrip("/")
 
     def get_trending_topics(self, limit=5):
         """Scrapes trending topics from Nairaland homepage."""
@@ -4,13 +4,14 @@ import time
 import random
 
 class RedditJSONScraper:
-    def __init__(self, user_agent="FacelessVideoStudio/1.0 (Public JSON mode)"):
+    def __init__(self, user_agent="FacelessVideoStudio/1.0 (Public JSON mode)", base_url="https://www.reddit.com"):
         self.user_agent = user_agent
+        self.base_url = base_url.rstrip("/")
         self.headers = {"User-Agent": self.user_agent}
 
     def get_top_posts(self, subreddit_name="AskReddit", time_filter="day", limit=5):
         """Fetches posts using the public .json endpoint (No API keys required)."""
-        url = f"https://www.reddit.com/r/{subreddit_name}/top.json?t={time_filter}&limit={limit}"
+        url = f"{self.base_url}/r/{subreddit_name}/top.json?t={time_filter}&limit={limit}"
         print(f"[REDDIT JSON] Fetching: {url}")
         
         try:
@@ -2,7 +2,9 @@ import os
 from .reddit_json_scraper import RedditJSONScraper
 
 class RedditScraper:
-    def __init__(self, client_id=None, client_secret=None, user_agent="FacelessVideoStudio/1.0"):
+    def __init__(self, client_id=None, client_secret=None, user_agent="FacelessVideoStudio/1.0",
+                 json_base_url="https://www.reddit.com"):
+        self.json_base_url = json_base_url
         self.use_praw = client_id and client_secret and client_id != "your_reddit_client_id"
         
         if self.use_praw:
@@ -15,7 +17,7 @@ class RedditScraper:
             )
         else:
             print("[REDDIT] Client keys missing. Initializing Public JSON mode...")
-            self.json_scraper = RedditJSONScraper(user_agent=user_agent)
+            self.json_scraper = RedditJSONScraper(user_agent=user_agent, base_url=json_base_url)
 
     def get_top_post(self, subreddit_name="AskReddit", time_filter="day"):
         """Fetches the top post from a subreddit."""
@@ -44,5 +46,5 @@ class RedditScraper:
         except Exception as e:
             print(f"Error scraping Reddit with PRAW: {e}")
             print("Attempting JSON fallback...")
-            fallback = RedditJSONScraper()
+            fallback = RedditJSONScraper(base_url=self.json_base_url)
             return fallback.get_top_posts(subreddit_name, time_filter, limit)